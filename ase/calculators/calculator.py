@@ -95,7 +95,7 @@ def compare_atoms(atoms1, atoms2, tol=1e-15):
 
 
 all_properties = ['energy', 'forces', 'stress', 'dipole',
-                  'charges', 'magmom', 'magmoms', 'free_energy']
+                  'charges', 'magmom', 'magmoms', 'free_energy', 'energies']
 
 
 all_changes = ['positions', 'numbers', 'cell', 'pbc',
@@ -152,10 +152,11 @@ def equal(a, b, tol=None):
         b = np.array(b)
         if a.shape != b.shape:
             return False
+        if (a == b).all():  # much faster than allclose()
+            return True
         if tol is None:
-            return (a == b).all()
-        else:
-            return np.allclose(a, b, rtol=tol, atol=tol)
+            return False
+        return np.allclose(a, b, rtol=tol, atol=tol)
     if isinstance(b, np.ndarray):
         return equal(b, a, tol)
     if isinstance(a, dict) and isinstance(b, dict):
@@ -515,6 +516,9 @@ class Calculator(object):
         else:
             return energy
 
+    def get_potential_energies(self, atoms=None):
+        return self.get_property('energies', atoms)
+
     def get_forces(self, atoms=None):
         return self.get_property('forces', atoms)
 
@@ -584,8 +588,8 @@ class Calculator(object):
 
         properties: list of str
             List of what needs to be calculated.  Can be any combination
-            of 'energy', 'forces', 'stress', 'dipole', 'charges', 'magmom'
-            and 'magmoms'.
+            of 'energy', 'energies', 'forces', 'stress', 'dipole',
+            'charges', 'magmom' and 'magmoms'.
         system_changes: list of str
             List of what has changed since last calculation.  Can be
             any combination of these six: 'positions', 'numbers', 'cell',
@@ -152,6 +152,11 @@ Keyword                    Description
                            ``fs``. This will be determined from the file suffix 
                            or must be set if using equations
 
+``dtype``                  precision of the functions tabulated from a
+                           potential file, ``'float64'`` (default) or
+                           ``'float32'`` to save memory.  Can also be
+                           changed later with ``calc.set(dtype=...)``
+
 =========================  ====================================================
 
 
@@ -196,11 +201,15 @@ Special features
 Notes/Issues
 =============
 
-* Although currently not fast, this calculator can be good for trying
-  small calculations or for creating new potentials by matching baseline
-  data such as from DFT results. The format for these potentials is
-  compatible with LAMMPS_ and so can be used either directly by LAMMPS or
-  with the ASE LAMMPS calculator interface.
+* All neighbor pairs are evaluated at once, so this calculator can be
+  used for large systems as well as for creating new potentials by
+  matching baseline data such as from DFT results.  The functions read
+  from a potential file are tabulated on the uniform grid of the file,
+  which reproduces the cubic splines through the data exactly.  The
+  per-atom energies are available with ``atoms.get_potential_energies()``.
+  The format for these potentials is compatible with LAMMPS_ and so can
+  be used either directly by LAMMPS or with the ASE LAMMPS calculator
+  interface.
 
 * Supported formats are the LAMMPS_ ``.alloy`` and ``.adp``. The
   ``.eam`` format is currently not supported. The form of the
@@ -227,11 +236,12 @@ Notes/Issues
 End EAM Interface Documentation
     """
 
-    implemented_properties = ['energy', 'forces']
+    implemented_properties = ['energy', 'energies', 'forces']
 
     default_parameters = dict(
         skin=1.0,
         potential=None,
+        dtype='float64',
         header=[b'EAM/ADP potential file\n',
                 b'Generated from eam.py\n',
                 b'blank\n'])
@@ -239,9 +249,7 @@ End EAM Interface Documentation
     def __init__(self, restart=None, ignore_bad_restart_file=False,
                  label=os.curdir, atoms=None, **kwargs):
 
-        if 'potential' in kwargs:
-            self.read_potential(kwargs['potential'])
-
+        # the potential file is read by set()
         Calculator.__init__(self, restart, ignore_bad_restart_file,
                             label, atoms, **kwargs)
 
@@ -251,7 +259,7 @@ End EAM Interface Documentation
                       # derivatives
                       'd_embedded_energy', 'd_electron_density', 'd_phi',
                       'd', 'q', 'd_d', 'd_q',  # adp terms
-                      'skin', 'form', 'Z', 'nr', 'nrho', 'mass')
+                      'skin', 'form', 'Z', 'nr', 'nrho', 'mass', 'dtype')
 
         # set any additional keyword arguments
         for arg, val in self.parameters.items():
@@ -261,6 +269,24 @@ End EAM Interface Documentation
                 raise RuntimeError('unknown keyword arg "%s" : not in %s'
                                    % (arg, valid_args))
 
+    def set(self, **kwargs):
+        """Set parameters like set(key1=value1, key2=value2, ...).
+
+        A new potential file is read, and a new dtype tabulates the
+        functions of the potential file again."""
+        changed_parameters = Calculator.set(self, **kwargs)
+        if changed_parameters:
+            self.reset()
+
+        # precision of the tabulated functions read from a potential file
+        self.dtype = self.parameters.dtype
+        if 'potential' in changed_parameters:
+            if self.parameters.potential is not None:
+                self.read_potential(self.parameters.potential)
+        elif 'dtype' in changed_parameters and hasattr(self, 'rphi_data'):
+            self.set_all_splines()
+        return changed_parameters
+
     def set_form(self, fileobj):
         """set the form variable based on the file name suffix"""
         extension = os.path.splitext(fileobj)[1]
@@ -329,7 +355,7 @@ End EAM Interface Documentation
             self.density_data = np.array(
                 [np.float_(data[n + self.nr:n + 2 * self.nr])])
 
-        elif self.form in ['alloy', 'adq']:
+        elif self.form in ['alloy', 'adp']:
             self.header = lines[:3]
             i = 3
 
@@ -430,6 +456,13 @@ End EAM Interface Documentation
         self.r = np.arange(0, self.nr) * self.dr
         self.rho = np.arange(0, self.nrho) * self.drho
 
+        if (self.form == 'adp'):
+            self.read_adp_data(data, d)
+
+        self.set_all_splines()
+
+    def set_all_splines(self):
+        """Tabulate the functions of the potential file with self.dtype"""
         # choose the set_splines method according to the type
         if self.form == 'fs':
             self.set_fs_splines()
@@ -437,7 +470,6 @@ End EAM Interface Documentation
             self.set_splines()
 
         if (self.form == 'adp'):
-            self.read_adp_data(data, d)
             self.set_adp_splines()
 
     def set_splines(self):
@@ -449,10 +481,10 @@ End EAM Interface Documentation
         self.d_electron_density = np.empty(self.Nelements, object)
 
         for i in range(self.Nelements):
-            self.embedded_energy[i] = spline(self.rho,
-                                             self.embedded_data[i], k=3)
-            self.electron_density[i] = spline(self.r,
-                                              self.density_data[i], k=3)
+            self.embedded_energy[i] = self.tabulate(
+                spline(self.rho, self.embedded_data[i], k=3), self.rho)
+            self.electron_density[i] = self.tabulate(
+                spline(self.r, self.density_data[i], k=3), self.r)
             self.d_embedded_energy[i] = self.deriv(self.embedded_energy[i])
             self.d_electron_density[i] = self.deriv(self.electron_density[i])
 
@@ -463,9 +495,9 @@ End EAM Interface Documentation
         # to go through zero due to the r*phi format in alloy and adp
         for i in range(self.Nelements):
             for j in range(i, self.Nelements):
-                self.phi[i, j] = spline(
+                self.phi[i, j] = self.tabulate(spline(
                     self.r[1:],
-                    self.rphi_data[i, j][1:] / self.r[1:], k=3)
+                    self.rphi_data[i, j][1:] / self.r[1:], k=3), self.r[1:])
 
                 self.d_phi[i, j] = self.deriv(self.phi[i, j])
 
@@ -482,12 +514,12 @@ End EAM Interface Documentation
             [self.Nelements, self.Nelements], object)
 
         for i in range(self.Nelements):
-            self.embedded_energy[i] = spline(self.rho,
-                                             self.embedded_data[i], k=3)
+            self.embedded_energy[i] = self.tabulate(
+                spline(self.rho, self.embedded_data[i], k=3), self.rho)
             self.d_embedded_energy[i] = self.deriv(self.embedded_energy[i])
             for j in range(self.Nelements):
-                self.electron_density[i, j] = spline(
-                    self.r, self.density_data[i, j], k=3)
+                self.electron_density[i, j] = self.tabulate(
+                    spline(self.r, self.density_data[i, j], k=3), self.r)
                 self.d_electron_density[i, j] = self.deriv(
                     self.electron_density[i, j])
 
@@ -496,9 +528,9 @@ End EAM Interface Documentation
 
         for i in range(self.Nelements):
             for j in range(i, self.Nelements):
-                self.phi[i, j] = spline(
+                self.phi[i, j] = self.tabulate(spline(
                     self.r[1:],
-                    self.rphi_data[i, j][1:] / self.r[1:], k=3)
+                    self.rphi_data[i, j][1:] / self.r[1:], k=3), self.r[1:])
 
                 self.d_phi[i, j] = self.deriv(self.phi[i, j])
 
@@ -514,9 +546,11 @@ End EAM Interface Documentation
 
         for i in range(self.Nelements):
             for j in range(i, self.Nelements):
-                self.d[i, j] = spline(self.r[1:], self.d_data[i, j][1:], k=3)
+                self.d[i, j] = self.tabulate(
+                    spline(self.r[1:], self.d_data[i, j][1:], k=3), self.r[1:])
                 self.d_d[i, j] = self.deriv(self.d[i, j])
-                self.q[i, j] = spline(self.r[1:], self.q_data[i, j][1:], k=3)
+                self.q[i, j] = self.tabulate(
+                    spline(self.r[1:], self.q_data[i, j][1:], k=3), self.r[1:])
                 self.d_q[i, j] = self.deriv(self.q[i, j])
 
                 # make symmetrical
@@ -624,8 +658,9 @@ End EAM Interface Documentation
             raise RuntimeError('These elements are not in the potential: %s' %
                                elements[unavailable])
 
-        # cutoffs need to be a vector for NeighborList
-        cutoffs = self.cutoff * np.ones(len(atoms))
+        # cutoffs need to be a vector for NeighborList.  Two atoms are
+        # neighbors if their distance is below the sum of their cutoffs
+        cutoffs = 0.5 * self.cutoff * np.ones(len(atoms))
 
         # convert the elements to an index of the position
         # in the eam format
@@ -635,11 +670,17 @@ End EAM Interface Documentation
 
         # since we need the contribution of all neighbors to the
         # local electron density we cannot just calculate and use
-        # one way neighbors
-        self.neighbors = NeighborList(cutoffs,
-                                      skin=self.parameters.skin,
-                                      self_interaction=False,
-                                      bothways=True)
+        # one way neighbors.  The neighbor list is kept as long as the
+        # number of atoms, the cutoff and the skin do not change so that
+        # the skin is useful
+        skin = self.parameters.skin
+        nl = getattr(getattr(self, 'neighbors', None), 'nl', None)
+        if (nl is None or nl.skin != skin or
+            not np.array_equal(nl.cutoffs, cutoffs + skin)):
+            self.neighbors = NeighborList(cutoffs,
+                                          skin=skin,
+                                          self_interaction=False,
+                                          bothways=True)
         self.neighbors.update(atoms)
 
     def calculate(self, atoms=None, properties=['energy'],
@@ -650,7 +691,7 @@ End EAM Interface Documentation
             Contains positions, unit-cell, ...
         properties: list of str
             List of what needs to be calculated.  Can be any combination
-            of 'energy', 'forces'
+            of 'energy', 'energies', 'forces'
         system_changes: list of str
             List of what has changed since last calculation.  Can be
             any combination of these five: 'positions', 'numbers', 'cell',
@@ -670,16 +711,53 @@ End EAM Interface Documentation
         # check we have all the properties requested
         for property in properties:
             if property not in self.results:
-                if property is 'energy':
+                if property in ['energy', 'energies']:
                     self.calculate_energy(self.atoms)
 
-                if property is 'forces':
+                if property == 'forces':
                     self.calculate_forces(self.atoms)
 
         # we need to remember the previous state of parameters
 #        if 'potential' in parameter_changes and potential != None:
 #                self.read_potential(potential)
 
+    def get_pairs(self, atoms):
+        """Return all neighbor pairs within the cutoff as flat arrays
+
+        Returns the indices i and j of the two atoms, the vectors rvec
+        from atom i to atom j and their lengths r.  Every pair appears
+        in both directions."""
+
+        nl = self.neighbors.nl
+        i = nl.pair_first
+        j = nl.pair_second
+        rvec = (atoms.positions[j] - atoms.positions[i] +
+                np.dot(nl.offset_vec, atoms.get_cell()))
+        r = np.sqrt(np.sum(np.square(rvec), axis=1))
+
+        nearest = r <= self.cutoff
+        return i[nearest], j[nearest], rvec[nearest], r[nearest]
+
+    def pair_groups(self, i, j):
+        """Split pairs according to the elements of the two atoms
+
+        Returns a list of (element of i, element of j, pair indices) such
+        that each function of the potential can be evaluated once for
+        all pairs of the same kind."""
+
+        if self.Nelements == 1:
+            return [(0, 0, slice(None))]
+
+        kind = self.index[i] * self.Nelements + self.index[j]
+        order = np.argsort(kind, kind='mergesort')
+        counts = np.bincount(kind, minlength=self.Nelements**2)
+        groups = []
+        for k, pairs in enumerate(np.split(order, np.cumsum(counts)[:-1])):
+            if len(pairs) > 0:
+                groups.append((k // self.Nelements, k % self.Nelements,
+                               pairs))
+        return groups
+
     def calculate_energy(self, atoms):
         """Calculate the energy
         the energy is made up of the ionic or pair interaction and
@@ -687,71 +765,63 @@ End EAM Interface Documentation
         generated by its neighbors
         """
 
-        pair_energy = 0.0
-        embedding_energy = 0.0
-        mu_energy = 0.0
-        lam_energy = 0.0
-        trace_energy = 0.0
+        natoms = len(atoms)
+        i, j, rvec, r = self.get_pairs(atoms)
 
-        self.total_density = np.zeros(len(atoms))
-        if (self.form == 'adp'):
-            self.mu = np.zeros([len(atoms), 3])
-            self.lam = np.zeros([len(atoms), 3, 3])
-
-        for i in range(len(atoms)):  # this is the atom to be embedded
-            neighbors, offsets = self.neighbors.get_neighbors(i)
-            offset = np.dot(offsets, atoms.get_cell())
-
-            rvec = (atoms.positions[neighbors] + offset -
-                    atoms.positions[i])
-
-            # calculate the distance to the nearest neighbors
-            r = np.sqrt(np.sum(np.square(rvec), axis=1))  # fast
-#            r = np.apply_along_axis(np.linalg.norm, 1, rvec)  # sloow
-
-            nearest = np.arange(len(r))[r <= self.cutoff]
-            for j_index in range(self.Nelements):
-                use = self.index[neighbors[nearest]] == j_index
-                if not use.any():
-                    continue
-                pair_energy += np.sum(self.phi[self.index[i], j_index](
-                    r[nearest][use])) / 2.
-
-                if self.form == 'fs':
-                    density = np.sum(
-                        self.electron_density[j_index, self.index[i]](r[nearest][use]))
-                else:
-                    density = np.sum(
-                        self.electron_density[j_index](r[nearest][use]))
-                self.total_density[i] += density
-
-                if self.form == 'adp':
-                    self.mu[i] += self.adp_dipole(
-                        r[nearest][use],
-                        rvec[nearest][use],
-                        self.d[self.index[i], j_index])
-
-                    self.lam[i] += self.adp_quadrupole(
-                        r[nearest][use],
-                        rvec[nearest][use],
-                        self.q[self.index[i], j_index])
-
-            # add in the electron embedding energy
-            embedding_energy += self.embedded_energy[self.index[i]](
-                self.total_density[i])
-
-        components = dict(pair=pair_energy, embedding=embedding_energy)
+        # pair energy and electron density at atom i due to atom j
+        phi = np.empty(len(r))
+        density = np.empty(len(r))
+        for i_index, j_index, use in self.pair_groups(i, j):
+            phi[use] = self.phi[i_index, j_index](r[use])
+            if self.form == 'fs':
+                density[use] = self.electron_density[j_index,
+                                                     i_index](r[use])
+            else:
+                density[use] = self.electron_density[j_index](r[use])
 
-        if self.form == 'adp':
-            mu_energy += np.sum(self.mu ** 2) / 2.
-            lam_energy += np.sum(self.lam ** 2) / 2.
+        pair_energies = np.zeros(natoms)
+        pair_energies += np.bincount(i, phi, natoms) / 2.
+        self.total_density = np.zeros(natoms)
+        self.total_density += np.bincount(i, density, natoms)
+
+        # add in the electron embedding energy
+        embedding_energies = np.zeros(natoms)
+        for i_index in range(self.Nelements):
+            use = self.index == i_index
+            if use.any():
+                embedding_energies[use] = self.embedded_energy[i_index](
+                    self.total_density[use])
 
-            for i in range(len(atoms)):  # this is the atom to be embedded
-                trace_energy -= np.sum(self.lam[i].trace() ** 2) / 6.
+        energies = pair_energies + embedding_energies
+        components = dict(pair=pair_energies.sum(),
+                          embedding=embedding_energies.sum())
 
-            adp_result = dict(adp_mu=mu_energy,
-                              adp_lam=lam_energy,
-                              adp_trace=trace_energy)
+        if self.form == 'adp':
+            dipole = np.empty(len(r))
+            quadrupole = np.empty(len(r))
+            for i_index, j_index, use in self.pair_groups(i, j):
+                dipole[use] = self.d[i_index, j_index](r[use])
+                quadrupole[use] = self.q[i_index, j_index](r[use])
+
+            self.mu = np.zeros([natoms, 3])
+            self.lam = np.zeros([natoms, 3, 3])
+            for alpha in range(3):
+                self.mu[:, alpha] = np.bincount(i, dipole * rvec[:, alpha],
+                                                natoms)
+                for beta in range(alpha, 3):
+                    self.lam[:, alpha, beta] = np.bincount(
+                        i, quadrupole * rvec[:, alpha] * rvec[:, beta],
+                        natoms)
+                    self.lam[:, beta, alpha] = self.lam[:, alpha, beta]
+
+            mu_energies = np.sum(self.mu ** 2, axis=1) / 2.
+            lam_energies = np.sum(self.lam ** 2, axis=(1, 2)) / 2.
+            trace_energies = -self.lam.trace(axis1=1, axis2=2) ** 2 / 6.
+
+            energies += mu_energies + lam_energies + trace_energies
+            adp_result = dict(adp_mu=mu_energies.sum(),
+                              adp_lam=lam_energies.sum(),
+                              adp_trace=trace_energies.sum())
             components.update(adp_result)
 
         self.positions = atoms.positions.copy()
@@ -766,112 +836,88 @@ End EAM Interface Documentation
 
         self.results['energy_components'] = components
         self.results['energy'] = energy
+        self.results['energies'] = energies
 
     def calculate_forces(self, atoms):
         # calculate the forces based on derivatives of the three EAM functions
 
         self.update(atoms)
-        self.results['forces'] = np.zeros((len(atoms), 3))
-
-        for i in range(len(atoms)):  # this is the atom to be embedded
-            neighbors, offsets = self.neighbors.get_neighbors(i)
-            offset = np.dot(offsets, atoms.get_cell())
-            # create a vector of relative positions of neighbors
-            rvec = atoms.positions[neighbors] + offset - atoms.positions[i]
-            r = np.sqrt(np.sum(np.square(rvec), axis=1))
-            nearest = np.arange(len(r))[r < self.cutoff]
-
-            d_embedded_energy_i = self.d_embedded_energy[
-                self.index[i]](self.total_density[i])
-            urvec = rvec.copy()  # unit directional vector
-
-            for j in np.arange(len(neighbors)):
-                urvec[j] = urvec[j] / r[j]
-
-            for j_index in range(self.Nelements):
-                use = self.index[neighbors[nearest]] == j_index
-                if not use.any():
-                    continue
-                rnuse = r[nearest][use]
-                density_j = self.total_density[neighbors[nearest][use]]
-                if self.form == 'fs':
-                    scale = (self.d_phi[self.index[i], j_index](rnuse) +
-                             (d_embedded_energy_i *
-                              self.d_electron_density[j_index, self.index[i]](rnuse)) +
-                             (self.d_embedded_energy[j_index](density_j) *
-                              self.d_electron_density[self.index[i], j_index](rnuse)))
-                else:
-                    scale = (self.d_phi[self.index[i], j_index](rnuse) +
-                             (d_embedded_energy_i *
-                              self.d_electron_density[j_index](rnuse)) +
-                             (self.d_embedded_energy[j_index](density_j) *
-                              self.d_electron_density[self.index[i]](rnuse)))
-
-                self.results['forces'][i] += np.dot(scale, urvec[nearest][use])
-
-                if (self.form == 'adp'):
-                    adp_forces = self.angular_forces(
-                        self.mu[i],
-                        self.mu[neighbors[nearest][use]],
-                        self.lam[i],
-                        self.lam[neighbors[nearest][use]],
-                        rnuse,
-                        rvec[nearest][use],
-                        self.index[i],
-                        j_index)
-
-                    self.results['forces'][i] += adp_forces
-
-    def angular_forces(self, mu_i, mu, lam_i, lam, r, rvec, form1, form2):
-        # calculate the extra components for the adp forces
-        # rvec are the relative positions to atom i
-        psi = np.zeros(mu.shape)
-        for gamma in range(3):
-            term1 = (mu_i[gamma] - mu[:, gamma]) * self.d[form1][form2](r)
+        natoms = len(atoms)
+        i, j, rvec, r = self.get_pairs(atoms)
+
+        d_embedded_energy = np.empty(natoms)
+        for i_index in range(self.Nelements):
+            use = self.index == i_index
+            if use.any():
+                d_embedded_energy[use] = self.d_embedded_energy[i_index](
+                    self.total_density[use])
+
+        scale = np.empty(len(r))
+        for i_index, j_index, use in self.pair_groups(i, j):
+            rnuse = r[use]
+            if self.form == 'fs':
+                scale[use] = (self.d_phi[i_index, j_index](rnuse) +
+                              (d_embedded_energy[i[use]] *
+                               self.d_electron_density[j_index,
+                                                       i_index](rnuse)) +
+                              (d_embedded_energy[j[use]] *
+                               self.d_electron_density[i_index,
+                                                       j_index](rnuse)))
+            else:
+                scale[use] = (self.d_phi[i_index, j_index](rnuse) +
+                              (d_embedded_energy[i[use]] *
+                               self.d_electron_density[j_index](rnuse)) +
+                              (d_embedded_energy[j[use]] *
+                               self.d_electron_density[i_index](rnuse)))
 
-            term2 = np.sum((mu_i - mu) *
-                           self.d_d[form1][form2](r)[:, np.newaxis] *
-                           (rvec * rvec[:, gamma][:, np.newaxis] /
-                            r[:, np.newaxis]), axis=1)
+        # the force on atom i along the unit vector to each neighbor
+        pair_forces = (scale / r)[:, np.newaxis] * rvec
 
-            term3 = 2 * np.sum((lam_i[:, gamma] + lam[:, :, gamma]) *
-                               rvec * self.q[form1][form2](r)[:, np.newaxis],
-                               axis=1)
-            term4 = 0.0
-            for alpha in range(3):
-                for beta in range(3):
-                    rs = rvec[:, alpha] * rvec[:, beta] * rvec[:, gamma]
-                    term4 += ((lam_i[alpha, beta] + lam[:, alpha, beta]) *
-                              self.d_q[form1][form2](r) * rs) / r
+        if self.form == 'adp':
+            pair_forces += self.angular_forces(i, j, r, rvec)
 
-            term5 = ((lam_i.trace() + lam.trace(axis1=1, axis2=2)) *
-                     (self.d_q[form1][form2](r) * r +
-                      2 * self.q[form1][form2](r)) * rvec[:, gamma]) / 3.
+        forces = np.empty((natoms, 3))
+        for gamma in range(3):
+            forces[:, gamma] = np.bincount(i, pair_forces[:, gamma], natoms)
+        self.results['forces'] = forces
+
+    def angular_forces(self, i, j, r, rvec):
+        # calculate the extra components for the adp forces of every pair
+        # rvec are the positions of atoms j relative to atoms i
+        d = np.empty(len(r))
+        d_d = np.empty(len(r))
+        q = np.empty(len(r))
+        d_q = np.empty(len(r))
+        for i_index, j_index, use in self.pair_groups(i, j):
+            d[use] = self.d[i_index, j_index](r[use])
+            d_d[use] = self.d_d[i_index, j_index](r[use])
+            q[use] = self.q[i_index, j_index](r[use])
+            d_q[use] = self.d_q[i_index, j_index](r[use])
+
+        dmu = self.mu[i] - self.mu[j]
+        lam = self.lam[i] + self.lam[j]
 
-            # the minus for term5 is a correction on the adp
-            # formulation given in the 2005 Mishin Paper and is posted
-            # on the NIST website with the AlH potential
-            psi[:, gamma] = term1 + term2 + term3 + term4 - term5
+        term1 = dmu * d[:, np.newaxis]
 
-        return np.sum(psi, axis=0)
+        term2 = (np.sum(dmu * rvec, axis=1) * d_d / r)[:, np.newaxis] * rvec
 
-    def adp_dipole(self, r, rvec, d):
-        # calculate the dipole contribution
-        mu = np.sum((rvec * d(r)[:, np.newaxis]), axis=0)
+        term3 = 2 * np.einsum('pag,pa->pg', lam, rvec) * q[:, np.newaxis]
 
-        return mu  # sign to agree with lammps
+        term4 = ((np.einsum('pab,pa,pb->p', lam, rvec, rvec) *
+                  d_q / r)[:, np.newaxis] * rvec)
 
-    def adp_quadrupole(self, r, rvec, q):
-        # slow way of calculating the quadrupole contribution
-        r = np.sqrt(np.sum(rvec ** 2, axis=1))
+        term5 = ((lam.trace(axis1=1, axis2=2) *
+                  (d_q * r + 2 * q))[:, np.newaxis] * rvec) / 3.
 
-        lam = np.zeros([rvec.shape[0], 3, 3])
-        qr = q(r)
-        for alpha in range(3):
-            for beta in range(3):
-                lam[:, alpha, beta] += qr * rvec[:, alpha] * rvec[:, beta]
+        # the minus for term5 is a correction on the adp
+        # formulation given in the 2005 Mishin Paper and is posted
+        # on the NIST website with the AlH potential
+        return term1 + term2 + term3 + term4 - term5
 
-        return np.sum(lam, axis=0)
+    def tabulate(self, spline, x):
+        """Tabulate a spline on the uniform grid x for fast evaluation"""
+        return TabulatedFunction(spline, x[0], x[1] - x[0], len(x),
+                                 dtype=self.dtype)
 
     def deriv(self, spline):
         """Wrapper for extracting the derivative from a spline"""
@@ -951,3 +997,47 @@ End EAM Interface Documentation
                 label = name + ' ' + self.elements[i] + '-' + self.elements[j]
                 plt.plot(curvex, curvey[i, j](curvex), label=label)
         plt.legend()
+
+
+class TabulatedFunction:
+    """Function tabulated on a uniform grid
+
+    The function is stored as one cubic polynomial per grid interval,
+    built from the values and first derivatives at the grid points, so
+    that it can be evaluated for many points at once without searching
+    for the interval.  For a cubic spline with knots on the grid
+    (such as the splines made from the potential files) this
+    reproduces the spline exactly, including the extrapolation outside
+    the grid.  The polynomials can be stored in single precision to
+    save memory.
+
+    The function is called as function(x) for the values and
+    function(x, 1) for the derivatives, just like a scipy spline.
+    """
+
+    def __init__(self, function, x0, dx, n, dtype='float64'):
+        x = x0 + np.arange(n) * dx
+        y = function(x)
+        dy = function(x, 1) * dx
+        self.x0 = x0
+        self.dx = dx
+        self.dtype = np.dtype(dtype)
+        # coefficients of the cubic polynomials in t = (x - x_k) / dx
+        self.c0 = y[:-1].astype(self.dtype)
+        self.c1 = dy[:-1].astype(self.dtype)
+        self.c2 = (3 * (y[1:] - y[:-1]) - 2 * dy[:-1] -
+                   dy[1:]).astype(self.dtype)
+        self.c3 = (2 * (y[:-1] - y[1:]) + dy[:-1] +
+                   dy[1:]).astype(self.dtype)
+
+    def __call__(self, x, nu=0):
+        t = (np.asarray(x) - self.x0) / self.dx
+        k = np.clip(np.floor(t).astype(int), 0, len(self.c0) - 1)
+        t = (t - k).astype(self.dtype)
+        if nu == 0:
+            return self.c0[k] + t * (self.c1[k] +
+                                     t * (self.c2[k] + t * self.c3[k]))
+        elif nu == 1:
+            return (self.c1[k] + t * (2 * self.c2[k] +
+                                      3 * t * self.c3[k])) / self.dx
+        raise ValueError('Only the first derivative is tabulated')
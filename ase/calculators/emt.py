@@ -1,12 +1,12 @@
 """Effective medium theory potential."""
 
-from math import sqrt, exp, log
+from math import sqrt, exp
 
 import numpy as np
 
 from ase.data import chemical_symbols, atomic_numbers
 from ase.units import Bohr
-from ase.neighborlist import NeighborList
+from ase.neighborlist import NewPrimitiveNeighborList
 from ase.calculators.calculator import Calculator, all_changes
 
 
@@ -60,6 +60,7 @@ class EMT(Calculator):
 
     def initialize(self, atoms):
         self.par = {}
+        self.par_a = {}
         self.rc = 0.0
         self.numbers = atoms.get_atomic_numbers()
         if self.parameters.asap_cutoff:
@@ -113,12 +114,18 @@ class EMT(Calculator):
             for s2, p2 in self.par.items():
                 self.ksi[s1][s2] = p2['n0'] / p1['n0']
 
+        # Per-atom copies of the parameters used by the pair kernels:
+        for key in ['E0', 's0', 'V0', 'eta2', 'kappa', 'lambda', 'n0',
+                    'gamma1', 'gamma2']:
+            values = {Z: p[key] for Z, p in self.par.items()}
+            self.par_a[key] = np.array([values[Z] for Z in self.numbers])
+
         self.forces = np.empty((len(atoms), 3))
         self.sigma1 = np.empty(len(atoms))
         self.deds = np.empty(len(atoms))
 
-        self.nl = NeighborList([0.5 * self.rc_list] * len(atoms),
-                               self_interaction=False)
+        self.nl = NewPrimitiveNeighborList([0.5 * self.rc_list] * len(atoms),
+                                           self_interaction=False)
 
     def calculate(self, atoms=None, properties=['energy'],
                   system_changes=all_changes):
@@ -128,90 +135,78 @@ class EMT(Calculator):
             self.initialize(self.atoms)
 
         positions = self.atoms.positions
-        numbers = self.atoms.numbers
         cell = self.atoms.cell
 
-        self.nl.update(self.atoms)
-
-        self.energy = 0.0
-        self.sigma1[:] = 0.0
-        self.forces[:] = 0.0
+        self.nl.update(self.atoms.pbc, self.atoms.get_cell(complete=True),
+                       positions)
 
         natoms = len(self.atoms)
 
-        for a1 in range(natoms):
-            Z1 = numbers[a1]
-            p1 = self.par[Z1]
-            ksi = self.ksi[Z1]
-            neighbors, offsets = self.nl.get_neighbors(a1)
-            offsets = np.dot(offsets, cell)
-            for a2, offset in zip(neighbors, offsets):
-                d = positions[a2] + offset - positions[a1]
-                r = sqrt(np.dot(d, d))
-                if r < self.rc_list:
-                    Z2 = numbers[a2]
-                    p2 = self.par[Z2]
-                    self.interact1(a1, a2, d, r, p1, p2, ksi[Z2])
-
-        for a in range(natoms):
-            Z = numbers[a]
-            p = self.par[Z]
-            try:
-                ds = -log(self.sigma1[a] / 12) / (beta * p['eta2'])
-            except (OverflowError, ValueError):
-                self.deds[a] = 0.0
-                self.energy -= p['E0']
-                continue
-            x = p['lambda'] * ds
-            y = exp(-x)
-            z = 6 * p['V0'] * exp(-p['kappa'] * ds)
-            self.deds[a] = ((x * y * p['E0'] * p['lambda'] + p['kappa'] * z) /
-                            (self.sigma1[a] * beta * p['eta2']))
-            self.energy += p['E0'] * ((1 + x) * y - 1) + z
-
-        for a1 in range(natoms):
-            Z1 = numbers[a1]
-            p1 = self.par[Z1]
-            ksi = self.ksi[Z1]
-            neighbors, offsets = self.nl.get_neighbors(a1)
-            offsets = np.dot(offsets, cell)
-            for a2, offset in zip(neighbors, offsets):
-                d = positions[a2] + offset - positions[a1]
-                r = sqrt(np.dot(d, d))
-                if r < self.rc_list:
-                    Z2 = numbers[a2]
-                    p2 = self.par[Z2]
-                    self.interact2(a1, a2, d, r, p1, p2, ksi[Z2])
-
-        self.results['energy'] = self.energy
-        self.results['free_energy'] = self.energy
-        self.results['forces'] = self.forces
-
-    def interact1(self, a1, a2, d, r, p1, p2, ksi):
-        x = exp(self.acut * (r - self.rc))
+        # All neighbor pairs (a1, a2) within the cutoff:
+        a1 = self.nl.pair_first
+        a2 = self.nl.pair_second
+        d = positions[a2] + np.dot(self.nl.offset_vec, cell) - positions[a1]
+        r = np.sqrt((d**2).sum(1))
+        mask = r < self.rc_list
+        a1 = a1[mask]
+        a2 = a2[mask]
+        d = d[mask]
+        r = r[mask]
+
+        # Parameters of the first and second atom of each pair:
+        p1 = {key: values[a1] for key, values in self.par_a.items()}
+        p2 = {key: values[a2] for key, values in self.par_a.items()}
+        ksi = p2['n0'] / p1['n0']
+
+        x = np.exp(self.acut * (r - self.rc))
         theta = 1.0 / (1.0 + x)
-        y1 = (0.5 * p1['V0'] * exp(-p2['kappa'] * (r / beta - p2['s0'])) *
+        u = d / r[:, np.newaxis]
+
+        # First pass over all pairs: Pair energy and density (see interact1).
+        y1 = (0.5 * p1['V0'] * np.exp(-p2['kappa'] * (r / beta - p2['s0'])) *
               ksi / p1['gamma2'] * theta)
-        y2 = (0.5 * p2['V0'] * exp(-p1['kappa'] * (r / beta - p1['s0'])) /
+        y2 = (0.5 * p2['V0'] * np.exp(-p1['kappa'] * (r / beta - p1['s0'])) /
               ksi / p2['gamma2'] * theta)
-        self.energy -= y1 + y2
+        energies = np.zeros(natoms)
+        energies -= np.bincount(a1, y1, natoms) + np.bincount(a2, y2, natoms)
         f = ((y1 * p2['kappa'] + y2 * p1['kappa']) / beta +
-             (y1 + y2) * self.acut * theta * x) * d / r
-        self.forces[a1] += f
-        self.forces[a2] -= f
-        self.sigma1[a1] += (exp(-p2['eta2'] * (r - beta * p2['s0'])) *
-                            ksi * theta / p1['gamma1'])
-        self.sigma1[a2] += (exp(-p1['eta2'] * (r - beta * p1['s0'])) /
-                            ksi * theta / p2['gamma1'])
-
-    def interact2(self, a1, a2, d, r, p1, p2, ksi):
-        x = exp(self.acut * (r - self.rc))
-        theta = 1.0 / (1.0 + x)
-        y1 = (exp(-p2['eta2'] * (r - beta * p2['s0'])) *
-              ksi / p1['gamma1'] * theta * self.deds[a1])
-        y2 = (exp(-p1['eta2'] * (r - beta * p1['s0'])) /
-              ksi / p2['gamma1'] * theta * self.deds[a2])
-        f = ((y1 * p2['eta2'] + y2 * p1['eta2']) +
-             (y1 + y2) * self.acut * theta * x) * d / r
-        self.forces[a1] -= f
-        self.forces[a2] += f
+             (y1 + y2) * self.acut * theta * x)
+        s1 = np.exp(-p2['eta2'] * (r - beta * p2['s0'])) * theta
+        s2 = np.exp(-p1['eta2'] * (r - beta * p1['s0'])) * theta
+        self.sigma1[:] = (np.bincount(a1, s1 * ksi / p1['gamma1'], natoms) +
+                          np.bincount(a2, s2 / ksi / p2['gamma1'], natoms))
+
+        # Embedding energy of each atom.  Atoms without neighbors have the
+        # energy -E0 and do not contribute to the forces:
+        self.deds[:] = 0.0
+        isolated = self.sigma1 <= 0.0
+        energies[isolated] -= self.par_a['E0'][isolated]
+        embedded = ~isolated
+        p = {key: values[embedded] for key, values in self.par_a.items()}
+        sigma1 = self.sigma1[embedded]
+        ds = -np.log(sigma1 / 12) / (beta * p['eta2'])
+        x_a = p['lambda'] * ds
+        y_a = np.exp(-x_a)
+        z_a = 6 * p['V0'] * np.exp(-p['kappa'] * ds)
+        self.deds[embedded] = ((x_a * y_a * p['E0'] * p['lambda'] +
+                                p['kappa'] * z_a) /
+                               (sigma1 * beta * p['eta2']))
+        energies[embedded] += p['E0'] * ((1 + x_a) * y_a - 1) + z_a
+
+        # Second pass over all pairs: Forces from the embedding energy
+        # (see interact2).
+        y1 = s1 * ksi / p1['gamma1'] * self.deds[a1]
+        y2 = s2 / ksi / p2['gamma1'] * self.deds[a2]
+        f -= ((y1 * p2['eta2'] + y2 * p1['eta2']) +
+              (y1 + y2) * self.acut * theta * x)
+
+        f = f[:, np.newaxis] * u
+        for c in range(3):
+            self.forces[:, c] = (np.bincount(a1, f[:, c], natoms) -
+                                 np.bincount(a2, f[:, c], natoms))
+
+        self.energy = energies.sum()
+
+        self.results['energy'] = self.energy
+        self.results['free_energy'] = self.energy
+        self.results['forces'] = self.forces
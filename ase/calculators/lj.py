@@ -2,16 +2,48 @@ from __future__ import division
 
 import numpy as np
 
-from ase.neighborlist import NeighborList
+from ase.neighborlist import NewPrimitiveNeighborList
 from ase.calculators.calculator import Calculator, all_changes
 from ase.calculators.calculator import PropertyNotImplementedError
 
 
 class LennardJones(Calculator):
-    implemented_properties = ['energy', 'forces', 'stress']
+    """Lennard-Jones potential.
+
+    The potential is evaluated over the flat pair arrays of a
+    :class:`~ase.neighborlist.NewPrimitiveNeighborList` without any Python
+    loops over atoms, so it can be used for large systems.  The neighbor
+    list is only rebuilt when an atom has moved more than the skin.
+
+    Parameters:
+
+    epsilon: float
+        Depth of the potential well.  Default: 1.0
+    sigma: float
+        Distance at which the (unshifted) potential is zero.  Default: 1.0
+    rc: float
+        Cutoff radius.  Default: 3 * sigma
+    ro: float
+        Onset of the smooth cutoff region.  Only used if smooth=True.
+        Default: 0.66 * rc
+    smooth: bool
+        If False (default), the potential is shifted such that it vanishes
+        at rc, which leaves a discontinuity in the forces.  If True, the
+        potential is instead multiplied by a cutoff function that goes
+        smoothly from 1 at ro to 0 at rc, such that energy and forces
+        are continuous.
+
+    Per-atom energies are obtained by assigning half of each pair
+    energy to each of the two atoms.
+    """
+
+    implemented_properties = ['energy', 'energies', 'free_energy', 'forces',
+                              'stress']
     default_parameters = {'epsilon': 1.0,
                           'sigma': 1.0,
-                          'rc': None}
+                          'rc': None,
+                          'ro': None,
+                          'smooth': False}
     nolabel = True
 
     def __init__(self, **kwargs):
@@ -29,45 +61,85 @@ class LennardJones(Calculator):
         rc = self.parameters.rc
         if rc is None:
             rc = 3 * sigma
+        ro = self.parameters.ro
+        if ro is None:
+            ro = 0.66 * rc
 
         if 'numbers' in system_changes:
-            self.nl = NeighborList([rc / 2] * natoms, self_interaction=False)
+            self.nl = NewPrimitiveNeighborList([rc / 2] * natoms,
+                                               self_interaction=False)
 
-        self.nl.update(self.atoms)
+        self.nl.update(self.atoms.pbc, self.atoms.get_cell(complete=True),
+                       self.atoms.positions)
 
+        # Half neighbor list.  Pairs within the skin are removed.
         positions = self.atoms.positions
         cell = self.atoms.cell
-
-        e0 = 4 * epsilon * ((sigma / rc)**12 - (sigma / rc)**6)
-
-        energy = 0.0
-        forces = np.zeros((natoms, 3))
-        stress = np.zeros((3, 3))
-
-        for a1 in range(natoms):
-            neighbors, offsets = self.nl.get_neighbors(a1)
-            cells = np.dot(offsets, cell)
-            d = positions[neighbors] + cells - positions[a1]
-            r2 = (d**2).sum(1)
-            c6 = (sigma**2 / r2)**3
-            c6[r2 > rc**2] = 0.0
-            energy -= e0 * (c6 != 0.0).sum()
-            c12 = c6**2
-            energy += 4 * epsilon * (c12 - c6).sum()
-            f = (24 * epsilon * (2 * c12 - c6) / r2)[:, np.newaxis] * d
-            forces[a1] -= f.sum(axis=0)
-            for a2, f2 in zip(neighbors, f):
-                forces[a2] += f2
-            stress += np.dot(f.T, d)
+        i = self.nl.pair_first
+        j = self.nl.pair_second
+        D = positions[j] - positions[i] + np.dot(self.nl.offset_vec, cell)
+        r2 = (D**2).sum(1)
+        mask = r2 < rc**2
+        i = i[mask]
+        j = j[mask]
+        D = D[mask]
+        r2 = r2[mask]
+
+        c6 = (sigma**2 / r2)**3
+        c12 = c6**2
+        pairwise_energies = 4 * epsilon * (c12 - c6)
+        # Derivative of the pair energy with respect to r, divided by r:
+        pairwise_derivatives = -24 * epsilon * (2 * c12 - c6) / r2
+
+        if self.parameters.smooth:
+            fc = cutoff_function(r2, rc**2, ro**2)
+            dfc = d_cutoff_function(r2, rc**2, ro**2)
+            pairwise_derivatives *= fc
+            pairwise_derivatives += 2 * dfc * pairwise_energies
+            pairwise_energies *= fc
+        else:
+            e0 = 4 * epsilon * ((sigma / rc)**12 - (sigma / rc)**6)
+            pairwise_energies -= e0
+
+        energies = 0.5 * (np.bincount(i, pairwise_energies, natoms) +
+                          np.bincount(j, pairwise_energies, natoms))
+        energy = pairwise_energies.sum()
+
+        pairwise_forces = pairwise_derivatives[:, np.newaxis] * D
+        forces = np.empty((natoms, 3))
+        for c in range(3):
+            forces[:, c] = (np.bincount(i, pairwise_forces[:, c], natoms) -
+                            np.bincount(j, pairwise_forces[:, c], natoms))
 
         if 'stress' in properties:
             if self.atoms.number_of_lattice_vectors == 3:
-                stress += stress.T.copy()
-                stress *= -0.5 / self.atoms.get_volume()
+                stress = np.dot(D.T, pairwise_forces)
+                stress /= self.atoms.get_volume()
                 self.results['stress'] = stress.flat[[0, 4, 8, 5, 2, 1]]
             else:
                 raise PropertyNotImplementedError
 
         self.results['energy'] = energy
+        self.results['energies'] = energies
         self.results['free_energy'] = energy
         self.results['forces'] = forces
+
+
+def cutoff_function(r2, rc2, ro2):
+    """Smooth cutoff function of the squared distance r2.
+
+    Goes from 1 at ro2 to 0 at rc2 such that the product with the
+    Lennard-Jones potential has continuous first derivatives."""
+    return np.where(r2 < ro2, 1.0,
+                    np.where(r2 < rc2,
+                             (rc2 - r2)**2 * (rc2 + 2 * r2 - 3 * ro2) /
+                             (rc2 - ro2)**3,
+                             0.0))
+
+
+def d_cutoff_function(r2, rc2, ro2):
+    """Derivative of cutoff_function with respect to r2."""
+    return np.where(r2 < ro2, 0.0,
+                    np.where(r2 < rc2,
+                             6 * (rc2 - r2) * (ro2 - r2) / (rc2 - ro2)**3,
+                             0.0))
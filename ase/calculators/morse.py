@@ -1,44 +1,108 @@
+from __future__ import division
+
 import numpy as np
 
-from math import exp, sqrt
+from ase.neighborlist import neighbor_list
+from ase.calculators.calculator import Calculator, all_changes
+from ase.calculators.calculator import PropertyNotImplementedError
+
+
+def fcut(r, r0, r1):
+    """Smooth cutoff function.
+
+    Goes from 1 at r0 to 0 at r1 along half a cosine period."""
+    s = 1.0 - (r - r0) / (r1 - r0)
+    return np.where(r <= r0, 1.0,
+                    np.where(r >= r1, 0.0,
+                             0.5 - 0.5 * np.cos(np.pi * s)))
 
-from ase.calculators.calculator import Calculator
+
+def fcut_d(r, r0, r1):
+    """Derivative of fcut() with respect to r."""
+    s = 1.0 - (r - r0) / (r1 - r0)
+    return np.where((r <= r0) | (r >= r1), 0.0,
+                    -0.5 * np.pi * np.sin(np.pi * s) / (r1 - r0))
 
 
 class MorsePotential(Calculator):
     """Morse potential.
 
     Default values chosen to be similar as Lennard-Jones.
+
+    The pair energy epsilon * (exp(2 rho0 (1 - r / r0)) -
+    2 exp(rho0 (1 - r / r0))) is multiplied by a cutoff function going
+    smoothly from 1 at rcut1 * r0 to 0 at rcut2 * r0.  Neighbors are
+    found with :func:`~ase.neighborlist.neighbor_list`, so periodic
+    boundary conditions are supported and the cost grows linearly with
+    the number of atoms.
+
+    Parameters:
+
+    epsilon: float
+        Depth of the potential well.  Default: 1.0
+    rho0: float
+        Stiffness of the potential.  Default: 6.0
+    r0: float
+        Equilibrium distance.  Default: 1.0
+    rcut1: float
+        Onset of the cutoff region in units of r0.  Default: 1.9
+    rcut2: float
+        Cutoff radius in units of r0.  Default: 2.7
     """
 
-    implemented_properties = ['energy', 'forces']
+    implemented_properties = ['energy', 'energies', 'free_energy', 'forces',
+                              'stress']
     default_parameters = {'epsilon': 1.0,
                           'rho0': 6.0,
-                          'r0': 1.0}
+                          'r0': 1.0,
+                          'rcut1': 1.9,
+                          'rcut2': 2.7}
     nolabel = True
 
     def __init__(self, **kwargs):
         Calculator.__init__(self, **kwargs)
 
     def calculate(self, atoms=None, properties=['energy'],
-                  system_changes=['positions', 'numbers', 'cell',
-                                  'pbc', 'charges', 'magmoms']):
+                  system_changes=all_changes):
         Calculator.calculate(self, atoms, properties, system_changes)
         epsilon = self.parameters.epsilon
         rho0 = self.parameters.rho0
         r0 = self.parameters.r0
-        positions = self.atoms.get_positions()
-        energy = 0.0
-        forces = np.zeros((len(self.atoms), 3))
-        preF = 2 * epsilon * rho0 / r0
-        for i1, p1 in enumerate(positions):
-            for i2, p2 in enumerate(positions[:i1]):
-                diff = p2 - p1
-                r = sqrt(np.dot(diff, diff))
-                expf = exp(rho0 * (1.0 - r / r0))
-                energy += epsilon * expf * (expf - 2)
-                F = preF * expf * (expf - 1) * diff / r
-                forces[i1] -= F
-                forces[i2] += F
+        rcut1 = self.parameters.rcut1 * r0
+        rcut2 = self.parameters.rcut2 * r0
+
+        natoms = len(self.atoms)
+
+        # Full neighbor list: every pair appears once in each direction.
+        i, j, r, D = neighbor_list('ijdD', self.atoms, rcut2)
+
+        expf = np.exp(rho0 * (1.0 - r / r0))
+        fc = fcut(r, rcut1, rcut2)
+        pairwise_energies = epsilon * expf * (expf - 2)
+        # Derivative of the pair energy with respect to r, divided by r:
+        pairwise_derivatives = (fcut_d(r, rcut1, rcut2) * pairwise_energies -
+                                2 * epsilon * rho0 / r0 * expf * (expf - 1) *
+                                fc) / r
+        pairwise_energies *= fc
+
+        energies = np.zeros(natoms)
+        energies += 0.5 * np.bincount(i, pairwise_energies, natoms)
+        energy = energies.sum()
+
+        pairwise_forces = pairwise_derivatives[:, np.newaxis] * D
+        forces = np.empty((natoms, 3))
+        for c in range(3):
+            forces[:, c] = np.bincount(i, pairwise_forces[:, c], natoms)
+
+        if 'stress' in properties:
+            if self.atoms.number_of_lattice_vectors == 3:
+                stress = 0.5 * np.dot(D.T, pairwise_forces)
+                stress /= self.atoms.get_volume()
+                self.results['stress'] = stress.flat[[0, 4, 8, 5, 2, 1]]
+            else:
+                raise PropertyNotImplementedError
+
         self.results['energy'] = energy
+        self.results['energies'] = energies
+        self.results['free_energy'] = energy
         self.results['forces'] = forces
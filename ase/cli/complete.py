@@ -40,16 +40,17 @@ commands = {
          '--output-format', '-f', '--force', '-n',
          '--image-number', '-e', '--exec-code', '-E',
          '--exec-file', '-a', '--arrays', '-I', '--info', '-s',
-         '--split-output'],
+         '--split-output', '-j', '--jobs'],
     'db':
         ['-v', '--verbose', '-q', '--quiet', '-n', '--count', '-l',
          '--long', '-i', '--insert-into', '-a',
-         '--add-from-file', '-k', '--add-key-value-pairs', '-L',
-         '--limit', '--offset', '--delete', '--delete-keys',
-         '-y', '--yes', '--explain', '-c', '--columns', '-s',
-         '--sort', '--cut', '-p', '--plot', '-P', '--plot-data',
-         '--csv', '-w', '--open-web-browser', '--no-lock-file',
-         '--analyse', '-j', '--json', '-m', '--show-metadata',
+         '--add-from-file', '--jobs', '-k',
+         '--add-key-value-pairs', '-L', '--limit', '--offset',
+         '--delete', '--delete-keys', '-y', '--yes', '--explain',
+         '-c', '--columns', '-s', '--sort', '--cut', '-p',
+         '--plot', '-P', '--plot-data', '--csv', '-w',
+         '--open-web-browser', '--no-lock-file', '--analyse',
+         '-j', '--json', '-m', '--show-metadata',
          '--set-metadata', '-M', '--metadata-from-python-script',
          '--unique', '--strip-data', '--show-keys',
          '--show-values', '--write-summary-files'],
@@ -1,7 +1,7 @@
 from __future__ import print_function
 import os
 
-from ase.io import read, write
+from ase.io import iread_files, write
 
 
 class CLICommand:
@@ -49,6 +49,9 @@ class CLICommand:
             help='Write output frames to individual files. '
             'Output file name should be a format string with '
             'a single integer field, e.g. out-{:0>5}.xyz')
+        add('-j', '--jobs', type=int, default=1, metavar='N',
+            help='Read the input files with N processes '
+            '(use 0 for the number of CPUs).')
 
     @staticmethod
     def run(args, parser):
@@ -64,12 +67,10 @@ class CLICommand:
                 print('Filtering to include info: ', ', '.join(args.info))
 
         configs = []
-        for filename in args.input:
-            atoms = read(filename, args.image_number, format=args.input_format)
-            if isinstance(atoms, list):
-                configs.extend(atoms)
-            else:
-                configs.append(atoms)
+        for result in iread_files(args.input, args.image_number,
+                                  format=args.input_format,
+                                  jobs=args.jobs or None):
+            configs.extend(result.images)
 
         new_configs = []
         for atoms in configs:
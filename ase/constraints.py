@@ -250,12 +250,37 @@ class FixBondLengths(FixConstraint):
                  bondlengths=None, iterations=None):
         """iterations:
                 Ignored"""
-        self.pairs = np.asarray(pairs)
+        self.pairs = np.asarray(pairs, int).reshape(-1, 2)
         self.tolerance = tolerance
+        if bondlengths is not None:
+            bondlengths = np.asarray(bondlengths, float)
         self.bondlengths = bondlengths
 
         self.removed_dof = len(pairs)
 
+    def get_groups(self):
+        """Split the pairs into groups of pairs without common atoms.
+
+        The pairs of a group are adjusted together.  Since they don't
+        share atoms, this gives the same result as adjusting them one
+        at a time."""
+        if getattr(self, '_grouped_pairs', None) is not self.pairs:
+            colors = np.empty(len(self.pairs), int)
+            used = {}  # colors of the pairs of each atom
+            for j, (a, b) in enumerate(self.pairs.tolist()):
+                taken = used.setdefault(a, set()) | used.setdefault(b, set())
+                color = 0
+                while color in taken:
+                    color += 1
+                colors[j] = color
+                used[a].add(color)
+                used[b].add(color)
+            ncolors = colors.max() + 1 if len(colors) else 0
+            self._groups = [np.nonzero(colors == color)[0]
+                            for color in range(ncolors)]
+            self._grouped_pairs = self.pairs
+        return self._groups
+
     def adjust_positions(self, atoms, new):
         old = atoms.positions
         masses = atoms.get_masses()
@@ -263,20 +288,24 @@ class FixBondLengths(FixConstraint):
         if self.bondlengths is None:
             self.bondlengths = self.initialize_bond_lengths(atoms)
 
+        a, b = self.pairs.T
+        r0 = old[a] - old[b]
+        d0 = find_mic(r0, atoms.cell, atoms._pbc)[0]
+        m = 1 / (1 / masses[a] + 1 / masses[b])
+        groups = self.get_groups()
+
         for i in range(self.maxiter):
             converged = True
-            for j, ab in enumerate(self.pairs):
-                a = ab[0]
-                b = ab[1]
-                cd = self.bondlengths[j]
-                r0 = old[a] - old[b]
-                d0 = find_mic([r0], atoms.cell, atoms._pbc)[0][0]
-                d1 = new[a] - new[b] - r0 + d0
-                m = 1 / (1 / masses[a] + 1 / masses[b])
-                x = 0.5 * (cd**2 - np.dot(d1, d1)) / np.dot(d0, d1)
-                if abs(x) > self.tolerance:
-                    new[a] += x * m / masses[a] * d0
-                    new[b] -= x * m / masses[b] * d0
+            for j in groups:
+                d1 = new[a[j]] - new[b[j]] - r0[j] + d0[j]
+                x = (0.5 * (self.bondlengths[j]**2 - (d1**2).sum(1)) /
+                     (d0[j] * d1).sum(1))
+                k = abs(x) > self.tolerance
+                if k.any():
+                    j = j[k]
+                    dx = (x[k] * m[j])[:, np.newaxis] * d0[j]
+                    new[a[j]] += dx / masses[a[j], np.newaxis]
+                    new[b[j]] -= dx / masses[b[j], np.newaxis]
                     converged = False
             if converged:
                 break
@@ -290,20 +319,23 @@ class FixBondLengths(FixConstraint):
         if self.bondlengths is None:
             self.bondlengths = self.initialize_bond_lengths(atoms)
 
+        a, b = self.pairs.T
+        d = find_mic(old[a] - old[b], atoms.cell, atoms._pbc)[0]
+        m = 1 / (1 / masses[a] + 1 / masses[b])
+        groups = self.get_groups()
+
         for i in range(self.maxiter):
             converged = True
-            for j, ab in enumerate(self.pairs):
-                a = ab[0]
-                b = ab[1]
-                cd = self.bondlengths[j]
-                d = old[a] - old[b]
-                d = find_mic([d], atoms.cell, atoms._pbc)[0][0]
-                dv = p[a] / masses[a] - p[b] / masses[b]
-                m = 1 / (1 / masses[a] + 1 / masses[b])
-                x = -np.dot(dv, d) / cd**2
-                if abs(x) > self.tolerance:
-                    p[a] += x * m * d
-                    p[b] -= x * m * d
+            for j in groups:
+                dv = (p[a[j]] / masses[a[j], np.newaxis] -
+                      p[b[j]] / masses[b[j], np.newaxis])
+                x = -(dv * d[j]).sum(1) / self.bondlengths[j]**2
+                k = abs(x) > self.tolerance
+                if k.any():
+                    j = j[k]
+                    dp = (x[k] * m[j])[:, np.newaxis] * d[j]
+                    p[a[j]] += dp
+                    p[b[j]] -= dp
                     converged = False
             if converged:
                 break
@@ -316,12 +348,9 @@ class FixBondLengths(FixConstraint):
         self.constraint_forces += forces
 
     def initialize_bond_lengths(self, atoms):
-        bondlengths = np.zeros(len(self.pairs))
-
-        for i, ab in enumerate(self.pairs):
-            bondlengths[i] = atoms.get_distance(ab[0], ab[1], mic=True)
-
-        return bondlengths
+        a, b = self.pairs.T
+        return np.asarray(find_mic(atoms.positions[a] - atoms.positions[b],
+                                   atoms.cell, atoms._pbc)[1], float)
 
     def get_indices(self):
         return np.unique(self.pairs.ravel())
@@ -62,11 +62,15 @@ class CLICommand:
             help='Long description of selected row')
         add('-i', '--insert-into', metavar='db-name',
             help='Insert selected rows into another database.')
-        add('-a', '--add-from-file', metavar='filename',
+        add('-a', '--add-from-file', metavar='filename', action='append',
             help='Add configuration(s) from file.  '
             'If the file contains more than one configuration then you can '
             'use the syntax filename@: to add all of them.  Default is to '
-            'only add the last.')
+            'only add the last.  Use -a several times to add from several '
+            'files.')
+        add('--jobs', type=int, default=1, metavar='N',
+            help='Read the files given with --add-from-file using N '
+            'processes (use 0 for the number of CPUs).')
         add('-k', '--add-key-value-pairs', metavar='key1=val1,key2=val2,...',
             help='Add key-value pairs to selected rows.  Values must '
             'be numbers or strings and keys must follow the same rules as '
@@ -201,13 +205,13 @@ def main(args):
         return
 
     if args.add_from_file:
-        filename = args.add_from_file
-        configs = ase.io.read(filename)
-        if not isinstance(configs, list):
-            configs = [configs]
-        for atoms in configs:
-            db.write(atoms, key_value_pairs=add_key_value_pairs)
-        out('Added ' + plural(len(configs), 'row'))
+        configs = (atoms
+                   for result in ase.io.iread_files(args.add_from_file,
+                                                    jobs=args.jobs or None)
+                   for atoms in result.images)
+        ids = db.write_many((atoms, add_key_value_pairs)
+                            for atoms in configs)
+        out('Added ' + plural(len(ids), 'row'))
         return
 
     if args.count:
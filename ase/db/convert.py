@@ -1,3 +1,14 @@
+"""Convert an ASE database file to the newest format.
+
+Use::
+
+    python -m ase.db.convert name.db
+
+The old file is kept as name.old.db.  Converting a file from before
+version 9 will move the arrays in the data of the rows from JSON text to
+the binary data_arrays table.
+"""
+
 import optparse
 import os
 
@@ -31,7 +42,7 @@ def convert(name, opts):
                         kvp[key] = np.nan
 
             atoms = row.toatoms()
-            if opts.remove_constrints:
+            if opts.remove_constraints:
                 atoms.constraints = []
             con2.write(atoms, data=row.get('data'), **kvp)
 
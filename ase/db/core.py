@@ -330,6 +330,58 @@ class Database:
         check(key_value_pairs)
         return 1
 
+    @parallel_function
+    @lock
+    def write_many(self, images, chunksize=1000):
+        """Write many atoms objects to database.
+
+        images: iterable
+            Atoms or AtomsRow objects, or (atoms, key_value_pairs) or
+            (atoms, key_value_pairs, data) tuples.  This can be a
+            generator, so that all the structures don't need to be in
+            memory at the same time.
+        chunksize: int
+            Number of rows inserted together.  For the SQLite and
+            PostgreSQL backends, each chunk is written with a single
+            statement per table and committed in one transaction.
+
+        Example::
+
+            ids = connection.write_many((atoms, {'name': name})
+                                        for atoms, name in structures)
+
+        Returns list of integer ids of the new rows.
+        """
+
+        def chunks():
+            chunk = []
+            for image in images:
+                if isinstance(image, tuple):
+                    atoms = image[0]
+                    key_value_pairs = dict(image[1]) if len(image) > 1 else {}
+                    data = image[2] if len(image) > 2 else {}
+                else:
+                    atoms = image
+                    key_value_pairs = {}
+                    data = {}
+                if atoms is None:
+                    atoms = Atoms()
+                chunk.append((atoms, key_value_pairs, data))
+                if len(chunk) == chunksize:
+                    yield chunk
+                    chunk = []
+            if chunk:
+                yield chunk
+
+        return self._write_many(chunks())
+
+    def _write_many(self, chunks):
+        ids = []
+        for chunk in chunks:
+            for atoms, key_value_pairs, data in chunk:
+                ids.append(self._write(atoms, key_value_pairs, data))
+        return ids
+
     @parallel_function
     @lock
     def reserve(self, **key_value_pairs):
@@ -413,7 +465,7 @@ class Database:
     @parallel_generator
     def select(self, selection=None, filter=None, explain=False,
                verbosity=1, limit=None, offset=0, sort=None,
-               include_data=True, columns='all', **kwargs):
+               include_data=True, columns='all', fetchsize=1000, **kwargs):
         """Select rows.
 
         Return AtomsRow iterator with results.  Selection is done
@@ -449,6 +501,9 @@ class Database:
             Specify which columns from the SQL table to include.
             For example, if only the row id and the energy is needed,
             queries can be speeded up by setting columns=['id', 'energy'].
+        fetchsize: int
+            Number of rows read from the database at a time.  Rows are
+            streamed, so only this many rows are kept in memory.
         """
 
         if sort:
@@ -464,7 +519,7 @@ class Database:
                                 verbosity=verbosity,
                                 limit=limit, offset=offset, sort=sort,
                                 include_data=include_data,
-                                columns=columns):
+                                columns=columns, fetchsize=fetchsize):
             if filter is None or filter(row):
                 yield row
 
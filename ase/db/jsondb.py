@@ -21,19 +21,47 @@ class JSONDatabase(Database, object):
     def _write(self, atoms, key_value_pairs, data, id):
         Database._write(self, atoms, key_value_pairs, data)
 
-        bigdct = {}
-        ids = []
-        nextid = 1
+        bigdct, ids, nextid = self._read_json_if_present()
 
+        dct = self._get_dict(atoms, key_value_pairs, data, now())
+
+        if id is None:
+            id = nextid
+            ids.append(id)
+            nextid += 1
+        else:
+            assert id in bigdct
+
+        bigdct[id] = dct
+        self._write_json(bigdct, ids, nextid)
+        return id
+
+    def _write_many(self, chunks):
+        # Read and write the file only once:
+        bigdct, ids, nextid = self._read_json_if_present()
+        newids = []
+        for chunk in chunks:
+            mtime = now()
+            for atoms, key_value_pairs, data in chunk:
+                Database._write(self, atoms, key_value_pairs, data)
+                bigdct[nextid] = self._get_dict(atoms, key_value_pairs, data,
+                                                mtime)
+                newids.append(nextid)
+                nextid += 1
+        ids.extend(newids)
+        self._write_json(bigdct, ids, nextid)
+        return newids
+
+    def _read_json_if_present(self):
         if (isinstance(self.filename, basestring) and
             os.path.isfile(self.filename)):
             try:
-                bigdct, ids, nextid = self._read_json()
+                return self._read_json()
             except (SyntaxError, ValueError):
                 pass
+        return {}, [], 1
 
-        mtime = now()
-
+    def _get_dict(self, atoms, key_value_pairs, data, mtime):
         if isinstance(atoms, AtomsRow):
             row = atoms
         else:
@@ -59,16 +87,7 @@ class JSONDatabase(Database, object):
         if constraints:
             dct['constraints'] = constraints
 
-        if id is None:
-            id = nextid
-            ids.append(id)
-            nextid += 1
-        else:
-            assert id in bigdct
-
-        bigdct[id] = dct
-        self._write_json(bigdct, ids, nextid)
-        return id
+        return dct
 
     def _read_json(self):
         if isinstance(self.filename, basestring):
@@ -129,7 +148,7 @@ class JSONDatabase(Database, object):
 
     def _select(self, keys, cmps, explain=False, verbosity=0,
                 limit=None, offset=0, sort=None, include_data=True,
-                columns='all'):
+                columns='all', fetchsize=None):
         if explain:
             yield {'explain': (0, 0, 0, 'scan table')}
             return
@@ -37,8 +37,8 @@ class Connection:
     def __init__(self, con):
         self.con = con
 
-    def cursor(self):
-        return Cursor(self.con.cursor())
+    def cursor(self, name=None):
+        return Cursor(self.con.cursor(name))
 
     def commit(self):
         self.con.commit()
@@ -57,6 +57,9 @@ class Cursor:
     def fetchall(self):
         return self.cur.fetchall()
 
+    def fetchmany(self, size):
+        return self.cur.fetchmany(size)
+
     def execute(self, statement, *args):
         self.cur.execute(statement.replace('?', '%s'), *args)
 
@@ -65,7 +68,7 @@ class Cursor:
             N = len(args[0][0])
         else:
             return
-        if 'INSERT INTO systems' in statement:
+        if 'INSERT INTO systems VALUES (DEFAULT' in statement:
             q = 'DEFAULT' + ', ' + ', '.join('?' * N)  # DEFAULT for id
         else:
             q = ', '.join('?' * N)
@@ -108,9 +111,9 @@ class PostgreSQLDatabase(SQLite3Database):
     def _connect(self):
         return Connection(connect(self.filename))
 
-    def _initialize(self, con):
+    def _initialize(self, con, create_indices=True):
         if self.initialized:
-            return
+            return False
 
         self._metadata = {}
 
@@ -127,14 +130,14 @@ class PostgreSQLDatabase(SQLite3Database):
         table_name='information' and table_schema='{}');
         """.format(schema))
 
-        if not cur.fetchone()[0]:  # information schema doesn't exist.
+        new = not cur.fetchone()[0]
+        if new:  # information schema doesn't exist.
             # Initialize database:
             sql = ';\n'.join(init_statements)
             sql = schema_update(sql)
             cur.execute(sql)
-            if self.create_indices:
-                cur.execute(';\n'.join(index_statements))
-                cur.execute(';\n'.join(jsonb_indices))
+            if self.create_indices and create_indices:
+                self._create_indices(cur)
             con.commit()
             self.version = VERSION
         else:
@@ -148,6 +151,39 @@ class PostgreSQLDatabase(SQLite3Database):
         assert 5 < self.version <= VERSION
 
         self.initialized = True
+        return new
+
+    def _create_indices(self, cur):
+        cur.execute(';\n'.join(index_statements))
+        cur.execute(';\n'.join(jsonb_indices))
+
+    def _reserve_ids(self, cur, n):
+        cur.execute('SELECT nextval(\'systems_id_seq\') '
+                    'FROM generate_series(1, ?)', [n])
+        return [int(id) for id, in cur.fetchall()]
+
+    def _fetch(self, con, keys, cmps, sort, order, sort_table, what,
+               limit, offset, fetchsize, verbosity):
+        # Readers don't block writers in PostgreSQL, so we can use a
+        # server-side (named) cursor for the whole selection:
+        sql, args = self.create_select_statement(keys, cmps, sort, order,
+                                                 sort_table, what)
+        if limit:
+            sql += '\nLIMIT {0}'.format(limit)
+        if offset:
+            sql += '\nOFFSET {0}'.format(offset)
+
+        if verbosity == 2:
+            print(sql, args)
+
+        cur = con.cursor('select')
+        cur.execute(sql, args)
+        while True:
+            rows = cur.fetchmany(fetchsize)
+            if not rows:
+                break
+            for row in rows:
+                yield row
 
     def get_last_id(self, cur):
         cur.execute('SELECT last_value FROM systems_id_seq')
@@ -182,4 +218,8 @@ def schema_update(sql):
         sql = sql.replace('{} TEXT,'.format(column),
                           '{} JSONB,'.format(column))
 
+    # Arrays in data are kept in the JSONB column, but the data_arrays
+    # table must exist:
+    sql = sql.replace('BLOB', 'BYTEA')
+
     return sql
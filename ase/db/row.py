@@ -12,8 +12,28 @@ from ase.io.jsonio import decode
 from ase.utils import formula_metal, basestring
 
 
+class LazyArray:
+    """Placeholder for an array that is read from the database when used."""
+    def __init__(self, read, dtype, shape):
+        self._read = read  # function returning the array
+        self.dtype = np.dtype(dtype)
+        self.shape = tuple(shape)
+        self.array = None
+
+    def read(self):
+        if self.array is None:
+            self.array = self._read()
+        return self.array
+
+    def __repr__(self):
+        return '<ndarray shape={0} dtype={1}>'.format(self.shape, self.dtype)
+
+
 class FancyDict(dict):
-    """Dictionary with keys available as attributes also."""
+    """Dictionary with keys available as attributes also.
+
+    Values that are LazyArray objects are read when they are first
+    looked up."""
     def __getattr__(self, key):
         if key not in self:
             return dict.__getattribute__(self, key)
@@ -22,6 +42,38 @@ class FancyDict(dict):
             return FancyDict(value)
         return value
 
+    def __getitem__(self, key):
+        value = dict.__getitem__(self, key)
+        if isinstance(value, LazyArray):
+            value = value.read()
+            dict.__setitem__(self, key, value)
+        return value
+
+    def __iter__(self):
+        # Makes dict(self) and friends use __getitem__:
+        return iter(self.keys())
+
+    def get(self, key, default=None):
+        if key in self:
+            return self[key]
+        return default
+
+    def items(self):
+        return [(key, self[key]) for key in self.keys()]
+
+    def values(self):
+        return [self[key] for key in self.keys()]
+
+    def pop(self, key, *default):
+        if key in self:
+            value = self[key]
+            del self[key]
+            return value
+        return dict.pop(self, key, *default)
+
+    def copy(self):
+        return FancyDict(dict.items(self))
+
     def __dir__(self):
         return self.keys()  # for tab-completion
 
@@ -11,10 +11,12 @@ Versions:
 6) Use REAL for magmom and drop possibility for non-collinear spin
 7) Volume can be None
 8) Added name='metadata' row to "information" table
+9) Arrays in data are stored as binary blobs in the "data_arrays" table
 """
 
 from __future__ import absolute_import, print_function
 import json
+import functools
 import numbers
 import os
 import sqlite3
@@ -24,7 +26,7 @@ import numpy as np
 
 import ase.io.jsonio
 from ase.data import atomic_numbers
-from ase.db.row import AtomsRow
+from ase.db.row import AtomsRow, LazyArray
 from ase.db.core import Database, ops, now, lock, invop, parse_selection
 from ase.parallel import parallel_function
 from ase.utils import basestring
@@ -32,7 +34,7 @@ from ase.utils import basestring
 if sys.version >= '3':
     buffer = memoryview
 
-VERSION = 8
+VERSION = 9
 
 init_statements = [
     """CREATE TABLE systems (
@@ -93,6 +95,12 @@ init_statements = [
     id INTEGER,
     FOREIGN KEY (id) REFERENCES systems(id))""",
 
+    """CREATE TABLE data_arrays (
+    key TEXT,
+    value BLOB,
+    id INTEGER,
+    FOREIGN KEY (id) REFERENCES systems(id))""",
+
     """CREATE TABLE information (
     name TEXT,
     value TEXT)""",
@@ -107,10 +115,11 @@ index_statements = [
     'CREATE INDEX species_index ON species(Z)',
     'CREATE INDEX key_index ON keys(key)',
     'CREATE INDEX text_index ON text_key_values(key)',
-    'CREATE INDEX number_index ON number_key_values(key)']
+    'CREATE INDEX number_index ON number_key_values(key)',
+    'CREATE INDEX data_arrays_index ON data_arrays(id)']
 
 all_tables = ['systems', 'species', 'keys',
-              'text_key_values', 'number_key_values']
+              'text_key_values', 'number_key_values', 'data_arrays']
 
 
 def float_if_not_none(x):
@@ -180,21 +189,26 @@ class SQLite3Database(Database, object):
         self.connection.close()
         self.connection = None
 
-    def _initialize(self, con):
+    def _initialize(self, con, create_indices=True):
+        """Read version and metadata or create the tables.
+
+        Returns True if the tables were created.  With
+        create_indices=False, creating the indices is left to the caller.
+        """
         if self.initialized:
-            return
+            return False
 
         self._metadata = {}
 
         cur = con.execute(
             'SELECT COUNT(*) FROM sqlite_master WHERE name="systems"')
 
-        if cur.fetchone()[0] == 0:
+        new = cur.fetchone()[0] == 0
+        if new:
             for statement in init_statements:
                 con.execute(statement)
-            if self.create_indices:
-                for statement in index_statements:
-                    con.execute(statement)
+            if self.create_indices and create_indices:
+                self._create_indices(con.cursor())
             con.commit()
             self.version = VERSION
         else:
@@ -227,10 +241,14 @@ class SQLite3Database(Database, object):
                           'Use: python -m ase.db.convert ' + self.filename)
 
         self.initialized = True
+        return new
+
+    def _create_indices(self, cur):
+        for statement in index_statements:
+            cur.execute(statement)
 
     def _write(self, atoms, key_value_pairs, data, id):
         Database._write(self, atoms, key_value_pairs, data)
-        encode = self.encode
 
         con = self.connection or self._connect()
         self._initialize(con)
@@ -238,10 +256,93 @@ class SQLite3Database(Database, object):
 
         mtime = now()
 
-        blob = self.blob
+        # Arrays of the old row may be needed for the new values, so
+        # we delete the old row after getting them:
+        row, key_value_pairs, arrays, values = self._get_values(
+            atoms, key_value_pairs, data, mtime, update=bool(id))
 
-        text_key_values = []
-        number_key_values = []
+        if id:
+            self._delete(cur, [id], ['keys', 'text_key_values',
+                                     'number_key_values', 'species',
+                                     'data_arrays'])
+
+        if id is None:
+            q = self.default + ', ' + ', '.join('?' * len(values))
+            cur.execute('INSERT INTO systems VALUES ({})'.format(q),
+                        values)
+            id = self.get_last_id(cur)
+        else:
+            q = ', '.join(name + '=?' for name in self.columnnames[1:])
+            cur.execute('UPDATE systems SET {} WHERE id=?'.format(q),
+                        values + (id,))
+
+        self._insert_keys(cur, [(row, key_value_pairs, arrays, id)])
+
+        if self.connection is None:
+            con.commit()
+            con.close()
+
+        return id
+
+    def _write_many(self, chunks):
+        con = self.connection or self._connect()
+        # Indices of a new database are created after all rows are
+        # inserted, which is much faster than updating them for each row:
+        new = self._initialize(con, create_indices=False)
+
+        ids = []
+        try:
+            for chunk in chunks:
+                ids.extend(self._insert_many(con.cursor(), chunk))
+                if self.connection is None:
+                    con.commit()
+        finally:
+            if self.connection is None:
+                con.close()
+            if new and self.create_indices:
+                con = self.connection or self._connect()
+                self._create_indices(con.cursor())
+                if self.connection is None:
+                    con.commit()
+                    con.close()
+
+        return ids
+
+    def _insert_many(self, cur, chunk):
+        """Insert rows using one statement per table."""
+        for atoms, key_value_pairs, data in chunk:
+            Database._write(self, atoms, key_value_pairs, data)
+
+        mtime = now()
+        ids = self._reserve_ids(cur, len(chunk))
+        rows = []
+        systems = []
+        for id, (atoms, key_value_pairs, data) in zip(ids, chunk):
+            row, key_value_pairs, arrays, values = self._get_values(
+                atoms, key_value_pairs, data, mtime)
+            rows.append((row, key_value_pairs, arrays, id))
+            systems.append((id,) + values)
+
+        q = ', '.join('?' * len(systems[0]))
+        cur.executemany('INSERT INTO systems VALUES ({})'.format(q), systems)
+        self._insert_keys(cur, rows)
+        return ids
+
+    def _reserve_ids(self, cur, n):
+        """Get ids for n new rows.
+
+        Rows inserted with explicit ids update the sequence of the
+        AUTOINCREMENT column."""
+        id = self.get_last_id(cur)
+        return list(range(id + 1, id + n + 1))
+
+    def _get_values(self, atoms, key_value_pairs, data, mtime, update=False):
+        """Convert atoms to the values of a row in the systems table.
+
+        Returns the AtomsRow, the key-value pairs, the (key, blob) pairs
+        for the data_arrays table and the values without the id."""
+        encode = self.encode
+        blob = self.blob
 
         if not isinstance(atoms, AtomsRow):
             row = AtomsRow(atoms)
@@ -250,12 +351,8 @@ class SQLite3Database(Database, object):
         else:
             row = atoms
 
-        if id:
-            self._delete(cur, [id], ['keys', 'text_key_values',
-                                     'number_key_values', 'species'])
-        else:
-            if not key_value_pairs:
-                key_value_pairs = row.key_value_pairs
+        if not update and not key_value_pairs:
+            key_value_pairs = row.key_value_pairs
 
         constraints = row._constraints
         if constraints:
@@ -286,7 +383,9 @@ class SQLite3Database(Database, object):
 
         if not data:
             data = row._data
+        arrays = []
         if not isinstance(data, basestring):
+            data, arrays = self._split_data(data)
             data = encode(data)
 
         values += (row.get('energy'),
@@ -306,44 +405,101 @@ class SQLite3Database(Database, object):
                    float(row.mass),
                    float(row.charge))
 
-        if id is None:
-            q = self.default + ', ' + ', '.join('?' * len(values))
-            cur.execute('INSERT INTO systems VALUES ({})'.format(q),
-                        values)
-            id = self.get_last_id(cur)
-        else:
-            q = ', '.join(name + '=?' for name in self.columnnames[1:])
-            cur.execute('UPDATE systems SET {} WHERE id=?'.format(q),
-                        values + (id,))
-
-        count = row.count_atoms()
-        if count:
-            species = [(atomic_numbers[symbol], n, id)
-                       for symbol, n in count.items()]
-            cur.executemany('INSERT INTO species VALUES (?, ?, ?)',
-                            species)
+        return row, key_value_pairs, arrays, values
+
+    def _split_data(self, data):
+        """Take numeric arrays out of the data dict.
+
+        Returns the rest of the data and a list of (key, blob) pairs.
+        The dtypes and shapes of the arrays are kept in the
+        "__ndarrays__" entry of the data."""
+        if not isinstance(data, dict):
+            return data, []
+        rest = {}
+        arrays = []
+        shapes = {}
+        for key, value in dict.items(data):
+            if isinstance(value, LazyArray):
+                value = value.read()
+            if (self.type == 'db' and self.version >= 9 and
+                isinstance(key, basestring) and
+                isinstance(value, np.ndarray) and
+                value.dtype.kind in 'biufc'):
+                shape = value.shape
+                value = np.ascontiguousarray(value.reshape(-1),
+                                             value.dtype.newbyteorder('<'))
+                shapes[key] = {'dtype': value.dtype.str, 'shape': shape}
+                arrays.append((key, buffer(value)))
+            else:
+                rest[key] = value
+        if shapes:
+            rest['__ndarrays__'] = shapes
+        return rest, arrays
 
+    def _read_array(self, id, key, dtype, shape):
+        """Read array from the data_arrays table."""
+        con = self.connection or self._connect()
+        cur = con.cursor()
+        cur.execute('SELECT value FROM data_arrays WHERE id=? AND key=?',
+                    (id, key))
+        result = cur.fetchone()
+        if self.connection is None:
+            con.close()
+        if result is None:
+            raise KeyError('No array {0!r} for row {1} (deleted?)'
+                           .format(key, id))
+        buf = result[0]
+        dtype = np.dtype(dtype)
+        if len(buf) == 0:
+            return np.zeros(shape, dtype)
+        array = np.frombuffer(buf, dtype).reshape(shape)
+        return array.astype(dtype.newbyteorder('='))  # writable copy
+
+    def _decode_data(self, txt, id):
+        """Decode data and insert placeholders for the arrays."""
+        data = self.decode(txt)
+        for key, dct in data.pop('__ndarrays__').items():
+            key = str(key)
+            dtype = dct['dtype']
+            shape = tuple(int(n) for n in dct['shape'])
+            read = functools.partial(self._read_array, id, key, dtype, shape)
+            data[ase.io.jsonio.intkey(key)] = LazyArray(read, dtype, shape)
+        return data
+
+    def _insert_keys(self, cur, rows):
+        """Fill species, key-value and data_arrays tables.
+
+        rows is a list of (row, kvp, arrays, id) tuples."""
+        species = []
         text_key_values = []
         number_key_values = []
-        for key, value in key_value_pairs.items():
-            if isinstance(value, (numbers.Real, np.bool_)):
-                number_key_values.append([key, float(value), id])
-            else:
-                assert isinstance(value, basestring)
-                text_key_values.append([key, value, id])
+        keys = []
+        data_arrays = []
+        for row, key_value_pairs, arrays, id in rows:
+            data_arrays.extend((key, value, id) for key, value in arrays)
+            count = row.count_atoms()
+            species.extend((atomic_numbers[symbol], n, id)
+                           for symbol, n in count.items())
+
+            for key, value in key_value_pairs.items():
+                if isinstance(value, (numbers.Real, np.bool_)):
+                    number_key_values.append([key, float(value), id])
+                else:
+                    assert isinstance(value, basestring)
+                    text_key_values.append([key, value, id])
+                keys.append((key, id))
 
+        if species:
+            cur.executemany('INSERT INTO species VALUES (?, ?, ?)',
+                            species)
         cur.executemany('INSERT INTO text_key_values VALUES (?, ?, ?)',
                         text_key_values)
         cur.executemany('INSERT INTO number_key_values VALUES (?, ?, ?)',
                         number_key_values)
-        cur.executemany('INSERT INTO keys VALUES (?, ?)',
-                        [(key, id) for key in key_value_pairs])
-
-        if self.connection is None:
-            con.commit()
-            con.close()
-
-        return id
+        cur.executemany('INSERT INTO keys VALUES (?, ?)', keys)
+        if data_arrays:
+            cur.executemany('INSERT INTO data_arrays VALUES (?, ?, ?)',
+                            data_arrays)
 
     def get_last_id(self, cur):
         cur.execute('SELECT seq FROM sqlite_sequence WHERE name="systems"')
@@ -420,7 +576,13 @@ class SQLite3Database(Database, object):
         if values[25] != '{}':
             dct['key_value_pairs'] = decode(values[25])
         if len(values) >= 27 and values[26] != 'null':
-            dct['data'] = decode(values[26])
+            data = values[26]
+            if not isinstance(data, basestring):
+                data = decode(data)
+            elif '"__ndarrays__"' in data:
+                data = self._decode_data(data, values[0])
+            # else: the JSON text is decoded when row.data is first used
+            dct['data'] = data
 
         return AtomsRow(dct)
 
@@ -538,7 +700,7 @@ class SQLite3Database(Database, object):
 
     def _select(self, keys, cmps, explain=False, verbosity=0,
                 limit=None, offset=0, sort=None, include_data=True,
-                columns='all'):
+                columns='all', fetchsize=1000):
         con = self._connect()
         self._initialize(con)
 
@@ -549,8 +711,9 @@ class SQLite3Database(Database, object):
         if columns == 'all':
             columnindex = list(range(26))
         else:
+            # The id is always needed for reading the rows page by page
             columnindex = [c for c in range(0, 26)
-                           if self.columnnames[c] in columns]
+                           if c == 0 or self.columnnames[c] in columns]
         if include_data:
             columnindex.append(26)
 
@@ -585,44 +748,115 @@ class SQLite3Database(Database, object):
                          for name in
                          np.array(self.columnnames)[np.array(columnindex)])
 
-        sql, args = self.create_select_statement(keys, cmps, sort, order,
-                                                 sort_table, what)
-
         if explain:
+            sql, args = self.create_select_statement(keys, cmps, sort, order,
+                                                     sort_table, what)
             sql = 'EXPLAIN QUERY PLAN ' + sql
-
-        if limit:
-            sql += '\nLIMIT {0}'.format(limit)
-
-        if offset:
-            sql += '\nOFFSET {0}'.format(offset)
-
-        if verbosity == 2:
-            print(sql, args)
-
-        cur = con.cursor()
-        cur.execute(sql, args)
-        if explain:
+            if limit:
+                sql += '\nLIMIT {0}'.format(limit)
+            if offset:
+                sql += '\nOFFSET {0}'.format(offset)
+            cur = con.cursor()
+            cur.execute(sql, args)
             for row in cur.fetchall():
                 yield {'explain': row}
+            return
+
+        n = 0
+        for shortvalues in self._fetch(con, keys, cmps, sort, order,
+                                       sort_table, what, limit, offset,
+                                       fetchsize, verbosity):
+            values[columnindex] = shortvalues
+            yield self._convert_tuple_to_row(tuple(values))
+            n += 1
+
+        if sort and sort_table != 'systems':
+            # Yield rows without sort key last:
+            if limit is not None:
+                if n == limit:
+                    return
+                limit -= n
+            for row in self._select(keys + ['-' + sort], cmps,
+                                    limit=limit, offset=offset,
+                                    include_data=include_data,
+                                    columns=columns, fetchsize=fetchsize):
+                yield row
+
+    def _fetch(self, con, keys, cmps, sort, order, sort_table, what,
+               limit, offset, fetchsize, verbosity):
+        """Yield the selected values, reading fetchsize rows at a time.
+
+        Each page of rows is read with its own query, so that the
+        database is not locked while the caller works on the rows and
+        can write to the database.  A page starts after the (sort value,
+        id) of the last row of the previous page, so that the rows are
+        not sorted again for every page.  Rows with equal sort values
+        (and unsorted rows) are returned in order of increasing id."""
+        if sort:
+            if sort_table == 'systems':
+                column = 'systems.' + sort
+            else:
+                column = 'sort_table.value'
+            what += ', ' + column  # needed for finding the next page
+        last = None  # (sort value, id) of last row
+        while True:
+            n = fetchsize
+            if limit:
+                n = min(n, limit)
+            extra = []
+            if last is not None and not sort:
+                extra = [('id', '>', last[1])]
+            sql, args = self.create_select_statement(
+                keys, cmps + extra, sort, order, sort_table, what)
+            if sort:
+                if last is not None:
+                    sql, args = self._next_page(sql, args, column, order,
+                                                last)
+                sql += ', systems.id'
+            else:
+                sql += '\nORDER BY systems.id'
+            sql += '\nLIMIT {0}'.format(n)
+            if offset:
+                sql += '\nOFFSET {0}'.format(offset)
+
+            if verbosity == 2:
+                print(sql, args)
+
+            cur = con.cursor()
+            cur.execute(sql, args)
+            rows = cur.fetchall()
+            for row in rows:
+                if sort:
+                    row = row[:-1]
+                yield row
+
+            if len(rows) < n:
+                return
+            if limit:
+                limit -= n
+                if limit == 0:
+                    return
+            offset = 0
+            last = (rows[-1][-1] if sort else None, rows[-1][0])
+
+    def _next_page(self, sql, args, column, order, last):
+        """Add condition for rows sorted after last=(value, id) to sql."""
+        value, id = last
+        if value is None:
+            # Rows without value are last:
+            condition = '{0} IS NULL AND systems.id > ?'.format(column)
+            newargs = [id]
         else:
-            n = 0
-            for shortvalues in cur.fetchall():
-                values[columnindex] = shortvalues
-                yield self._convert_tuple_to_row(tuple(values))
-                n += 1
-
-            if sort and sort_table != 'systems':
-                # Yield rows without sort key last:
-                if limit is not None:
-                    if n == limit:
-                        return
-                    limit -= n
-                for row in self._select(keys + ['-' + sort], cmps,
-                                        limit=limit, offset=offset,
-                                        include_data=include_data,
-                                        columns=columns):
-                    yield row
+            condition = ('({0} IS NULL OR {0} {1} ? OR '
+                         '({0} = ? AND systems.id > ?))'
+                         .format(column, '>' if order == 'ASC' else '<'))
+            newargs = [value, value, id]
+        i = sql.index('\nORDER BY')
+        if '\n  WHERE\n' in sql[:i]:
+            condition = ' AND\n  ' + condition
+        else:
+            condition = '\n  WHERE\n  ' + condition
+        return sql[:i] + condition + sql[i:], args + newargs
 
     @parallel_function
     def count(self, selection=None, **kwargs):
@@ -645,12 +879,15 @@ class SQLite3Database(Database, object):
         if len(ids) == 0:
             return
         con = self._connect()
+        self._initialize(con)
         self._delete(con.cursor(), ids)
         con.commit()
         con.close()
 
     def _delete(self, cur, ids, tables=None):
         tables = tables or all_tables[::-1]
+        if self.version < 9:
+            tables = [table for table in tables if table != 'data_arrays']
         for table in tables:
             cur.execute('DELETE FROM {} WHERE id in ({});'.
                         format(table, ', '.join([str(id) for id in ids])))
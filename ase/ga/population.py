@@ -1,5 +1,6 @@
 """ Implementaiton of a population for maintaining a GA population and
 proposing structures to pair. """
+from bisect import bisect_left, bisect_right
 from random import randrange, random
 from math import tanh, sqrt, exp
 from operator import itemgetter
@@ -11,15 +12,85 @@ from ase.ga import get_raw_score
 
 def count_looks_like(a, all_cand, comp):
     """Utility method for counting occurrences."""
+    others = [b for b in all_cand if a.info['confid'] != b.info['confid']]
+    if hasattr(comp, 'looks_like_many'):
+        return sum(comp.looks_like_many(a, others))
     n = 0
-    for b in all_cand:
-        if a.info['confid'] == b.info['confid']:
-            continue
+    for b in others:
         if comp.looks_like(a, b):
             n += 1
     return n
 
 
+class CandidateIndex(object):
+    """Index for finding the candidates that may look like a structure.
+
+    If the comparator has a get_index_key() method (see
+    :class:`~ase.ga.standard_comparators.InteratomicDistanceComparator`),
+    candidates are put in buckets of equal key and sorted by energy
+    within each bucket.  Only candidates inside the energy window of
+    the comparator and with a fingerprint close enough are passed on to
+    looks_like().  With other comparators all candidates are returned.
+    """
+    def __init__(self, comparator):
+        self.comparator = comparator
+        self.indexed = hasattr(comparator, 'get_index_key')
+        self.candidates = []  # used if the comparator has no index key
+        self.buckets = {}  # key -> (energies, fingerprints, candidates)
+
+    def __len__(self):
+        if not self.indexed:
+            return len(self.candidates)
+        return sum(len(b[2]) for b in self.buckets.values())
+
+    def add(self, a):
+        if not self.indexed:
+            self.candidates.append(a)
+            return
+        key, e, x, tol = self.comparator.get_index_key(a)
+        if key not in self.buckets:
+            self.buckets[key] = ([], np.zeros((0, len(x))), [])
+        energies, X, candidates = self.buckets[key]
+        i = bisect_right(energies, e)
+        energies.insert(i, e)
+        candidates.insert(i, a)
+        self.buckets[key] = (energies, np.insert(X, i, x, axis=0),
+                             candidates)
+
+    def remove(self, a):
+        if not self.indexed:
+            i = [id(b) for b in self.candidates].index(id(a))
+            del self.candidates[i]
+            return
+        key, e, x, tol = self.comparator.get_index_key(a)
+        energies, X, candidates = self.buckets[key]
+        i = bisect_left(energies, e)
+        while candidates[i] is not a:
+            i += 1
+        del energies[i]
+        del candidates[i]
+        self.buckets[key] = (energies, np.delete(X, i, axis=0), candidates)
+
+    def neighbors(self, a):
+        """Candidates that may look like a (in order of energy)."""
+        if not self.indexed:
+            return list(self.candidates)
+        key, e, x, tol = self.comparator.get_index_key(a)
+        if key not in self.buckets:
+            return []
+        energies, X, candidates = self.buckets[key]
+        dE = self.comparator.dE
+        i1 = bisect_left(energies, e - dE)
+        i2 = bisect_right(energies, e + dE)
+        X = X[i1:i2]
+        ok = (abs(X - x) <= tol * np.maximum(X, x)).all(axis=1)
+        return [candidates[i1 + i] for i in np.where(ok)[0]]
+
+    def count_looks_like(self, a):
+        """Count the candidates (other than a) that look like a."""
+        return count_looks_like(a, self.neighbors(a), self.comparator)
+
+
 class Population(object):
     """Population class which maintains the current population
     and proposes which candidates to pair together.
@@ -77,21 +148,27 @@ class Population(object):
 
         # Fill up the population with the self.pop_size most stable
         # unique candidates.
+        self.pop_index = CandidateIndex(self.comparator)
         i = 0
         while i < len(all_cand) and len(self.pop) < self.pop_size:
             c = all_cand[i]
             i += 1
             eq = False
+            neighbors = set(id(a) for a in self.pop_index.neighbors(c))
             for a in self.pop:
-                if self.comparator.looks_like(a, c):
+                if id(a) in neighbors and self.comparator.looks_like(a, c):
                     eq = True
                     break
             if not eq:
                 self.pop.append(c)
+                self.pop_index.add(c)
+
+        self.index = CandidateIndex(self.comparator)
+        for c in all_cand:
+            self.index.add(c)
 
         for a in self.pop:
-            a.info['looks_like'] = count_looks_like(a, all_cand,
-                                                    self.comparator)
+            a.info['looks_like'] = self.index.count_looks_like(a)
 
         self.all_cand = all_cand
         self.__calc_participation__()
@@ -124,6 +201,7 @@ class Population(object):
         for a in new_cand:
             self.__add_candidate__(a)
             self.all_cand.append(a)
+            self.index.add(a)
         self.__calc_participation__()
         self._write_log()
 
@@ -170,14 +248,15 @@ class Population(object):
 
         # check if the new candidate should
         # replace a similar structure in the population
+        neighbors = set(id(b) for b in self.pop_index.neighbors(a))
         for (i, b) in enumerate(self.pop):
-            if self.comparator.looks_like(a, b):
+            if id(b) in neighbors and self.comparator.looks_like(a, b):
                 if get_raw_score(b) < raw_score_a:
                     del self.pop[i]
-                    a.info['looks_like'] = count_looks_like(a,
-                                                            self.all_cand,
-                                                            self.comparator)
+                    self.pop_index.remove(b)
+                    a.info['looks_like'] = self.index.count_looks_like(a)
                     self.pop.append(a)
+                    self.pop_index.add(a)
                     self.pop.sort(key=lambda x: get_raw_score(x),
                                   reverse=True)
                 return
@@ -185,13 +264,13 @@ class Population(object):
         # the new candidate needs to be added, so remove the highest
         # energy one
         if len(self.pop) == self.pop_size:
+            self.pop_index.remove(self.pop[-1])
             del self.pop[-1]
 
         # add the new candidate
-        a.info['looks_like'] = count_looks_like(a,
-                                                self.all_cand,
-                                                self.comparator)
+        a.info['looks_like'] = self.index.count_looks_like(a)
         self.pop.append(a)
+        self.pop_index.add(a)
         self.pop.sort(key=lambda x: get_raw_score(x), reverse=True)
 
     def __get_fitness__(self, indecies, with_history=True):
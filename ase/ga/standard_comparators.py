@@ -1,21 +1,24 @@
 import numpy as np
 from ase.ga import get_raw_score
+from ase.geometry import find_mic
 
 
 def get_sorted_dist_list(atoms, mic=False):
     """ Utility method used to calculate the sorted distance list
         describing the cluster in atoms. """
     numbers = atoms.numbers
-    unique_types = set(numbers)
     pair_cor = dict()
-    for n in unique_types:
-        i_un = [i for i in range(len(atoms)) if atoms[i].number == n]
-        d = []
-        for i, n1 in enumerate(i_un):
-            for n2 in i_un[i + 1:]:
-                d.append(atoms.get_distance(n1, n2, mic))
+    for n in np.unique(numbers):
+        i_un = np.where(numbers == n)[0]
+        i1, i2 = np.triu_indices(len(i_un), 1)
+        pos = atoms.positions[i_un]
+        D = pos[i2] - pos[i1]
+        if mic and len(D) > 0:
+            d = find_mic(D, atoms.cell, atoms.pbc)[1]
+        else:
+            d = np.sqrt((D**2).sum(1))
         d.sort()
-        pair_cor[n] = np.array(d)
+        pair_cor[n] = d
     return pair_cor
 
 
@@ -34,6 +37,9 @@ class InteratomicDistanceComparator(object):
         dE: The limit of eq. 1 of the letter
         mic: Determines if distances are calculated
         using the minimum image convention
+
+        The sorted distance lists of structures with a confid in
+        atoms.info are calculated only once and stored.
     """
     def __init__(self, n_top=None, pair_cor_cum_diff=0.015,
                  pair_cor_max=0.7, dE=0.02, mic=False):
@@ -42,44 +48,95 @@ class InteratomicDistanceComparator(object):
         self.dE = dE
         self.n_top = n_top or 0
         self.mic = mic
+        self.fingerprints = {}  # confid -> (arrays, sorted distance lists)
+
+    def get_fingerprint(self, atoms):
+        """Return the sorted distance lists of the n_top atoms.
+
+        The relaxed and unrelaxed structures share the same confid, so
+        the positions are compared before a stored result is used."""
+        confid = atoms.info.get('confid')
+        key = (atoms.numbers, atoms.positions, atoms.cell)
+        if confid in self.fingerprints:
+            key0, fingerprint = self.fingerprints[confid]
+            if all(x.shape == y.shape and (x == y).all()
+                   for x, y in zip(key, key0)):
+                return fingerprint
+
+        fingerprint = get_sorted_dist_list(atoms[-self.n_top:], mic=self.mic)
+        if confid is not None:
+            key = tuple(x.copy() for x in key)
+            self.fingerprints[confid] = (key, fingerprint)
+        return fingerprint
+
+    def get_index_key(self, atoms):
+        """Return data used by ase.ga.population.CandidateIndex.
+
+        Returns (key, energy, x, tol).  Two structures can only look
+        alike if they have the same key, their energies differ by less
+        than dE and abs(x1 - x2) <= tol * max(x1, x2) for all elements.
+        Here x is the sum of the sorted distances of each element."""
+        fingerprint = self.get_fingerprint(atoms)
+        numbers = atoms.numbers[-self.n_top:]
+        types = sorted(fingerprint)
+        ntypes = np.array([np.sum(numbers == n) for n in types])
+        key = (len(atoms),) + tuple((int(n), int(m))
+                                    for n, m in zip(types, ntypes))
+        x = np.array([fingerprint[n].sum() for n in types])
+        # Each term of the cumulative difference is smaller than
+        # pair_cor_cum_diff and larger than the difference of the sums:
+        tol = self.pair_cor_cum_diff * len(numbers) / ntypes * (1 + 1e-9)
+        return key, atoms.get_potential_energy(), x, tol
 
     def looks_like(self, a1, a2):
         """ Return if structure a1 or a2 are similar or not. """
-        if len(a1) != len(a2):
+        return self.looks_like_many(a1, [a2])[0]
+
+    def looks_like_many(self, a1, others):
+        """Compare a1 to each of the structures in others.
+
+        Returns a list of booleans.  The structure criteria are only
+        evaluated for the structures that pass the energy criterion,
+        and all of those are compared in one go."""
+        if any(len(a1) != len(a2) for a2 in others):
             raise Exception('The two configurations are not the same size')
 
         # first we check the energy criteria
-        dE = abs(a1.get_potential_energy() - a2.get_potential_energy())
-        if dE >= self.dE:
-            return False
+        e1 = a1.get_potential_energy()
+        similar = [abs(e1 - a2.get_potential_energy()) < self.dE
+                   for a2 in others]
+        indices = [i for i, ok in enumerate(similar) if ok]
+        if not indices:
+            return similar
 
         # then we check the structure
-        a1top = a1[-self.n_top:]
-        a2top = a2[-self.n_top:]
-        cum_diff, max_diff = self.__compare_structure__(a1top, a2top)
-
-        return (cum_diff < self.pair_cor_cum_diff
-                and max_diff < self.pair_cor_max)
-
-    def __compare_structure__(self, a1, a2):
-        """ Private method for calculating the structural difference. """
-        p1 = get_sorted_dist_list(a1, mic=self.mic)
-        p2 = get_sorted_dist_list(a2, mic=self.mic)
-        numbers = a1.numbers
-        total_cum_diff = 0.
-        max_diff = 0
+        p1 = self.get_fingerprint(a1)
+        p2 = [self.get_fingerprint(others[i]) for i in indices]
+        numbers = a1.numbers[-self.n_top:]
+        cum_diff, max_diff = self.__compare_structure__(p1, p2, numbers)
+        ok = ((cum_diff < self.pair_cor_cum_diff) &
+              (max_diff < self.pair_cor_max))
+        for i, x in zip(indices, ok):
+            similar[i] = bool(x)
+        return similar
+
+    def __compare_structure__(self, p1, p2, numbers):
+        """ Private method for calculating the structural difference
+        between the distance lists p1 and each of the distance lists
+        in p2. """
+        total_cum_diff = np.zeros(len(p2))
+        max_diff = np.zeros(len(p2))
         for n in p1.keys():
-            cum_diff = 0.
             c1 = p1[n]
-            c2 = p2[n]
-            assert len(c1) == len(c2)
+            c2 = np.array([p[n] for p in p2])
+            assert c2.shape == (len(p2), len(c1))
             if len(c1) == 0:
                 continue
             t_size = np.sum(c1)
-            d = np.abs(c1 - c2)
-            cum_diff = np.sum(d)
-            max_diff = np.max(d)
-            ntype = float(sum([i == n for i in numbers]))
+            d = np.abs(c2 - c1)
+            cum_diff = np.sum(d, axis=1)
+            max_diff = np.max(d, axis=1)
+            ntype = float(np.sum(numbers == n))
             total_cum_diff += cum_diff / t_size * ntype / float(len(numbers))
         return (total_cum_diff, max_diff)
 
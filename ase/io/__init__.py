@@ -1,6 +1,7 @@
 from ase.io.trajectory import Trajectory, PickleTrajectory
 from ase.io.bundletrajectory import BundleTrajectory
 from ase.io.netcdftrajectory import NetCDFTrajectory
-from ase.io.formats import read, iread, write, string2index
+from ase.io.formats import read, iread, iread_files, write, string2index
 __all__ = ['Trajectory', 'PickleTrajectory', 'BundleTrajectory',
-           'NetCDFTrajectory', 'read', 'iread', 'write', 'string2index']
+           'NetCDFTrajectory', 'read', 'iread', 'iread_files', 'write',
+           'string2index']
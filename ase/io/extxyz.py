@@ -14,6 +14,8 @@ Contributed by James Kermode <james.kermode@gmail.com>
 from __future__ import print_function
 
 from itertools import islice
+import io
+import os
 import re
 import warnings
 
@@ -22,11 +24,12 @@ import numpy as np
 from ase.atoms import Atoms
 from ase.calculators.calculator import all_properties, Calculator
 from ase.calculators.singlepoint import SinglePointCalculator
+from ase.data import chemical_symbols
 from ase.spacegroup.spacegroup import Spacegroup
-from ase.parallel import paropen
+from ase.parallel import paropen, world
 from ase.utils import basestring
 
-__all__ = ['read_xyz', 'write_xyz', 'iread_xyz']
+__all__ = ['read_xyz', 'write_xyz', 'iread_xyz', 'FrameIndex']
 
 PROPERTY_NAME_MAP = {'positions': 'pos',
                      'numbers': 'Z',
@@ -312,6 +315,39 @@ def parse_properties(prop_str):
     return properties, properties_list, dtype, converters
 
 
+def _parse_block(block, properties, names, dtype):
+    """Convert the atom lines of a frame to arrays, one column at a time.
+
+    All lines must have one value per field of dtype.  Returns None if
+    that is not the case, or if a column can not be converted, so that
+    the caller can fall back to converting value by value."""
+    rows = [line.split() for line in block]
+    if set(map(len, rows)) != set([len(dtype)]):
+        return None
+    columns = list(zip(*rows))
+
+    arrays = {}
+    i = 0
+    for name in names:
+        ase_name, cols = properties[name]
+        field = dtype[i]
+        try:
+            if field.kind == 'b':
+                value = np.array([[x == 'T' or x == 'True' for x in column]
+                                  for column in columns[i:i + cols]])
+            else:
+                value = np.array(columns[i:i + cols], field)
+        except (ValueError, OverflowError):
+            return None
+        if cols == 1:
+            value = value[0]
+        else:
+            value = value.T
+        arrays[ase_name] = value
+        i += cols
+    return arrays
+
+
 def _read_xyz_frame(lines, natoms, properties_parser=key_val_str_to_dict, nvec=0):
     # comment line
     line = next(lines)
@@ -347,22 +383,37 @@ def _read_xyz_frame(lines, natoms, properties_parser=key_val_str_to_dict, nvec=0
     properties, names, dtype, convs = parse_properties(info['Properties'])
     del info['Properties']
 
-    data = []
-    for ln in range(natoms):
+    block = list(islice(lines, natoms))
+    if len(block) < natoms:
+        raise XYZError('ase.io.extxyz: Frame has {} atoms, expected {}'
+                       .format(len(block), natoms))
+
+    if natoms > 0:
+        arrays = _parse_block(block, properties, names, dtype)
+    else:
+        arrays = None
+    if arrays is None:
+        data = []
+        for line in block:
+            vals = line.split()
+            row = tuple([conv(val) for conv, val in zip(convs, vals)])
+            data.append(row)
+
         try:
-            line = next(lines)
-        except StopIteration:
-            raise XYZError('ase.io.extxyz: Frame has {} atoms, expected {}'
-                           .format(len(data), natoms))
-        vals = line.split()
-        row = tuple([conv(val) for conv, val in zip(convs, vals)])
-        data.append(row)
-
-    try:
-        data = np.array(data, dtype)
-    except TypeError:
-        raise XYZError('Badly formatted data '
-                       'or end of file reached before end of frame')
+            data = np.array(data, dtype)
+        except TypeError:
+            raise XYZError('Badly formatted data '
+                           'or end of file reached before end of frame')
+
+        arrays = {}
+        for name in names:
+            ase_name, cols = properties[name]
+            if cols == 1:
+                value = data[name]
+            else:
+                value = np.vstack([data[name + str(c)]
+                                  for c in range(cols)]).T
+            arrays[ase_name] = value
 
     #Read VEC entries if present
     if nvec > 0:
@@ -390,16 +441,6 @@ def _read_xyz_frame(lines, natoms, properties_parser=key_val_str_to_dict, nvec=0
             raise XYZError('Problem with number of cell vectors')
         pbc = tuple(pbc)
 
-    arrays = {}
-    for name in names:
-        ase_name, cols = properties[name]
-        if cols == 1:
-            value = data[name]
-        else:
-            value = np.vstack([data[name + str(c)]
-                              for c in range(cols)]).T
-        arrays[ase_name] = value
-
     symbols = None
     if 'symbols' in arrays:
         symbols = [s.capitalize() for s in arrays['symbols']]
@@ -526,7 +567,128 @@ class ImageIterator:
 iread_xyz = ImageIterator(ixyzchunks)
 
 
-def read_xyz(fileobj, index=-1, properties_parser=key_val_str_to_dict):
+class FrameIndex:
+    """Byte offsets of the frames of an extended XYZ file.
+
+    The offsets are stored in a sidecar file (filename + '.idx') so
+    that the file only has to be scanned once.  The sidecar is checked
+    against the size and modification time of the file, and frames
+    appended to the file since the last scan are added to it.
+
+    frames: list of (offset, natoms, nvec) tuples
+        Position of the first line of each frame, number of atoms and
+        number of VEC lines.
+
+    Other text formats can use the same sidecar logic by overriding
+    scan(), check() and nfields.
+    """
+
+    nfields = 3  # length of the tuples in self.frames
+
+    def __init__(self, filename, save=True):
+        self.filename = filename
+        self.idxfilename = filename + '.idx'
+        self.frames = []
+        self.end = 0  # end of last frame that ends with a newline
+        self.nsaved = 0  # number of frames up to self.end
+
+        stat = os.stat(filename)
+        self.load(stat)
+        if (self.size, self.mtime) != (stat.st_size, stat.st_mtime):
+            self.scan()
+            self.size = stat.st_size
+            self.mtime = stat.st_mtime
+            if save and world.rank == 0:
+                self.save()
+
+    def __len__(self):
+        return len(self.frames)
+
+    def load(self, stat):
+        self.size = None
+        self.mtime = None
+        try:
+            with np.load(self.idxfilename) as data:
+                frames = data['frames']
+                size, mtime, end = data['stat']
+        except (IOError, OSError, ValueError, KeyError):
+            return
+        if size > stat.st_size:
+            return  # file was truncated or replaced
+        if (size, mtime) != (stat.st_size, stat.st_mtime):
+            # The file has changed.  Assume that frames were appended if
+            # the last indexed frame is still where it was:
+            if len(frames) > 0:
+                with open(self.filename, 'rb') as fd:
+                    fd.seek(frames[-1][0])
+                    if not self.check(fd, frames[-1]):
+                        return
+        self.frames = [tuple(int(x) for x in frame) for frame in frames]
+        self.nsaved = len(self.frames)
+        self.end = int(end)
+        self.size = size
+        self.mtime = mtime
+
+    def check(self, fd, frame):
+        """Check that fd is at the start of the frame."""
+        return fd.readline().strip() == str(frame[1]).encode()
+
+    def scan(self):
+        """Find frames after self.end."""
+        del self.frames[self.nsaved:]
+        with open(self.filename, 'rb') as fd:
+            fd.seek(self.end)
+            while True:
+                offset = fd.tell()
+                line = fd.readline()
+                if not line.strip():
+                    break
+                try:
+                    natoms = int(line)
+                except ValueError:
+                    raise XYZError('ase.io.extxyz: Expected xyz header but '
+                                   'got: {0!r}'.format(line))
+                for i in range(natoms + 1):
+                    line = fd.readline()
+                if not line:
+                    break  # incomplete frame
+                nvec = 0
+                while True:
+                    pos = fd.tell()
+                    line2 = fd.readline()
+                    if line2.lstrip().startswith(b'VEC'):
+                        nvec += 1
+                        if nvec > 3:
+                            raise XYZError('ase.io.extxyz: More than 3 VECX '
+                                           'entries')
+                        line = line2
+                    else:
+                        fd.seek(pos)
+                        break
+                self.frames.append((offset, natoms, nvec))
+                if line.endswith(b'\n'):
+                    self.end = fd.tell()
+                    self.nsaved = len(self.frames)
+
+    def save(self):
+        frames = np.array(self.frames[:self.nsaved], dtype=np.int64)
+        try:
+            with open(self.idxfilename, 'wb') as fd:
+                np.savez(fd, frames=frames.reshape((-1, self.nfields)),
+                         stat=np.array([self.size, self.mtime, self.end]))
+        except (IOError, OSError):
+            pass  # read-only directory
+
+
+def _indexable(fileobj):
+    """Check if the offsets of a text file are positions in the file."""
+    return (isinstance(fileobj, io.TextIOWrapper) and
+            isinstance(fileobj.buffer, io.BufferedReader) and
+            os.path.isfile(fileobj.name))
+
+
+def read_xyz(fileobj, index=-1, properties_parser=key_val_str_to_dict,
+             use_index=False):
     """
     Read from a file in Extended XYZ format
 
@@ -535,6 +697,9 @@ def read_xyz(fileobj, index=-1, properties_parser=key_val_str_to_dict):
     to a dictionary, ``extxyz.key_val_str_to_dict`` is the default and can
     deal with most use cases, ``extxyz.key_val_str_to_dict_regex`` is slightly
     faster but has fewer features.
+    use_index=True stores the positions of the frames in a sidecar file
+    (see :class:`FrameIndex`), so that later reads can go directly to the
+    requested frames instead of scanning the file.
     """
     if isinstance(fileobj, basestring):
         fileobj = open(fileobj)
@@ -542,12 +707,23 @@ def read_xyz(fileobj, index=-1, properties_parser=key_val_str_to_dict):
     if not isinstance(index, int) and not isinstance(index, slice):
         raise TypeError('Index argument is neither slice nor integer!')
 
+    if use_index and _indexable(fileobj):
+        frames = FrameIndex(fileobj.name).frames
+    else:
+        frames = _scan_frames(fileobj, index)
+
+    for atoms in _read_frames(fileobj, frames, index, properties_parser):
+        yield atoms
+
+
+def _scan_frames(fileobj, index):
     # If possible, build a partial index up to the last frame required
     last_frame = None
     if isinstance(index, int) and index >= 0:
         last_frame = index
     elif isinstance(index, slice):
-        if index.stop is not None and index.stop >= 0:
+        if (index.stop is not None and index.stop >= 0 and
+            (index.step is None or index.step > 0)):
             last_frame = index.stop
 
     # scan through file to find where the frames start
@@ -581,7 +757,10 @@ def read_xyz(fileobj, index=-1, properties_parser=key_val_str_to_dict):
         frames.append((frame_pos, natoms, nvec))
         if last_frame is not None and len(frames) > last_frame:
             break
+    return frames
 
+
+def _read_frames(fileobj, frames, index, properties_parser):
     if isinstance(index, int):
         if index < 0:
             tmpsnp = len(frames) + index
@@ -589,26 +768,7 @@ def read_xyz(fileobj, index=-1, properties_parser=key_val_str_to_dict):
         else:
             trbl = range(index, index + 1, 1)
     elif isinstance(index, slice):
-        start = index.start
-        stop = index.stop
-        step = index.step
-
-        if start is None:
-            start = 0
-        elif start < 0:
-            start = len(frames) + start
-
-        if step is None:
-            step = 1
-
-        if stop is None:
-            stop = len(frames)
-        elif stop < 0:
-            stop = len(frames) + stop
-
-        trbl = range(start, stop, step)
-        if step < 0:
-            trbl.reverse()
+        trbl = range(*index.indices(len(frames)))
 
     for index in trbl:
         frame_pos, natoms, nvec = frames[index]
@@ -769,7 +929,7 @@ def write_xyz(fileobj, images, comment='', columns=None, write_info=True,
         if fr_cols[0] in atoms.arrays:
             symbols = atoms.arrays[fr_cols[0]]
         else:
-            symbols = atoms.get_chemical_symbols()
+            symbols = [chemical_symbols[Z] for Z in atoms.numbers.tolist()]
 
         if natoms > 0 and not isinstance(symbols[0], basestring):
             raise ValueError('First column must be symbols-like')
@@ -844,8 +1004,7 @@ def write_xyz(fileobj, images, comment='', columns=None, write_info=True,
         # Write the output
         fileobj.write('%d\n' % nat)
         fileobj.write('%s\n' % comm)
-        for i in range(natoms):
-            fileobj.write(fmt % tuple(data[i]))
+        fileobj.write(''.join([fmt % row for row in data.tolist()]))
 
 
 # create aliases for read/write functions
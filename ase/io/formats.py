@@ -1,6 +1,7 @@
 """File formats.
 
-This module implements the read(), iread() and write() functions in ase.io.
+This module implements the read(), iread(), iread_files() and write()
+functions in ase.io.
 For each file format there is a namedtuple (IOFormat) that has the following
 elements:
 
@@ -28,6 +29,7 @@ import collections
 import functools
 import inspect
 import os
+import pickle
 import sys
 
 from ase.atoms import Atoms
@@ -504,6 +506,89 @@ def iread(filename, index=None, format=None, parallel=True, **kwargs):
         yield atoms
 
 
+ReadResult = collections.namedtuple('ReadResult', 'filename images error')
+ReadResult.__doc__ = """Result of reading one file with iread_files().
+
+filename: str
+    The file.
+images: list of Atoms
+    The configurations read (empty if there was an error).
+error: Exception or None
+    The error raised while reading the file."""
+
+
+def iread_files(filenames, index=None, format=None, jobs=1, ordered=True,
+                errors='raise', **kwargs):
+    """Read many files using a pool of processes.
+
+    Yields a :class:`ReadResult` for each file.
+
+    filenames: list of str
+        The files.  The filename@index syntax can be used.
+    index: int, slice or str
+        The configurations to read from each file (see :func:`read`).
+        Default is the last one.
+    format: str
+        File-format of all files.  Guessed for each file if not given.
+    jobs: int
+        Number of processes.  Use None for the number of CPUs.  With
+        jobs=1, the files are read one at a time in this process.
+    ordered: bool
+        Yield the results in the order of the filenames.  With
+        ordered=False, the results come as soon as the files have
+        been read.
+    errors: 'raise' or 'return'
+        Raise the error from the first file that could not be read, or
+        return it as the error of the result (and continue with the
+        other files).
+
+    The files are read by every process when running in parallel with
+    MPI (like ``read(..., parallel=False)``).  Example::
+
+        for result in iread_files(glob('*/OUTCAR'), ':', jobs=8):
+            db.write(result.images[-1], name=result.filename)
+    """
+    if errors not in ['raise', 'return']:
+        raise ValueError('errors must be "raise" or "return".')
+    tasks = ((filename, index, format, kwargs) for filename in filenames)
+    if jobs == 1:
+        results = (_read_file(task) for task in tasks)
+        pool = None
+    else:
+        from multiprocessing import Pool
+        pool = Pool(jobs)
+        if ordered:
+            results = pool.imap(_read_file, tasks)
+        else:
+            results = pool.imap_unordered(_read_file, tasks)
+    try:
+        for result in results:
+            if result.error is not None and errors == 'raise':
+                raise result.error
+            yield result
+    finally:
+        if pool is not None:
+            pool.terminate()
+            pool.join()
+
+
+def _read_file(task):
+    """Read all configurations of one file for iread_files()."""
+    filename, index, format, kwargs = task
+    try:
+        images = read(filename, index, format, parallel=False, **kwargs)
+    except Exception as ex:
+        try:
+            pickle.loads(pickle.dumps(ex))
+        except Exception:
+            # Must be sent back from a worker process:
+            ex = IOError('{}: {!r}'.format(filename, ex))
+        return ReadResult(filename, [], ex)
+    if isinstance(images, Atoms):
+        images = [images]
+    return ReadResult(filename, images, None)
+
+
 @parallel_generator
 def _iread(filename, index, format, io, parallel=None, full_output=False,
            **kwargs):
@@ -681,6 +766,7 @@ def filetype(filename, read=True, guess=True):
                                            "'Conventions' attribute.")
 
     for format, magic in [('traj', b'- of UlmASE-Trajectory'),
+                          ('traj', b'- of UlmASE-FrameArrays'),
                           ('traj', b'AFFormatASE-Trajectory'),
                           ('gpw', b'- of UlmGPAW'),
                           ('gpw', b'AFFormatGPAW'),
@@ -0,0 +1,441 @@
+"""Trajectory files storing frames as chunks of arrays.
+
+For runs where the atoms (numbers, periodic boundary conditions,
+masses and constraints) do not change, such as molecular dynamics, a
+frame-array trajectory stores the atoms once and the per-frame
+quantities (positions, cell, momenta, energy, forces, ...) as arrays
+with one row per frame.  The frames are written in chunks of
+*chunksize* frames, each chunk being one item in an ULM-file with the
+tag ``ASE-FrameArrays``::
+
+    item #0: header (numbers, pbc, ...) and first chunk
+        positions: <ndarray shape=(chunksize, natoms, 3)>
+        cell: <ndarray shape=(chunksize, 3, 3)>
+        energy: <ndarray shape=(chunksize,)>
+        ...
+    item #1: second chunk
+    ...
+
+The files are read with :func:`ase.io.read` and
+:func:`ase.io.Trajectory` just like normal trajectory files::
+
+    with FrameTrajectoryWriter('md.traj', 'w', atoms) as traj:
+        dyn.attach(traj.write)
+        dyn.run(100000)
+    forces = Trajectory('md.traj').read_array('forces')
+
+The info dictionary of the atoms is not stored.
+"""
+
+import os
+import zlib
+
+import numpy as np
+
+from ase import __version__
+from ase.atoms import Atoms
+from ase.calculators.singlepoint import SinglePointCalculator, all_properties
+from ase.constraints import dict2constraint
+from ase.io.jsonio import encode, decode
+from ase.io.trajectory import headers_equal, get_results
+from ase.parallel import world
+from ase.utils import basestring
+
+TAG = 'ASE-FrameArrays'
+
+# Per-frame quantities of the atoms:
+atoms_properties = ['positions', 'cell', 'momenta']
+
+# Quantities that are stored with lower precision for dtype=np.float32:
+per_atom_properties = ['positions', 'momenta', 'forces', 'charges',
+                       'magmoms', 'energies']
+
+
+def get_header_data(atoms):
+    """Get the quantities that must be the same for all frames."""
+    constraints = [c for c in atoms.constraints if hasattr(c, 'todict')]
+    return {'pbc': atoms.pbc.copy(),
+            'numbers': atoms.get_atomic_numbers(),
+            'masses': atoms.get_masses() if atoms.has('masses') else None,
+            'constraints': encode(constraints)}
+
+
+class FrameTrajectoryWriter:
+    """Writes frames of a fixed set of atoms as chunks of arrays."""
+    def __init__(self, filename, mode='w', atoms=None, properties=None,
+                 chunksize=100, dtype=np.float64, compression=None,
+                 master=None):
+        """A frame-array trajectory in write or append mode.
+
+        Parameters:
+
+        filename: str
+            The name of the file.  Traditionally ends in .traj.
+        mode: str
+            'w' for writing a new file and 'a' for appending to a
+            frame-array trajectory.
+        atoms: Atoms object
+            The Atoms object to be written.  If not given, it must be
+            given as an argument to the write() method.
+        properties: list of str
+            The calculator properties to store.  Default is the
+            properties that are available for the first frame.
+        chunksize: int
+            Number of frames written to the file together.
+        dtype: np.float64 or np.float32
+            Use np.float32 to store per-atom quantities (positions,
+            momenta, forces, ...) with single precision.  Energies,
+            stress and cell are always stored with double precision.
+        compression: None or 'zlib'
+            Compress the chunks losslessly with zlib (after grouping
+            the bytes of the numbers by significance).
+        master: bool
+            Controls which process does the actual writing. The
+            default is that process number 0 does this.
+
+        All frames must have the same atoms, and the same quantities
+        must be available for all frames.
+        """
+        import ase.io.ulm as ulm
+
+        if mode not in 'aw':
+            raise ValueError('mode must be "w" or "a".')
+        if compression not in [None, 'zlib']:
+            raise ValueError('Unknown compression: {0}'.format(compression))
+
+        if master is None:
+            master = (world.rank == 0)
+        self.master = master
+        self.atoms = atoms
+        self.properties = properties
+        self.chunksize = chunksize
+        self.dtype = np.dtype(dtype)
+        self.compression = compression
+
+        self.header_data = None
+        self.calculator = None  # name and parameters of the calculator
+        self.shapes = None  # names and shapes of per-frame quantities
+        self.chunk = None  # arrays for the frames of the chunk
+        self.nframes = 0  # number of frames in the chunk
+        self.nwritten = 0  # number of frames in the file
+
+        if not master:
+            self.backend = ulm.DummyWriter()
+            return
+
+        if mode == 'a' and not (isinstance(filename, basestring) and
+                                (not os.path.isfile(filename) or
+                                 os.path.getsize(filename) == 0)):
+            b = ulm.open(filename, 'r')
+            tag = b.get_tag()
+            nitems = len(b)
+            b.close()
+            if tag != TAG:
+                raise IOError('This is not a frame-array trajectory file!')
+            if nitems > 0:
+                reader = FrameTrajectoryReader(filename)
+                self._continue(reader)
+                reader.close()
+        self.backend = ulm.open(filename, mode, tag=TAG)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, tb):
+        self.close()
+
+    def _continue(self, reader):
+        """Take the layout of an existing file."""
+        self.header_data = get_header_data(reader[0])
+        self.calculator = reader.calculator
+        self.shapes = reader.shapes
+        self.dtype = reader.dtype
+        self.compression = reader.compression
+        self.nwritten = len(reader)
+
+    def write(self, atoms=None, **kwargs):
+        """Write the atoms to the file.
+
+        If the atoms argument is not given, the atoms object specified
+        when creating the trajectory object is used.
+
+        Use keyword arguments to add extra properties::
+
+            writer.write(atoms, energy=117, dipole=[0, 0, 1.0])
+        """
+        if atoms is None:
+            atoms = self.atoms
+
+        for image in atoms.iterimages():
+            self._write_atoms(image, **kwargs)
+
+    def _write_atoms(self, atoms, **kwargs):
+        values = self._get_values(atoms, kwargs)
+
+        if self.header_data is None:
+            self.header_data = get_header_data(atoms)
+            self.shapes = [(name, np.shape(value))
+                           for name, value in values.items()]
+        elif not headers_equal(self.header_data, get_header_data(atoms)):
+            raise ValueError('The atoms of a frame-array trajectory '
+                             'can not change.')
+
+        if self.chunk is None:
+            self.chunk = {}
+            for name, shape in self.shapes:
+                self.chunk[name] = np.empty((self.chunksize,) + shape,
+                                            self.get_dtype(name))
+
+        for name, shape in self.shapes:
+            if name not in values:
+                raise ValueError('No {0} for frame {1}.'
+                                 .format(name, len(self)))
+            self.chunk[name][self.nframes] = values[name]
+        self.nframes += 1
+
+        if self.nframes == self.chunksize:
+            self._write_chunk()
+
+    def get_dtype(self, name):
+        if name in per_atom_properties:
+            return self.dtype
+        return np.float64
+
+    def _get_values(self, atoms, kwargs):
+        """Get the per-frame quantities of atoms."""
+        values = {'positions': atoms.get_positions(),
+                  'cell': atoms.get_cell()}
+        if atoms.has('momenta'):
+            values['momenta'] = atoms.get_momenta()
+
+        calc = atoms.get_calculator()
+        if calc is not None:
+            if self.calculator is None:
+                parameters = {}
+                if hasattr(calc, 'todict'):
+                    parameters = calc.todict()
+                self.calculator = {'name': getattr(calc, 'name', 'unknown'),
+                                   'parameters': parameters}
+            results = get_results(calc, atoms)
+            for prop in all_properties:
+                if self.properties is not None:
+                    if prop not in self.properties:
+                        continue
+                    x = calc.get_property(prop, atoms)
+                elif results is not None:
+                    x = results.get(prop)
+                else:
+                    try:
+                        x = calc.get_property(prop, atoms,
+                                              allow_calculation=False)
+                    except (NotImplementedError, KeyError):
+                        x = None
+                if x is not None:
+                    values[prop] = x
+        values.update(kwargs)
+        if self.shapes is not None:
+            # Only the quantities of the first frame:
+            values = dict((name, values[name]) for name, shape in self.shapes
+                          if name in values)
+        return values
+
+    def _write_chunk(self):
+        b = self.backend
+        if self.nwritten == 0:
+            b.write(version=1, ase_version=__version__,
+                    pbc=self.header_data['pbc'].tolist(),
+                    numbers=self.header_data['numbers'])
+            if self.header_data['masses'] is not None:
+                b.write(masses=self.header_data['masses'])
+            b.write(constraints=self.header_data['constraints'])
+            if self.calculator is not None:
+                b.write(calculator=self.calculator)
+            b.write(shapes=[[name, list(shape)]
+                            for name, shape in self.shapes],
+                    dtype=self.dtype.name,
+                    compression=self.compression)
+        b.write(nframes=self.nframes)
+        for name, shape in self.shapes:
+            a = self.chunk[name][:self.nframes]
+            if self.compression == 'zlib':
+                a = np.frombuffer(compress(a), np.uint8)
+            b.write(name, a)
+        b.sync()
+        self.nwritten += self.nframes
+        self.nframes = 0
+
+    def flush(self):
+        """Write the frames of the current chunk to the file.
+
+        The chunk is written even if it is not full."""
+        if self.nframes > 0:
+            self._write_chunk()
+        self.backend.flush()
+
+    def close(self):
+        """Close the trajectory file."""
+        if self.nframes > 0:
+            self._write_chunk()
+        self.backend.close()
+
+    def __len__(self):
+        return world.sum(self.nwritten + self.nframes)
+
+
+def compress(a):
+    """Compress array with zlib after grouping the bytes by significance."""
+    a = np.ascontiguousarray(a)
+    shuffled = a.view(np.uint8).reshape((-1, a.dtype.itemsize)).T
+    return zlib.compress(shuffled.tobytes(), 1)
+
+
+def decompress(data, dtype, shape):
+    dtype = np.dtype(dtype)
+    shuffled = np.frombuffer(zlib.decompress(data.tobytes()), np.uint8)
+    a = shuffled.reshape((dtype.itemsize, -1)).T.copy().view(dtype)
+    return a.reshape(shape)
+
+
+class FrameTrajectoryReader:
+    """Reads Atoms objects from a frame-array trajectory."""
+    def __init__(self, filename, memmap=False):
+        """A frame-array trajectory in read mode.
+
+        With memmap=True, uncompressed arrays are read as views into the
+        file."""
+        import ase.io.ulm as ulm
+
+        self.backend = ulm.open(filename, 'r', memmap=memmap)
+        b = self.backend
+        if b.get_tag() != TAG:
+            raise IOError('This is not a frame-array trajectory file!')
+        if len(b) == 0:
+            raise ValueError('Empty frame-array trajectory file.')
+
+        self.version = b.version
+        self.ase_version = b.get('ase_version')
+        self.pbc = b.pbc
+        self.numbers = b.numbers
+        self.masses = b.get('masses')
+        self.constraints = b.get('constraints', '[]')
+        self.calculator = b.get('calculator')
+        self.shapes = [(name, tuple(shape)) for name, shape in b.shapes]
+        self.dtype = np.dtype(b.dtype)
+        self.compression = b.compression
+
+        # Index of first frame of each chunk:
+        self.offsets = np.cumsum([0] + [chunk.nframes
+                                        for chunk in b])
+        self.cache = (None, None)  # last chunk read
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, tb):
+        self.close()
+
+    def close(self):
+        """Close the trajectory file."""
+        self.backend.close()
+
+    def __len__(self):
+        return int(self.offsets[-1])
+
+    def get_dtype(self, name):
+        if name in per_atom_properties:
+            return self.dtype
+        return np.float64
+
+    def _read(self, ichunk, name):
+        """Read the array of name for all frames of a chunk."""
+        chunk = self.backend[ichunk]
+        shape = dict(self.shapes)[name]
+        if self.compression == 'zlib':
+            return decompress(chunk.get(name), self.get_dtype(name),
+                              (chunk.nframes,) + shape)
+        return chunk.get(name)
+
+    def _chunk(self, ichunk):
+        """Read all arrays of a chunk (the last one is cached)."""
+        if self.cache[0] != ichunk:
+            self.cache = (ichunk, dict((name, self._read(ichunk, name))
+                                       for name, shape in self.shapes))
+        return self.cache[1]
+
+    def __getitem__(self, i=-1):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        n = len(self)
+        if i < 0:
+            i += n
+        if not 0 <= i < n:
+            raise IndexError('Trajectory index out of range.')
+        ichunk = np.searchsorted(self.offsets, i, side='right') - 1
+        arrays = self._chunk(ichunk)
+        j = i - self.offsets[ichunk]
+        values = dict((name, arrays[name][j]) for name, shape in self.shapes)
+
+        atoms = Atoms(positions=values['positions'],
+                      numbers=self.numbers,
+                      cell=values['cell'],
+                      masses=self.masses,
+                      pbc=self.pbc,
+                      constraint=[dict2constraint(d)
+                                  for d in decode(self.constraints)],
+                      momenta=values.get('momenta'))
+        results = dict((name, value) for name, value in values.items()
+                       if name in all_properties)
+        if results:
+            for name in ['energy', 'free_energy', 'magmom']:
+                if name in results:
+                    results[name] = float(results[name])
+            calc = SinglePointCalculator(atoms, **results)
+            if self.calculator is not None:
+                calc.name = self.calculator['name']
+                calc.parameters.update(self.calculator['parameters'])
+            atoms.set_calculator(calc)
+        return atoms
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def read_array(self, name, index=slice(None)):
+        """Read a quantity from many frames into one array.
+
+        name: str
+            One of 'positions', 'momenta', 'cell' or a calculator
+            property like 'energy' or 'forces'.
+        index: slice or list of int
+            The frames to read.  Default is all.
+
+        The arrays are read one chunk at a time."""
+        if name not in dict(self.shapes):
+            raise KeyError(name)
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step == 1:
+                return self._read_range(name, start, stop)
+            index = range(start, stop, step)
+        index = np.asarray(index, int)
+        if len(index) == 0:
+            return self._read_range(name, 0, 0)
+        if index.min() < -len(self) or index.max() >= len(self):
+            raise IndexError('Frame index out of range')
+        index = index % len(self)
+        first = index.min()
+        a = self._read_range(name, first, index.max() + 1)
+        return a[index - first]
+
+    def _read_range(self, name, start, stop):
+        shape = dict(self.shapes)[name]
+        out = np.empty((max(stop - start, 0),) + shape, self.get_dtype(name))
+        for ichunk in range(len(self.offsets) - 1):
+            first, last = self.offsets[ichunk:ichunk + 2]
+            if last <= start or first >= stop:
+                continue
+            a = self._read(ichunk, name)
+            i1 = max(start, first)
+            i2 = min(stop, last)
+            out[i1 - start:i2 - start] = a[i1 - first:i2 - first]
+        return out
@@ -1,152 +1,269 @@
+from collections import deque
+from itertools import islice
+
+import numpy as np
+
 from ase.atoms import Atoms
 from ase.quaternions import Quaternions
 from ase.calculators.singlepoint import SinglePointCalculator
+from ase.io.extxyz import FrameIndex, _indexable
 from ase.parallel import paropen
 from ase.utils import basestring
-from collections import deque
 
 
-def read_lammps_dump(fileobj, index=-1, order=True, atomsobj=Atoms):
+# Per-atom quantities and the dump columns they are read from:
+QUANTITIES = [('positions', ['x', 'y', 'z']),
+              ('scaled_positions', ['xs', 'ys', 'zs']),
+              ('velocities', ['vx', 'vy', 'vz']),
+              ('forces', ['fx', 'fy', 'fz']),
+              ('quaternions', ['c_q[1]', 'c_q[2]', 'c_q[3]', 'c_q[4]'])]
+
+
+def read_lammps_dump(fileobj, index=-1, order=True, atomsobj=Atoms,
+                     columns=None, use_index=False):
     """Method which reads a LAMMPS dump file.
 
     order: Order the particles according to their id. Might be faster to
     switch it off.
+
+    columns: list of str
+        Only read these columns of the ITEM: ATOMS section (the id and
+        type columns are always read).  Default is to read all the
+        columns that ASE knows about.
+
+    use_index: bool
+        Store the positions of the frames in a sidecar file
+        (filename + '.idx') so that later reads can go directly to the
+        requested frames.
+
+    Frames are read one at a time.  If index is a slice, an iterator
+    over the images is returned, otherwise a single image.
     """
+    if isinstance(index, slice):
+        return iread_lammps_dump(fileobj, index, order, atomsobj, columns,
+                                 use_index)
+    stop = index + 1 or None
+    images = list(iread_lammps_dump(fileobj, slice(index, stop), order,
+                                    atomsobj, columns, use_index))
+    if not images:
+        raise IndexError('list index out of range')
+    return images[0]
+
+
+def iread_lammps_dump(fileobj, index=slice(None), order=True, atomsobj=Atoms,
+                      columns=None, use_index=False):
+    """Iterate over the images in a slice of a LAMMPS dump file."""
     if isinstance(fileobj, basestring):
-        f = paropen(fileobj)
+        fd = paropen(fileobj)
     else:
-        f = fileobj
+        fd = fileobj
 
-    # load everything into memory
-    lines = deque(f.readlines())
+    try:
+        for frame in _select_frames(fd, index, use_index):
+            yield _build_image(frame, order, atomsobj, columns)
+    finally:
+        if fd is not fileobj:
+            fd.close()
 
-    natoms = 0
-    images = []
-
-    while len(lines) > natoms:
-        line = lines.popleft()
-
-        if 'ITEM: TIMESTEP' in line:
-            lo = []
-            hi = []
-            tilt = []
-            id = []
-            types = []
-            positions = []
-            scaled_positions = []
-            velocities = []
-            forces = []
-            quaternions = []
 
+def _select_frames(fd, index, use_index):
+    """Yield the unparsed frames (lists of lines) of a slice."""
+    start, stop, step = index.start, index.stop, index.step
+    negative = any(i is not None and i < 0 for i in [start, stop, step])
+
+    if (use_index or negative) and _indexable(fd):
+        frames = DumpIndex(fd.name, save=use_index).frames
+        for i in range(*index.indices(len(frames))):
+            offset, natoms = frames[i]
+            fd.seek(offset)
+            yield _read_frame(fd)
+        return
+
+    if not negative:
+        for frame in islice(_iter_frames(fd), start, stop, step):
+            yield frame
+    elif (start is not None and start < 0 and stop is None and
+          step in [None, 1]):
+        # Only the last -start frames are needed:
+        for frame in deque(_iter_frames(fd), maxlen=-start):
+            yield frame
+    else:
+        frames = list(_iter_frames(fd))
+        for i in range(*index.indices(len(frames))):
+            yield frames[i]
+
+
+def _iter_frames(fd):
+    while True:
+        frame = _read_frame(fd)
+        if frame is None:
+            return
+        yield frame
+
+
+def _read_frame(fd):
+    """Read the lines of the next frame.
+
+    Returns (header, lines) where header is a list of the lines up to
+    and including "ITEM: ATOMS" and lines are the atom lines."""
+    header = []
+    natoms = 0
+    while True:
+        line = fd.readline()
+        if not line:
+            return None
+        header.append(line)
         if 'ITEM: NUMBER OF ATOMS' in line:
-            line = lines.popleft()
+            line = fd.readline()
+            header.append(line)
             natoms = int(line.split()[0])
-            
+        elif 'ITEM: ATOMS' in line:
+            break
+    lines = [fd.readline() for i in range(natoms)]
+    if natoms and not lines[-1]:
+        return None  # incomplete frame
+    return header, lines
+
+
+class DumpIndex(FrameIndex):
+    """Byte offsets and numbers of atoms of the frames of a dump file."""
+
+    nfields = 2
+
+    def check(self, fd, frame):
+        return fd.readline().startswith(b'ITEM: TIMESTEP')
+
+    def scan(self):
+        del self.frames[self.nsaved:]
+        with open(self.filename, 'rb') as fd:
+            fd.seek(self.end)
+            while True:
+                offset = fd.tell()
+                line = fd.readline()
+                if not line.startswith(b'ITEM: TIMESTEP'):
+                    break
+                natoms = 0
+                while line and not line.startswith(b'ITEM: ATOMS'):
+                    if line.startswith(b'ITEM: NUMBER OF ATOMS'):
+                        line = fd.readline()
+                        natoms = int(line.split()[0])
+                    line = fd.readline()
+                for i in range(natoms):
+                    line = fd.readline()
+                if not line:
+                    break  # incomplete frame
+                self.frames.append((offset, natoms))
+                if line.endswith(b'\n'):
+                    self.end = fd.tell()
+                    self.nsaved = len(self.frames)
+
+
+def _parse_box(lines, tilt_items):
+    lo = []
+    hi = []
+    tilt = []
+    for line in lines:
+        fields = line.split()
+        lo.append(float(fields[0]))
+        hi.append(float(fields[1]))
+        if (len(fields) >= 3):
+            tilt.append(float(fields[2]))
+
+    # determine cell tilt (triclinic case!)
+    if (len(tilt) >= 3):
+        # for >=lammps-7Jul09 use labels behind
+        # "ITEM: BOX BOUNDS" to assign tilt (vector) elements ...
+        if (len(tilt_items) >= 3):
+            xy = tilt[tilt_items.index('xy')]
+            xz = tilt[tilt_items.index('xz')]
+            yz = tilt[tilt_items.index('yz')]
+        # ... otherwise assume default order in 3rd column
+        # (if the latter was present)
+        else:
+            xy = tilt[0]
+            xz = tilt[1]
+            yz = tilt[2]
+    else:
+        xy = xz = yz = 0
+    xhilo = (hi[0] - lo[0]) - (xy**2)**0.5 - (xz**2)**0.5
+    yhilo = (hi[1] - lo[1]) - (yz**2)**0.5
+    zhilo = (hi[2] - lo[2])
+    if xy < 0:
+        if xz < 0:
+            celldispx = lo[0] - xy - xz
+        else:
+            celldispx = lo[0] - xy
+    else:
+        celldispx = lo[0]
+    celldispy = lo[1]
+    celldispz = lo[2]
+
+    cell = [[xhilo, 0, 0], [xy, yhilo, 0], [xz, yz, zhilo]]
+    celldisp = [[celldispx, celldispy, celldispz]]
+    return cell, celldisp
+
+
+def _build_image(frame, order, atomsobj, columns):
+    header, lines = frame
+    cell = celldisp = None
+    for i, line in enumerate(header):
         if 'ITEM: BOX BOUNDS' in line:
             # save labels behind "ITEM: BOX BOUNDS" in
             # triclinic case (>=lammps-7Jul09)
-            tilt_items = line.split()[3:]
-            for i in range(3):
-                line = lines.popleft()
-                fields = line.split()
-                lo.append(float(fields[0]))
-                hi.append(float(fields[1]))
-                if (len(fields) >= 3):
-                    tilt.append(float(fields[2]))
-
-            # determine cell tilt (triclinic case!)
-            if (len(tilt) >= 3):
-                # for >=lammps-7Jul09 use labels behind
-                # "ITEM: BOX BOUNDS" to assign tilt (vector) elements ...
-                if (len(tilt_items) >= 3):
-                    xy = tilt[tilt_items.index('xy')]
-                    xz = tilt[tilt_items.index('xz')]
-                    yz = tilt[tilt_items.index('yz')]
-                # ... otherwise assume default order in 3rd column
-                # (if the latter was present)
-                else:
-                    xy = tilt[0]
-                    xz = tilt[1]
-                    yz = tilt[2]
-            else:
-                xy = xz = yz = 0
-            xhilo = (hi[0] - lo[0]) - (xy**2)**0.5 - (xz**2)**0.5
-            yhilo = (hi[1] - lo[1]) - (yz**2)**0.5
-            zhilo = (hi[2] - lo[2])
-            if xy < 0:
-                if xz < 0:
-                    celldispx = lo[0] - xy - xz
-                else:
-                    celldispx = lo[0] - xy
-            else:
-                celldispx = lo[0]
-            celldispy = lo[1]
-            celldispz = lo[2]
-
-            cell = [[xhilo, 0, 0], [xy, yhilo, 0], [xz, yz, zhilo]]
-            celldisp = [[celldispx, celldispy, celldispz]]
-
-        def add_quantity(fields, var, labels):
-            for label in labels:
-                if label not in atom_attributes:
-                    return
-            var.append([float(fields[atom_attributes[label]])
-                        for label in labels])
-                
-        if 'ITEM: ATOMS' in line:
-            # (reliably) identify values by labels behind
-            # "ITEM: ATOMS" - requires >=lammps-7Jul09
-            # create corresponding index dictionary before
-            # iterating over atoms to (hopefully) speed up lookups...
-            atom_attributes = {}
-            for (i, x) in enumerate(line.split()[2:]):
-                atom_attributes[x] = i
-            for n in range(natoms):
-                line = lines.popleft()
-                fields = line.split()
-                id.append(int(fields[atom_attributes['id']]))
-                types.append(int(fields[atom_attributes['type']]))
-                add_quantity(fields, positions, ['x', 'y', 'z'])
-                add_quantity(fields, scaled_positions, ['xs', 'ys', 'zs'])
-                add_quantity(fields, velocities, ['vx', 'vy', 'vz'])
-                add_quantity(fields, forces, ['fx', 'fy', 'fz'])
-                add_quantity(fields, quaternions, ['c_q[1]', 'c_q[2]',
-                                                   'c_q[3]', 'c_q[4]'])
-
-            if order:
-                def reorder(inlist):
-                    if not len(inlist):
-                        return inlist
-                    outlist = [None] * len(id)
-                    for i, v in zip(id, inlist):
-                        outlist[i - 1] = v
-                    return outlist
-                types = reorder(types)
-                positions = reorder(positions)
-                scaled_positions = reorder(scaled_positions)
-                velocities = reorder(velocities)
-                forces = reorder(forces)
-                quaternions = reorder(quaternions)
-
-            if len(quaternions):
-                images.append(Quaternions(symbols=types,
-                                          positions=positions,
-                                          cell=cell, celldisp=celldisp,
-                                          quaternions=quaternions))
-            elif len(positions):
-                images.append(atomsobj(
-                    symbols=types, positions=positions,
-                    celldisp=celldisp, cell=cell))
-            elif len(scaled_positions):
-                images.append(atomsobj(
-                    symbols=types, scaled_positions=scaled_positions,
-                    celldisp=celldisp, cell=cell))
-
-            if len(velocities):
-                images[-1].set_velocities(velocities)
-            if len(forces):
-                calculator = SinglePointCalculator(images[-1],
-                                                   energy=0.0, forces=forces)
-                images[-1].set_calculator(calculator)
-
-    return images[index]
+            cell, celldisp = _parse_box(header[i + 1:i + 4],
+                                        line.split()[3:])
+
+    # (reliably) identify values by labels behind
+    # "ITEM: ATOMS" - requires >=lammps-7Jul09
+    labels = header[-1].split()[2:]
+    wanted = ['id', 'type']
+    for name, names in QUANTITIES:
+        if (all(label in labels for label in names) and
+            (columns is None or all(label in columns for label in names))):
+            wanted.extend(names)
+
+    rows = [line.split() for line in lines]
+    if rows:
+        table = list(zip(*rows))
+    else:
+        table = [()] * len(labels)
+    values = {}
+    for label in wanted:
+        values[label] = np.array(table[labels.index(label)], float)
+
+    ids = values['id'].astype(int)
+    types = values['type'].astype(int)
+    quantities = {}
+    for name, names in QUANTITIES:
+        if names[0] in values:
+            quantities[name] = np.array([values[label]
+                                         for label in names]).T
+
+    if order:
+        permutation = np.argsort(ids)
+        types = types[permutation]
+        for name in quantities:
+            quantities[name] = quantities[name][permutation]
+
+    if 'quaternions' in quantities:
+        atoms = Quaternions(symbols=types,
+                            positions=quantities.get('positions'),
+                            cell=cell, celldisp=celldisp,
+                            quaternions=quantities['quaternions'])
+    elif 'positions' in quantities:
+        atoms = atomsobj(symbols=types, positions=quantities['positions'],
+                         celldisp=celldisp, cell=cell)
+    elif 'scaled_positions' in quantities:
+        atoms = atomsobj(symbols=types,
+                         scaled_positions=quantities['scaled_positions'],
+                         celldisp=celldisp, cell=cell)
+    else:
+        atoms = atomsobj(symbols=types, celldisp=celldisp, cell=cell)
+
+    if 'velocities' in quantities:
+        atoms.set_velocities(quantities['velocities'])
+    if 'forces' in quantities:
+        calculator = SinglePointCalculator(atoms, energy=0.0,
+                                           forces=quantities['forces'])
+        atoms.set_calculator(calculator)
+    return atoms
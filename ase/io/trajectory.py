@@ -1,4 +1,5 @@
 from __future__ import print_function
+import os
 import warnings
 
 import numpy as np
@@ -6,16 +7,18 @@ import numpy as np
 from ase import __version__
 from ase.calculators.singlepoint import SinglePointCalculator, all_properties
 from ase.constraints import dict2constraint
-from ase.calculators.calculator import PropertyNotImplementedError
+from ase.calculators.calculator import Calculator, PropertyNotImplementedError
 from ase.atoms import Atoms
 from ase.io.jsonio import encode, decode
 from ase.io.pickletrajectory import PickleTrajectory
 from ase.parallel import world
+from ase.utils import basestring
 
 __all__ = ['Trajectory', 'PickleTrajectory']
 
 
-def Trajectory(filename, mode='r', atoms=None, properties=None, master=None):
+def Trajectory(filename, mode='r', atoms=None, properties=None, master=None,
+               memmap=False, flush_interval=1, flush_time=None):
     """A Trajectory can be created in read, write or append mode.
 
     Parameters:
@@ -41,18 +44,38 @@ def Trajectory(filename, mode='r', atoms=None, properties=None, master=None):
         Controls which process does the actual writing. The
         default is that process number 0 does this.  If this
         argument is given, processes where it is True will write.
+    memmap: bool
+        Read arrays through a memory map of the file (read mode only).
+    flush_interval: int
+        Keep images in memory and write them to the file together when
+        this many have been collected (write and append modes only).
+    flush_time: float
+        Also write the images kept in memory when the first of them is
+        older than this many seconds (write and append modes only).
 
     The atoms, properties and master arguments are ignores in read mode.
+
+    Frame-array trajectories (see :mod:`ase.io.frametrajectory`) are
+    recognized in read and append modes.
     """
+    if mode in 'ra' and is_frame_trajectory(filename):
+        from ase.io.frametrajectory import (FrameTrajectoryReader,
+                                            FrameTrajectoryWriter)
+        if mode == 'r':
+            return FrameTrajectoryReader(filename, memmap=memmap)
+        return FrameTrajectoryWriter(filename, mode, atoms, properties,
+                                     master=master)
     if mode == 'r':
-        return TrajectoryReader(filename)
-    return TrajectoryWriter(filename, mode, atoms, properties, master=master)
+        return TrajectoryReader(filename, memmap=memmap)
+    return TrajectoryWriter(filename, mode, atoms, properties, master=master,
+                            flush_interval=flush_interval,
+                            flush_time=flush_time)
 
 
 class TrajectoryWriter:
     """Writes Atoms objects to a .traj file."""
     def __init__(self, filename, mode='w', atoms=None, properties=None,
-                 extra=[], master=None):
+                 extra=[], master=None, flush_interval=1, flush_time=None):
         """A Trajectory writer, in write or append mode.
 
         Parameters:
@@ -78,6 +101,18 @@ class TrajectoryWriter:
             Controls which process does the actual writing. The
             default is that process number 0 does this.  If this
             argument is given, processes where it is True will write.
+        flush_interval: int
+            Keep images in memory and write them to the file together
+            when this many have been collected.  Default is to write
+            each image immediately.
+        flush_time: float
+            Also write the images kept in memory when the first of them
+            is older than this many seconds.
+
+        With flush_interval or flush_time, calculator parameters that
+        are the same as for the first image in the file are only stored
+        with the first image, and :meth:`flush` writes the images kept
+        in memory.
         """
         if master is None:
             master = (world.rank == 0)
@@ -89,7 +124,12 @@ class TrajectoryWriter:
         self.header_data = None
         self.multiple_headers = False
 
-        self._open(filename, mode)
+        self.buffered = flush_interval > 1 or flush_time is not None
+        # Calculator name and encoded parameters of the first image
+        # (None if it has none):
+        self.header_parameters = None
+
+        self._open(filename, mode, flush_interval, flush_time)
 
     def __enter__(self):
         return self
@@ -100,15 +140,23 @@ class TrajectoryWriter:
     def set_description(self, description):
         self.description.update(description)
 
-    def _open(self, filename, mode):
+    def _open(self, filename, mode, flush_interval=1, flush_time=None):
         import ase.io.ulm as ulm
         if mode not in 'aw':
             raise ValueError('mode must be "w" or "a".')
+        if mode == 'a' and is_frame_trajectory(filename):
+            raise IOError('Can not append to a frame-array trajectory file '
+                          'with TrajectoryWriter.')
         if self.master:
-            self.backend = ulm.open(filename, mode, tag='ASE-Trajectory')
+            self.backend = ulm.open(filename, mode, tag='ASE-Trajectory',
+                                    flush_interval=flush_interval,
+                                    flush_time=flush_time)
             if len(self.backend) > 0 and mode == 'a':
                 atoms = Trajectory(filename)[0]
                 self.header_data = get_header_data(atoms)
+                if atoms.calc is not None:
+                    self.header_parameters = (
+                        atoms.calc.name, encode(atoms.calc.parameters))
         else:
             self.backend = ulm.DummyWriter()
 
@@ -163,10 +211,27 @@ class TrajectoryWriter:
             c = b.child('calculator')
             c.write(name=calc.name)
             if hasattr(calc, 'todict'):
-                c.write(parameters=calc.todict())
+                parameters = calc.todict()
+                if not self.buffered:
+                    c.write(parameters=parameters)
+                else:
+                    # Store parameters only when they are not the same
+                    # as for the first image (the reader falls back to
+                    # those):
+                    header_parameters = (calc.name, encode(parameters))
+                    if len(self.backend) == 0:
+                        self.header_parameters = header_parameters
+                        c.write(parameters=parameters)
+                    elif header_parameters != self.header_parameters:
+                        c.write(parameters=parameters)
+            results = None
+            if self.properties is None:
+                results = get_results(calc, atoms)
             for prop in all_properties:
                 if prop in kwargs:
                     x = kwargs[prop]
+                elif results is not None:
+                    x = results.get(prop)
                 else:
                     if self.properties is not None:
                         if prop in self.properties:
@@ -185,19 +250,28 @@ class TrajectoryWriter:
                         x = x.tolist()
                     c.write(prop, x)
 
-        info = {}
-        for key, value in atoms.info.items():
-            try:
-                encode(value)
-            except TypeError:
-                warnings.warn('Skipping "{0}" info.'.format(key))
-            else:
-                info[key] = value
+        try:
+            encode(atoms.info)
+        except TypeError:
+            info = {}
+            for key, value in atoms.info.items():
+                try:
+                    encode(value)
+                except TypeError:
+                    warnings.warn('Skipping "{0}" info.'.format(key))
+                else:
+                    info[key] = value
+        else:
+            info = atoms.info
         if info:
             b.write(info=info)
 
         b.sync()
 
+    def flush(self):
+        """Write the images kept in memory to the file."""
+        self.backend.flush()
+
     def close(self):
         """Close the trajectory file."""
         self.backend.close()
@@ -208,17 +282,23 @@ class TrajectoryWriter:
 
 class TrajectoryReader:
     """Reads Atoms objects from a .traj file."""
-    def __init__(self, filename):
+    def __init__(self, filename, memmap=False):
         """A Trajectory in read mode.
 
         The filename traditionally ends in .traj.
+
+        With memmap=True, the file is mapped into memory and arrays are
+        read as views into the file.  Use :meth:`read_array` to get
+        positions, forces and so on for many images at once.
         """
 
         self.numbers = None
         self.pbc = None
         self.masses = None
+        self.calculator_name = None
+        self.parameters = None
 
-        self._open(filename)
+        self._open(filename, memmap)
 
     def __enter__(self):
         return self
@@ -226,9 +306,9 @@ class TrajectoryReader:
     def __exit__(self, exc_type, exc_value, tb):
         self.close()
 
-    def _open(self, filename):
+    def _open(self, filename, memmap=False):
         import ase.io.ulm as ulm
-        self.backend = ulm.open(filename, 'r')
+        self.backend = ulm.open(filename, 'r', memmap=memmap)
         self._read_header()
 
     def _read_header(self):
@@ -244,6 +324,9 @@ class TrajectoryReader:
             self.description = b.get('description')
             self.version = b.version
             self.ase_version = b.get('ase_version')
+            if 'calculator' in b:
+                self.calculator_name = b.calculator.name
+                self.parameters = b.calculator.get('parameters')
 
     def close(self):
         """Close the trajectory file."""
@@ -265,10 +348,14 @@ class TrajectoryReader:
                 if prop in c:
                     results[prop] = c.get(prop)
             calc = SinglePointCalculator(atoms, **results)
-            calc.name = b.calculator.name
+            calc.name = c.name
 
             if 'parameters' in c:
                 calc.parameters.update(c.parameters)
+            elif (c.name == self.calculator_name and
+                  self.parameters is not None):
+                # Same parameters as for the first image:
+                calc.parameters.update(self.parameters)
             atoms.set_calculator(calc)
 
         return atoms
@@ -280,6 +367,48 @@ class TrajectoryReader:
         for i in range(len(self)):
             yield self[i]
 
+    def read_array(self, name, index=slice(None)):
+        """Read a quantity from many images into one array.
+
+        name: str
+            One of 'positions', 'momenta', 'cell' or a calculator
+            property like 'energy', 'forces' or 'stress'.
+        index: slice or list of int
+            The images to read.  Default is all.
+
+        The images are not converted to Atoms objects.  Returns an
+        array of shape (nimages, ...), for example (nimages, natoms, 3)
+        for forces::
+
+            forces = traj.read_array('forces', slice(-1000, None))
+        """
+        if isinstance(index, slice):
+            index = range(*index.indices(len(self)))
+        if name in all_properties:
+            name = 'calculator.' + name
+        return self.backend.stack(name, index)
+
+
+def get_results(calc, atoms):
+    """Get the results that are available without a calculation.
+
+    Does the same as calc.get_property(prop, atoms, False) for all
+    properties, but checks the state of the atoms only once.  Returns
+    None for calculators with their own get_property() method."""
+    method = type(calc).get_property
+    if method is SinglePointCalculator.get_property:
+        results = calc.results
+    elif method is Calculator.get_property:
+        results = dict((prop, value) for prop, value in calc.results.items()
+                       if prop in calc.implemented_properties)
+    else:
+        return None
+    if results and calc.check_state(atoms):
+        if method is Calculator.get_property:
+            calc.reset()
+        return {}
+    return results
+
 
 def get_header_data(atoms):
     return {'pbc': atoms.pbc.copy(),
@@ -347,8 +476,28 @@ def write_atoms(backend, atoms, write_header=True):
         b.write(charges=atoms.get_initial_charges())
 
 
+def is_frame_trajectory(filename):
+    """Check if file is a frame-array trajectory (see
+    :mod:`ase.io.frametrajectory`)."""
+    from ase.io.frametrajectory import TAG
+    magic = b'- of Ulm' + TAG.ljust(16).encode('ascii')
+    if not isinstance(filename, basestring):
+        filename.seek(0)
+        data = filename.read(len(magic))
+        filename.seek(0)
+        return data == magic
+    if not os.path.isfile(filename):
+        return False
+    with open(filename, 'rb') as fd:
+        return fd.read(len(magic)) == magic
+
+
 def read_traj(fd, index):
-    trj = TrajectoryReader(fd)
+    if is_frame_trajectory(fd):
+        from ase.io.frametrajectory import FrameTrajectoryReader
+        trj = FrameTrajectoryReader(fd)
+    else:
+        trj = TrajectoryReader(fd)
     for i in range(*index.indices(len(trj))):
         yield trj[i]
 
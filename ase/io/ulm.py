@@ -31,6 +31,13 @@ Reading:
 >>> print(r.c)
 abc
 
+With ``memmap=True``, arrays are read-only views into a memory map of
+the file instead of copies:
+
+>>> r = ulm.open('x.ulm', memmap=True)
+>>> r.a.flags.writeable
+False
+
 To see what's inside 'x.ulm' do this::
 
     $ ase ulm x.ulm
@@ -57,10 +64,11 @@ from __future__ import print_function
 import os
 import sys
 import numbers
+from time import time
 
 import numpy as np
 
-from ase.io.jsonio import encode, decode
+from ase.io.jsonio import encode, decode, mydecode
 from ase.utils import plural, basestring
 
 if sys.version_info[0] >= 3:
@@ -72,14 +80,20 @@ VERSION = 3
 N1 = 42  # block size - max number of items: 1, N1, N1*N1, N1*N1*N1, ...
 
 
-def open(filename, mode='r', index=None, tag=''):
-    """Open ulm-file."""
+def open(filename, mode='r', index=None, tag='', memmap=False,
+         flush_interval=1, flush_time=None):
+    """Open ulm-file.
+
+    Use memmap=True to read arrays through a memory map of the file.
+    See :class:`Writer` for the flush_interval and flush_time
+    arguments."""
     if mode == 'r':
-        return Reader(filename, index or 0)
+        return Reader(filename, index or 0, memmap=memmap)
     if mode not in 'wa':
         2 / 0
     assert index is None
-    return Writer(filename, mode, tag)
+    return Writer(filename, mode, tag, flush_interval=flush_interval,
+                  flush_time=flush_time)
 
 
 ulmopen = open
@@ -112,6 +126,14 @@ def readints(fd, n):
     return a
 
 
+def bufferints(buffer, n, offset):
+    """Read n 64 bit integers from buffer starting at offset."""
+    a = np.frombuffer(buffer, dtype=np.int64, count=n, offset=int(offset))
+    if not np.little_endian:
+        a = a.byteswap()
+    return a
+
+
 def file_has_fileno(fd):
     """Tell whether file implements fileio() or not.
 
@@ -129,8 +151,37 @@ def file_has_fileno(fd):
     return True
 
 
+class WriteBuffer:
+    """File-like object collecting data to be written at the end of a file.
+    """
+
+    def __init__(self, fd):
+        self.fd = fd
+        fd.seek(0, 2)
+        self.pos = fd.tell()  # where the data goes
+        self.chunks = []
+        self.size = 0
+
+    def tell(self):
+        return self.pos + self.size
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        self.size += len(data)
+
+    def flush(self):
+        """Write the data to the file."""
+        if self.chunks:
+            self.fd.seek(self.pos)
+            self.fd.write(b''.join(self.chunks))
+            self.pos += self.size
+            self.chunks = []
+            self.size = 0
+
+
 class Writer:
-    def __init__(self, fd, mode='w', tag='', data=None):
+    def __init__(self, fd, mode='w', tag='', data=None,
+                 flush_interval=1, flush_time=None):
         """Create writer object.
 
         fd: str
@@ -140,6 +191,17 @@ class Writer:
             existing one) and 'a' for appending to an existing file.
         tag: str
             Magic ID string.
+        flush_interval: int
+            Keep items in memory and write them to the file together
+            when this many have been collected.  Default is to write
+            each item when it is done.
+        flush_time: float
+            Also write the items kept in memory when the first of them
+            is older than this many seconds (checked when an item is
+            done).
+
+        Items kept in memory are written by :meth:`flush` and
+        :meth:`close`.  Readers only see items that have been written.
         """
 
         assert mode in 'aw'
@@ -183,6 +245,14 @@ class Writer:
                 self.offsets = np.concatenate((offsets, padding))
                 fd.seek(0, 2)
 
+        self.buffered = flush_interval > 1 or flush_time is not None
+        self.flush_interval = flush_interval
+        self.flush_time = flush_time
+        if self.buffered:
+            fd = WriteBuffer(fd)
+            self.nflushed = self.nitems  # number of items in the file
+            self.time = None  # time when first item was kept in memory
+
         self.fd = fd
         self.hasfileno = file_has_fileno(fd)
 
@@ -230,6 +300,9 @@ class Writer:
         if self.header:
             self.fd.write(self.header)
             self.header = b''
+            if self.buffered:
+                # Make it a valid (empty) file right away:
+                self.flush()
 
     def fill(self, a):
         """Fill in ndarray chunks for array currently beeing written."""
@@ -269,20 +342,51 @@ class Writer:
                 buf.tofile(self.fd)
             else:
                 self.fd.write(buf.tobytes())
-            writeint(self.fd, self.pos0, 40)
+            if not self.buffered:
+                writeint(self.fd, self.pos0, 40)
             self.offsets = offsets
 
         self.offsets[self.nitems] = i
-        writeint(self.fd, i, self.pos0 + self.nitems * 8)
-        self.nitems += 1
-        writeint(self.fd, self.nitems, 32)
-        self.fd.flush()
-        self.fd.seek(0, 2)  # end of file
+        if self.buffered:
+            self.nitems += 1
+            if self.time is None:
+                self.time = time()
+            if (self.nitems - self.nflushed >= self.flush_interval or
+                self.flush_time is not None and
+                time() - self.time >= self.flush_time):
+                self.flush()
+        else:
+            writeint(self.fd, i, self.pos0 + self.nitems * 8)
+            self.nitems += 1
+            writeint(self.fd, self.nitems, 32)
+            self.fd.flush()
+            self.fd.seek(0, 2)  # end of file
         if np.little_endian:
             self.data = {}
         else:
             self.data = {'_little_endian': False}
 
+    def flush(self):
+        """Write the items kept in memory to the file."""
+        if not self.buffered:
+            self.fd.flush()
+            return
+        self.fd.flush()
+        fd = self.fd.fd
+        if self.nitems > self.nflushed:
+            # Fill in the new offsets and the new number of items:
+            writeint(fd, self.pos0, 40)
+            offsets = self.offsets[self.nflushed:self.nitems]
+            if not np.little_endian:
+                offsets = offsets.byteswap()
+            fd.seek(self.pos0 + self.nflushed * 8)
+            fd.write(offsets.tobytes())
+            writeint(fd, self.nitems, 32)
+            self.nflushed = self.nitems
+        fd.flush()
+        fd.seek(0, 2)
+        self.time = None
+
     def write(self, *args, **kwargs):
         """Write data.
 
@@ -330,6 +434,9 @@ class Writer:
         else:
             # Make sure header has been written (empty ulm-file):
             self._write_header()
+        if self.buffered:
+            self.flush()
+            self.fd = self.fd.fd
         self.fd.close()
 
     def __len__(self):
@@ -346,6 +453,9 @@ class DummyWriter:
     def sync(self):
         pass
 
+    def flush(self):
+        pass
+
     def write(self, *args, **kwargs):
         pass
 
@@ -375,18 +485,31 @@ class InvalidULMFileError(IOError):
 
 
 class Reader:
-    def __init__(self, fd, index=0, data=None, little_endian=None):
-        """Create reader."""
+    def __init__(self, fd, index=0, data=None, little_endian=None,
+                 memmap=False, _buffer=None):
+        """Create reader.
+
+        memmap: bool
+            Map the file into memory.  Arrays are then returned as
+            read-only views into the file, and nothing is copied until
+            the arrays are used.  Ignored for files without a fileno()
+            (like members of tar-files).
+        """
 
         if isinstance(fd, basestring):
             fd = builtins.open(fd, 'rb')
 
         self._fd = fd
         self._index = index
+        self._buffer = _buffer
 
         if data is None:
             (self._tag, self._version, self._nitems, self._pos0,
              self._offsets) = read_header(fd)
+            if memmap and self._nitems > 0 and file_has_fileno(fd):
+                # (plain ndarray view, because slicing np.memmap is slow)
+                self._buffer = np.memmap(fd, np.uint8, mode='r').view(
+                    np.ndarray)
             if self._nitems > 0:
                 data = self._read_data(index)
             else:
@@ -414,10 +537,12 @@ class Reader:
                                           shape,
                                           np.dtype(dtype),
                                           offset,
-                                          self._little_endian)
+                                          self._little_endian,
+                                          self._buffer)
                 else:
                     value = Reader(self._fd, data=value,
-                                   little_endian=self._little_endian)
+                                   little_endian=self._little_endian,
+                                   _buffer=self._buffer)
                 name = name[:-1]
 
             self._data[name] = value
@@ -476,15 +601,65 @@ class Reader:
     def __len__(self):
         return int(self._nitems)
 
-    def _read_data(self, index):
-        self._fd.seek(self._offsets[index])
+    def _read_text(self, index):
+        offset = self._offsets[index]
+        if self._buffer is not None:
+            size = int(bufferints(self._buffer, 1, offset)[0])
+            return self._buffer[offset + 8:offset + 8 + size].tobytes()
+        self._fd.seek(offset)
         size = int(readints(self._fd, 1)[0])
-        data = decode(self._fd.read(size).decode())
-        return data
+        return self._fd.read(size)
+
+    def _read_data(self, index):
+        return decode(self._read_text(index).decode())
 
     def __getitem__(self, index):
         data = self._read_data(index)
-        return Reader(self._fd, index, data, self._little_endian)
+        return Reader(self._fd, index, data, self._little_endian,
+                      _buffer=self._buffer)
+
+    def stack(self, name, indices=None):
+        """Read the values of name from many items into one array.
+
+        name can be the name of a value in a child (like
+        'calculator.forces').  The values must have the same shape in
+        all the items.  The items are not converted to Reader objects,
+        so this is much faster than reading the items one at a time::
+
+            positions = reader.stack('positions', range(100, 200))
+
+        Default is to read from all items."""
+        if indices is None:
+            indices = range(len(self))
+        keys = name.split('.')
+        out = None
+        for j, index in enumerate(indices):
+            data = mydecode(self._read_text(index).decode())
+            for key in keys[:-1]:
+                data = data[key + '.']
+            key = keys[-1]
+            if key + '.' in data:
+                shape, dtype, offset = data[key + '.']['ndarray']
+                dtype = np.dtype(dtype)
+                little_endian = data.get('_little_endian',
+                                         self._little_endian)
+                if little_endian != np.little_endian:
+                    dtype = dtype.newbyteorder()
+                if self._buffer is not None:
+                    value = np.ndarray(shape, dtype, self._buffer, offset)
+                else:
+                    self._fd.seek(offset)
+                    value = np.frombuffer(
+                        self._fd.read(int(np.prod(shape)) * dtype.itemsize),
+                        dtype).reshape(shape)
+            else:
+                value = np.asarray(data[key])
+            if out is None:
+                out = np.empty((len(indices),) + value.shape, value.dtype)
+            out[j] = value
+        if out is None:
+            return np.empty(0)
+        return out
 
     def tostr(self, verbose=False, indent='    '):
         keys = sorted(self._data)
@@ -511,9 +686,10 @@ class Reader:
 
 
 class NDArrayReader:
-    def __init__(self, fd, shape, dtype, offset, little_endian):
+    def __init__(self, fd, shape, dtype, offset, little_endian, buffer=None):
         self.fd = fd
-        self.hasfileno = file_has_fileno(fd)
+        self.buffer = buffer
+        self.hasfileno = buffer is None and file_has_fileno(fd)
         self.shape = tuple(shape)
         self.dtype = dtype
         self.offset = offset
@@ -534,6 +710,8 @@ class NDArrayReader:
         return self[:]
 
     def __getitem__(self, i):
+        if self.buffer is not None:
+            return self._view(i)
         if isinstance(i, numbers.Integral):
             if i < 0:
                 i += len(self)
@@ -560,6 +738,18 @@ class NDArrayReader:
             a *= self.scale
         return a
 
+    def _view(self, i):
+        """Return a view into the memory map of the file."""
+        dtype = self.dtype
+        if self.little_endian != np.little_endian:
+            dtype = dtype.newbyteorder()
+        a = np.ndarray(self.shape, dtype, self.buffer, self.offset)[i]
+        if self.length_of_last_dimension is not None:
+            a = a[..., :self.length_of_last_dimension]
+        if self.scale != 1.0:
+            a = a * self.scale
+        return a
+
     def proxy(self, *indices):
         stride = self.size // len(self)
         start = 0
@@ -568,7 +758,7 @@ class NDArrayReader:
             stride //= self.shape[i + 1]
         offset = self.offset + start * self.itemsize
         p = NDArrayReader(self.fd, self.shape[i + 1:], self.dtype,
-                          offset, self.little_endian)
+                          offset, self.little_endian, self.buffer)
         p.scale = self.scale
         return p
 
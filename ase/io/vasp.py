@@ -4,10 +4,20 @@ Atoms object in VASP POSCAR format.
 
 """
 
+import io
+import mmap
 import os
 import re
-import ase.units
+from collections import OrderedDict, deque
+from contextlib import closing
+from itertools import chain, islice
+
+import numpy as np
 
+import ase.units
+from ase.atoms import Atoms
+from ase.calculators.singlepoint import SinglePointCalculator
+from ase.io.extxyz import _indexable
 from ase.utils import basestring
 
 
@@ -233,11 +243,27 @@ def read_vasp_out(filename='OUTCAR', index=-1, force_consistent=False):
 
     Reads unitcell, atom positions, energies, and forces from the OUTCAR file
     and attempts to read constraints (if any) from CONTCAR/POSCAR, if present.
-    """
-    import numpy as np
-    from ase.calculators.singlepoint import SinglePointCalculator
-    from ase import Atoms, Atom
 
+    The file is read one line at a time.  If index is a slice, an
+    iterator over the images is returned, otherwise a single image.
+    """
+    if isinstance(index, slice):
+        return iread_vasp_out(filename, index, force_consistent)
+    images = list(iread_vasp_out(filename, slice(index, index + 1 or None),
+                                 force_consistent))
+    if not images:
+        raise IndexError('list index out of range')
+    return images[0]
+
+
+def iread_vasp_out(filename='OUTCAR', index=slice(None),
+                   force_consistent=False):
+    """Iterate over the images of a slice of an OUTCAR file.
+
+    Only a few lines and images are kept in memory.  For slices like
+    ``-3:`` of a plain file, the last ionic steps are found by searching
+    backwards from the end of the file, and only they are parsed.
+    """
     try:  # try to read constraints, first from CONTCAR, then from POSCAR
         constr = read_vasp('CONTCAR').constraints
     except Exception:
@@ -250,119 +276,259 @@ def read_vasp_out(filename='OUTCAR', index=-1, force_consistent=False):
         f = open(filename)
     else:  # Assume it's a file-like object
         f = filename
-    data = f.readlines()
-    natoms = 0
-    images = []
-    atoms = Atoms(pbc=True, constraint=constr)
-    energy = 0
-    species = []
-    species_num = []
-    stress = None
-    symbols = []
-    ecount = 0
-    poscount = 0
-    magnetization = []
-    magmom = None
-
-    for n, line in enumerate(data):
-        if re.search('[0-9]-[0-9]',line):
-            data[n] = re.sub('([0-9])-([0-9])',r'\1 -\2',line)
-    for n, line in enumerate(data):
+
+    try:
+        parser = OutcarParser(constr, force_consistent)
+        if (index.start is not None and index.start < 0 and
+            index.stop is None and index.step in [None, 1] and
+            _seekable(f)):
+            images = _read_outcar_tail(f, parser, -index.start)
+        else:
+            images = _select(parser.parse(OutcarLines(f)), index)
+        for atoms in images:
+            yield atoms
+    finally:
+        if f is not filename:
+            f.close()
+
+
+class OutcarLines:
+    """Lines of an OUTCAR file with look-ahead.
+
+    Numbers running into each other (like "1.0-2.0") are split."""
+
+    def __init__(self, fd):
+        self.fd = fd
+        self.buffer = deque()
+
+    def __iter__(self):
+        return self
+
+    def readline(self):
+        line = self.fd.readline()
+        if re.search('[0-9]-[0-9]', line):
+            line = re.sub('([0-9])-([0-9])', r'\1 -\2', line)
+        return line
+
+    def __next__(self):
+        if self.buffer:
+            return self.buffer.popleft()
+        line = self.readline()
+        if not line:
+            raise StopIteration
+        return line
+
+    next = __next__
+
+    def peek(self, i):
+        """Return the i'th line after the current one."""
+        while len(self.buffer) < i:
+            line = self.readline()
+            if not line:
+                raise IndexError('list index out of range')
+            self.buffer.append(line)
+        return self.buffer[i - 1]
+
+
+class OutcarParser:
+    """State of an OUTCAR file read up to some line."""
+
+    def __init__(self, constr=None, force_consistent=False):
+        self.constr = constr
+        self.force_consistent = force_consistent
+        self.natoms = 0
+        self.species = []
+        self.species_num = []
+        self.symbols = []
+        self.cell = None  # cell for the next image
+        self.energy = 0
+        self.stress = None
+        self.magnetization = []
+        self.magmom = None
+        self.ecount = 0
+        self.poscount = 0
+        self.image = None  # last image
+
+    def parse(self, lines):
+        """Yield images.
+
+        An image is yielded when the next one starts (or at the end of
+        the file), because its energy may be written after it."""
+        for line in lines:
+            atoms = self.parse_line(line, lines)
+            if atoms is not None:
+                if self.image is not None:
+                    yield self.image
+                self.image = atoms
+        if self.image is not None:
+            yield self.image
+            self.image = None
+
+    def parse_line(self, line, lines):
+        """Update the state from a line.  Returns a new image or None."""
         if 'POTCAR:' in line:
             temp = line.split()[2]
             for c in ['.', '_', '1']:
                 if c in temp:
                     temp = temp[0:temp.find(c)]
-            species += [temp]
+            self.species += [temp]
         if 'ions per type' in line:
-            species = species[:len(species) // 2]
+            self.species = self.species[:len(self.species) // 2]
             temp = line.split()
-            ntypes = min(len(temp)-4, len(species))
+            ntypes = min(len(temp) - 4, len(self.species))
             for ispecies in range(ntypes):
-                species_num += [int(temp[ispecies + 4])]
-                natoms += species_num[-1]
-                for iatom in range(species_num[-1]):
-                    symbols += [species[ispecies]]
+                self.species_num += [int(temp[ispecies + 4])]
+                self.natoms += self.species_num[-1]
+                for iatom in range(self.species_num[-1]):
+                    self.symbols += [self.species[ispecies]]
         if 'direct lattice vectors' in line:
             cell = []
             for i in range(3):
-                temp = data[n + 1 + i].split()
+                temp = lines.peek(1 + i).split()
                 cell += [[float(temp[0]), float(temp[1]), float(temp[2])]]
-            atoms.set_cell(cell)
+            self.cell = cell
         if 'FREE ENERGIE OF THE ION-ELECTRON SYSTEM' in line:
             # choose between energy wigh smearing extrapolated to zero
             # or free energy (latter is consistent with forces)
-            energy_zero = float(data[n + 4].split()[6])
-            energy_free = float(data[n + 2].split()[4])
+            energy_zero = float(lines.peek(4).split()[6])
+            energy_free = float(lines.peek(2).split()[4])
             energy = energy_zero
-            if force_consistent:
+            if self.force_consistent:
                 energy = energy_free
-            if ecount < poscount:
+            self.energy = energy
+            if self.ecount < self.poscount:
                 # reset energy for LAST set of atoms, not current one -
                 # VASP 5.11? and up
-                images[-1].calc.results['energy'] = energy
-                images[-1].calc.set(energy=energy)
-            ecount += 1
+                self.image.calc.results['energy'] = energy
+                self.image.calc.set(energy=energy)
+            self.ecount += 1
         if 'magnetization (x)' in line:
-            magnetization = []
-            for i in range(natoms):
-                magnetization += [float(data[n + 4 + i].split()[4])]
+            self.magnetization = [float(lines.peek(4 + i).split()[4])
+                                  for i in range(self.natoms)]
         if 'number of electron' in line:
             parts = line.split()
             if len(parts) > 5 and parts[0].strip() != "NELECT":
-                magmom = float(parts[5])
+                self.magmom = float(parts[5])
         if 'in kB ' in line:
             stress = -np.array([float(a) for a in line.split()[2:]])
-            stress = stress[[0, 1, 2, 4, 5, 3]] * 1e-1 * ase.units.GPa
+            self.stress = stress[[0, 1, 2, 4, 5, 3]] * 1e-1 * ase.units.GPa
         if 'POSITION          ' in line:
-            forces = []
-            positions = []
-            for iatom in range(natoms):
-                temp = data[n + 2 + iatom].split()
-                atoms += Atom(symbols[iatom],
-                              [float(temp[0]), float(temp[1]), float(temp[2])])
-                forces += [[float(temp[3]), float(temp[4]), float(temp[5])]]
-                positions += [[float(temp[0]), float(temp[1]), float(temp[2])]]
-            atoms.set_calculator(SinglePointCalculator(atoms,
-                                                       energy=energy,
-                                                       forces=forces,
-                                                       stress=stress))
-            images += [atoms]
-            if len(magnetization) > 0:
-                mag = np.array(magnetization, float)
-                images[-1].calc.magmoms = mag
-                images[-1].calc.results['magmoms'] = mag
-            if magmom:
-                images[-1].calc.results['magmom'] = magmom
-            atoms = Atoms(pbc=True, constraint=constr)
-            poscount += 1
-
-    # return requested images, code borrowed from ase/io/trajectory.py
-    if isinstance(index, int):
-        return images[index]
-    else:
-        step = index.step or 1
-        if step > 0:
-            start = index.start or 0
-            if start < 0:
-                start += len(images)
-            stop = index.stop or len(images)
-            if stop < 0:
-                stop += len(images)
-        else:
-            if index.start is None:
-                start = len(images) - 1
-            else:
-                start = index.start
-                if start < 0:
-                    start += len(images)
-            if index.stop is None:
-                stop = -1
-            else:
-                stop = index.stop
-                if stop < 0:
-                    stop += len(images)
-        return [images[i] for i in range(start, stop, step)]
+            return self.read_positions(lines)
+
+    def read_positions(self, lines):
+        data = np.array([lines.peek(2 + i).split()[:6]
+                         for i in range(self.natoms)], float)
+        data.shape = (self.natoms, 6)
+        atoms = Atoms(self.symbols[:self.natoms], data[:, :3],
+                      cell=self.cell, pbc=True, constraint=self.constr)
+        atoms.set_calculator(SinglePointCalculator(atoms,
+                                                   energy=self.energy,
+                                                   forces=data[:, 3:],
+                                                   stress=self.stress))
+        if len(self.magnetization) > 0:
+            mag = np.array(self.magnetization, float)
+            atoms.calc.magmoms = mag
+            atoms.calc.results['magmoms'] = mag
+        if self.magmom:
+            atoms.calc.results['magmom'] = self.magmom
+        self.cell = None
+        self.poscount += 1
+        return atoms
+
+
+def _seekable(fd):
+    """Check if fd is a plain file that can be searched with mmap."""
+    return (_indexable(fd) or
+            isinstance(fd, io.BufferedReader) and os.path.isfile(fd.name))
+
+
+def _select(images, index):
+    """Select a slice of an iterator, keeping few images in memory."""
+    start, stop, step = index.start, index.stop, index.step
+    if all(i is None or i >= 0 for i in [start, stop, step]):
+        return islice(images, start, stop, step)
+    if (start is not None and start < 0 and stop is None and
+        step in [None, 1]):
+        return deque(images, maxlen=-start)
+    images = list(images)
+    return [images[i] for i in range(*index.indices(len(images)))]
+
+
+def _read_outcar_tail(fd, parser, n):
+    """Parse the last n ionic steps of an OUTCAR file.
+
+    The state of the parser at the start of the steps is reconstructed
+    from the last lines before them that change it, which are found by
+    searching backwards from the end of the file."""
+    with open(fd.name, 'rb') as f:
+        try:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # empty file
+            return []
+
+    def line_start(pos):
+        return mm.rfind(b'\n', 0, pos) + 1
+
+    def parse_line_at(pos):
+        fd.seek(line_start(pos))
+        lines = OutcarLines(fd)
+        parser.parse_line(next(lines), lines)
+
+    with closing(mm):
+        # Find the start of the n+1 last ionic steps:
+        starts = []
+        end = len(mm)
+        while len(starts) <= n:
+            pos = mm.rfind(b'POSITION          ', 0, end)
+            if pos == -1:
+                break
+            end = line_start(pos)
+            starts.append(end)
+
+        if len(starts) <= n:
+            # The file has n steps or less:
+            fd.seek(0)
+            return parser.parse(OutcarLines(fd))
+
+        start = starts[-2]
+        previous = starts[-1]  # start of the step before
+
+        # Species and number of atoms:
+        fd.seek(0)
+        lines = OutcarLines(fd)
+        for line in lines:
+            parser.parse_line(line, lines)
+            if 'ions per type' in line:
+                break
+
+        # Energies from before the first step shift the counting:
+        first = mm.find(b'POSITION          ')
+        energy = b'FREE ENERGIE OF THE ION-ELECTRON SYSTEM'
+        ecount = int(-1 < mm.find(energy) < first)
+
+        parser.cell = None
+        pos = mm.rfind(b'direct lattice vectors', previous, start)
+        if pos != -1:
+            parse_line_at(pos)
+        for marker in [energy, b'magnetization (x)', b'in kB ']:
+            pos = mm.rfind(marker, 0, start)
+            if pos != -1:
+                parse_line_at(pos)
+        end = start
+        while True:
+            pos = mm.rfind(b'number of electron', 0, end)
+            if pos == -1:
+                break
+            parts = mm[line_start(pos):mm.find(b'\n', pos)].split()
+            if len(parts) > 5 and parts[0] != b'NELECT':
+                parse_line_at(pos)
+                break
+            end = pos
+        parser.ecount = ecount
+        parser.poscount = 0
+
+    fd.seek(start)
+    return parser.parse(OutcarLines(fd))
 
 
 def read_vasp_xdatcar(filename, index=-1):
@@ -422,7 +588,7 @@ def read_vasp_xdatcar(filename, index=-1):
         return images[index]
 
 
-def __get_xml_parameter(par):
+def _get_xml_parameter(par):
     """An auxillary function that enables convenient extraction of
     parameter values from a vasprun.xml file with proper type
     handling.
@@ -462,123 +628,215 @@ def read_vasp_xml(filename='vasprun.xml', index=-1):
 
     Reads unit cell, atom positions, energies, forces, and constraints
     from vasprun.xml file
+
+    The file is parsed incrementally and each ionic step is dropped
+    from the XML tree once it has been used.  For slices like ``-3:``
+    of a plain file, only the part of the file before the first ionic
+    step and the last steps are parsed.
     """
+    if isinstance(index, int):
+        index = slice(index, index + 1 or None)
 
-    import numpy as np
-    import xml.etree.ElementTree as ET
-    from ase import Atoms
-    from ase.constraints import FixAtoms, FixScaled
-    from ase.calculators.singlepoint import (SinglePointDFTCalculator,
-                                             SinglePointKPoint)
-    from ase.units import GPa
-    from collections import OrderedDict
+    if isinstance(filename, basestring):
+        fd = open(filename, 'rb')
+    else:
+        fd = filename
 
-    tree = ET.iterparse(filename, events=['start', 'end'])
+    try:
+        chunks = None
+        if (index.start is not None and index.start < 0 and
+            index.stop is None and index.step in [None, 1] and
+            _seekable(fd)):
+            chunks = _vasprun_tail(fd.name, -index.start)
+        if chunks is None:
+            chunks = _read_chunks(fd)
+        parser = VasprunParser()
+        for step in _select(parser.steps(chunks), index):
+            yield parser.build(step)
+    finally:
+        if fd is not filename:
+            fd.close()
+
+
+def _read_chunks(fd, size=2**16):
+    while True:
+        chunk = fd.read(size)
+        if not chunk:
+            return
+        yield chunk
+
+
+def _vasprun_tail(filename, n):
+    """Chunks of a vasprun.xml file without all but the last n + 1 steps.
+
+    One extra step is included, because the last one may be unfinished.
+    Returns None if the file has n + 1 steps or less."""
+    with open(filename, 'rb') as fd:
+        try:
+            mm = mmap.mmap(fd.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # empty file
+            return None
+    with closing(mm):
+        first = mm.find(b'<calculation>')
+        end = len(mm)
+        for i in range(n + 2):
+            end = mm.rfind(b'<calculation>', 0, end)
+            if end == -1:
+                return None
+        start = mm.find(b'<calculation>', end + 1)
+    return _read_ranges(filename, [(0, first), (start, None)])
+
+
+def _read_ranges(filename, ranges, size=2**16):
+    with open(filename, 'rb') as fd:
+        for start, end in ranges:
+            fd.seek(start)
+            while end is None or fd.tell() < end:
+                if end is None:
+                    chunk = fd.read(size)
+                else:
+                    chunk = fd.read(min(size, end - fd.tell()))
+                if not chunk:
+                    break
+                yield chunk
 
-    atoms_init = None
-    calculation = []
-    ibz_kpts = None
-    kpt_weights = None
-    parameters = OrderedDict()
 
-    try:
-        for event, elem in tree:
-
-            if event == 'end':
-                if elem.tag == 'kpoints':
-                    for subelem in elem.iter(tag='generation'):
-                        kpts_params = OrderedDict()
-                        parameters['kpoints_generation'] = kpts_params
-                        for par in subelem.iter():
-                            if par.tag in ['v', 'i']:
-                                parname = par.attrib['name'].lower()
-                                kpts_params[parname] = __get_xml_parameter(par)
-
-                    kpts = elem.findall("varray[@name='kpointlist']/v")
-                    ibz_kpts = np.zeros((len(kpts), 3))
-
-                    for i, kpt in enumerate(kpts):
-                        ibz_kpts[i] = [float(val) for val in kpt.text.split()]
-
-                    kpt_weights = elem.findall('varray[@name="weights"]/v')
-                    kpt_weights = [float(val.text) for val in kpt_weights]
-
-                elif elem.tag == 'parameters':
-                    for par in elem.iter():
-                        if par.tag in ['v', 'i']:
-                            parname = par.attrib['name'].lower()
-                            parameters[parname] = __get_xml_parameter(par)
-
-                elif elem.tag == 'atominfo':
-                    species = []
-
-                    for entry in elem.find("array[@name='atoms']/set"):
-                        species.append(entry[0].text.strip())
-
-                    natoms = len(species)
-
-                elif (elem.tag == 'structure' and
-                      elem.attrib.get('name') == 'initialpos'):
-                    cell_init = np.zeros((3, 3), dtype=float)
-
-                    for i, v in enumerate(elem.find(
-                            "crystal/varray[@name='basis']")):
-                        cell_init[i] = np.array([
-                            float(val) for val in v.text.split()])
-
-                    scpos_init = np.zeros((natoms, 3), dtype=float)
-
-                    for i, v in enumerate(elem.find(
-                            "varray[@name='positions']")):
-                        scpos_init[i] = np.array([
-                            float(val) for val in v.text.split()])
-
-                    constraints = []
-                    fixed_indices = []
-
-                    for i, entry in enumerate(elem.findall(
-                            "varray[@name='selective']/v")):
-                        flags = (np.array(entry.text.split() ==
-                                          np.array(['F', 'F', 'F'])))
-                        if flags.all():
-                            fixed_indices.append(i)
-                        elif flags.any():
-                            constraints.append(FixScaled(cell_init, i, flags))
-
-                    if fixed_indices:
-                        constraints.append(FixAtoms(fixed_indices))
-
-                    atoms_init = Atoms(species,
-                                       cell=cell_init,
-                                       scaled_positions=scpos_init,
-                                       constraint=constraints,
-                                       pbc=True)
-
-                elif elem.tag=='dipole':
-                    dblock = elem.find('v[@name="dipole"]')
-                    if dblock is not None:
-                        dipole = np.array([float(val) for val in dblock.text.split()])
-
-            elif event == 'start' and elem.tag == 'calculation':
-                calculation.append(elem)
-
-    except ET.ParseError as parse_error:
-        if atoms_init is None:
-            raise parse_error
-        if calculation[-1].find('energy') is None:
-            calculation = calculation[:-1]
-        if not calculation:
-            yield atoms_init
-
-    if calculation:
-        if isinstance(index, int):
-            steps = [calculation[index]]
-        else:
-            steps = calculation[index]
-    else:
-        steps = []
+class VasprunParser:
+    """Header information of a vasprun.xml file and its ionic steps."""
+
+    def __init__(self):
+        self.atoms_init = None
+        self.natoms = None
+        self.ibz_kpts = None
+        self.kpt_weights = None
+        self.parameters = OrderedDict()
+
+    def steps(self, chunks):
+        """Yield the calculation elements of the ionic steps.
+
+        The elements are removed from the XML tree.  If the file ends
+        before the first step has an energy, None is yielded."""
+        import xml.etree.ElementTree as ET
+
+        parser = ET.XMLPullParser(events=['start', 'end'])
+        root = None
+        calculation = None  # step being parsed
+        nsteps = 0
+        try:
+            for chunk in chain(chunks, [None]):
+                if chunk is None:
+                    parser.close()
+                else:
+                    parser.feed(chunk)
+                for event, elem in parser.read_events():
+                    if root is None:
+                        root = elem
+                    if event == 'start':
+                        if elem.tag == 'calculation':
+                            calculation = elem
+                    elif elem.tag == 'calculation':
+                        calculation = None
+                        nsteps += 1
+                        yield elem
+                        if elem in root:
+                            root.remove(elem)
+                    else:
+                        self.parse_header(elem)
+        except ET.ParseError as parse_error:
+            if self.atoms_init is None:
+                raise parse_error
+            if (calculation is not None and
+                calculation.find('energy') is not None):
+                yield calculation
+            elif nsteps == 0:
+                yield None
+
+    def parse_header(self, elem):
+        from ase.constraints import FixAtoms, FixScaled
+
+        if elem.tag == 'kpoints':
+            for subelem in elem.iter(tag='generation'):
+                kpts_params = OrderedDict()
+                self.parameters['kpoints_generation'] = kpts_params
+                for par in subelem.iter():
+                    if par.tag in ['v', 'i']:
+                        parname = par.attrib['name'].lower()
+                        kpts_params[parname] = _get_xml_parameter(par)
+
+            kpts = elem.findall("varray[@name='kpointlist']/v")
+            self.ibz_kpts = np.zeros((len(kpts), 3))
+
+            for i, kpt in enumerate(kpts):
+                self.ibz_kpts[i] = [float(val) for val in kpt.text.split()]
+
+            kpt_weights = elem.findall('varray[@name="weights"]/v')
+            self.kpt_weights = [float(val.text) for val in kpt_weights]
+
+        elif elem.tag == 'parameters':
+            for par in elem.iter():
+                if par.tag in ['v', 'i']:
+                    parname = par.attrib['name'].lower()
+                    self.parameters[parname] = _get_xml_parameter(par)
+
+        elif elem.tag == 'atominfo':
+            species = []
+
+            for entry in elem.find("array[@name='atoms']/set"):
+                species.append(entry[0].text.strip())
+
+            self.species = species
+            self.natoms = len(species)
+
+        elif (elem.tag == 'structure' and
+              elem.attrib.get('name') == 'initialpos'):
+            cell_init = np.zeros((3, 3), dtype=float)
+
+            for i, v in enumerate(elem.find(
+                    "crystal/varray[@name='basis']")):
+                cell_init[i] = np.array([
+                    float(val) for val in v.text.split()])
+
+            scpos_init = np.zeros((self.natoms, 3), dtype=float)
+
+            for i, v in enumerate(elem.find(
+                    "varray[@name='positions']")):
+                scpos_init[i] = np.array([
+                    float(val) for val in v.text.split()])
+
+            constraints = []
+            fixed_indices = []
+
+            for i, entry in enumerate(elem.findall(
+                    "varray[@name='selective']/v")):
+                flags = (np.array(entry.text.split() ==
+                                  np.array(['F', 'F', 'F'])))
+                if flags.all():
+                    fixed_indices.append(i)
+                elif flags.any():
+                    constraints.append(FixScaled(cell_init, i, flags))
+
+            if fixed_indices:
+                constraints.append(FixAtoms(fixed_indices))
+
+            self.atoms_init = Atoms(self.species,
+                                    cell=cell_init,
+                                    scaled_positions=scpos_init,
+                                    constraint=constraints,
+                                    pbc=True)
+
+    def build(self, step):
+        """Create an image from a calculation element."""
+        from ase.calculators.singlepoint import (SinglePointDFTCalculator,
+                                                 SinglePointKPoint)
+        from ase.units import GPa
+
+        if step is None:
+            return self.atoms_init
+
+        natoms = self.natoms
+        ibz_kpts = self.ibz_kpts
+        kpt_weights = self.kpt_weights
 
-    for step in steps:
         # Workaround for VASP bug, e_0_energy contains the wrong value
         # in calculation/energy, but calculation/scstep/energy does not
         # include classical VDW corrections. So, first calculate
@@ -660,7 +918,7 @@ def read_vasp_xml(filename='vasprun.xml', index=-1):
         if len(kpoints) == 0:
             kpoints = None
 
-        atoms = atoms_init.copy()
+        atoms = self.atoms_init.copy()
         atoms.set_cell(cell)
         atoms.set_scaled_positions(scpos)
         atoms.set_calculator(
@@ -670,8 +928,8 @@ def read_vasp_xml(filename='vasprun.xml', index=-1):
                                      efermi=efermi, dipole=dipole))
         atoms.calc.name = 'vasp'
         atoms.calc.kpts = kpoints
-        atoms.calc.parameters = parameters
-        yield atoms
+        atoms.calc.parameters = self.parameters
+        return atoms
 
 
 def write_vasp(filename, atoms, label='', direct=False, sort=None,
@@ -1,7 +1,9 @@
 # -*- coding: utf-8 -*-
+import multiprocessing
 import pickle
 import sys
 import threading
+import traceback
 from math import sqrt
 
 import numpy as np
@@ -42,8 +44,12 @@ class NEB:
             Spring constant(s) in eV/Ang.  One number or one for each spring.
         climb: bool
             Use a climbing image (default is no climbing image).
-        parallel: bool
-            Distribute images over processors.
+        parallel: bool or 'processes'
+            Distribute images over processors.  Use parallel='processes'
+            to calculate each intermediate image in its own worker
+            process on a single node.  This helps for calculators
+            written in Python, which don't run in parallel in threads.
+            Call close() to stop the worker processes.
         remove_rotation_and_translation: bool
             TRUE actives NEB-TR for removing translation and
             rotation during NEB. By default applied non-periodic
@@ -95,8 +101,11 @@ class NEB:
             world = mpi.world
         self.world = world
 
-        if parallel:
+        if parallel == 'processes':
+            assert world.size == 1
+        elif parallel:
             assert world.size == 1 or world.size % (self.nimages - 2) == 0
+        self.processes = None  # ImageProcesses object
 
         self.real_forces = None  # ndarray of shape (nimages, natom, 3)
         self.energies = None  # ndarray of shape (nimages,)
@@ -201,7 +210,13 @@ class NEB:
             energies[0] = images[0].get_potential_energy()
             energies[-1] = images[-1].get_potential_energy()
 
-        if not self.parallel:
+        if self.parallel == 'processes':
+            if (self.processes is None or
+                not self.processes.has_calculators(images[1:-1])):
+                self.close()
+                self.processes = ImageProcesses(images[1:-1])
+            energies[1:-1], forces[:] = self.processes.calculate(images[1:-1])
+        elif not self.parallel:
             # Do all images - one at a time:
             for i in range(1, self.nimages - 1):
                 energies[i] = images[i].get_potential_energy()
@@ -348,9 +363,16 @@ class NEB:
         # virtual atom count for the optimization algorithm.
         return (self.nimages - 2) * self.natoms
 
+    def close(self):
+        """Stop worker processes (parallel='processes')."""
+        if self.processes is not None:
+            self.processes.close()
+            self.processes = None
+
     def iterimages(self):
         # Allows trajectory to convert NEB into several images
-        if not self.parallel or self.world.size == 1:
+        if not self.parallel or (self.world.size == 1 and
+                                 self.parallel != 'processes'):
             for atoms in self.images:
                 yield atoms
             return
@@ -366,6 +388,107 @@ class NEB:
                 yield atoms
 
 
+class ImageProcesses:
+    def __init__(self, images):
+        """Calculate images in worker processes.
+
+        Each worker process holds one image with its calculator.  The
+        positions are sent to the workers and the energies and forces
+        are returned through shared memory."""
+        self.calculators = [image.calc for image in images]
+        n = len(images)
+        natoms = len(images[0])
+        self.buffers = [multiprocessing.RawArray('d', n * natoms * 3),
+                        multiprocessing.RawArray('d', n),
+                        multiprocessing.RawArray('d', n * natoms * 3)]
+        self.positions, self.energies, self.forces = get_shared_arrays(
+            self.buffers, n, natoms)
+        self.pipes = []
+        self.workers = []
+        for i, image in enumerate(images):
+            pipe, child = multiprocessing.Pipe()
+            worker = multiprocessing.Process(
+                target=image_worker, args=(image, i, child, self.buffers))
+            worker.daemon = True
+            worker.start()
+            child.close()
+            self.pipes.append(pipe)
+            self.workers.append(worker)
+
+    def has_calculators(self, images):
+        """Check that the workers are running and that the images still
+        have their calculators."""
+        return bool(self.workers) and all(
+            image.calc is calc
+            for image, calc in zip(images, self.calculators))
+
+    def calculate(self, images):
+        """Return energies and forces of images."""
+        for i, image in enumerate(images):
+            self.positions[i] = image.positions
+        dead = set()  # images whose worker processes have died
+        for i, pipe in enumerate(self.pipes):
+            try:
+                pipe.send(True)
+            except (IOError, OSError):
+                dead.add(i)
+        errors = []
+        for i, pipe in enumerate(self.pipes):
+            try:
+                errors.append(pipe.recv())
+            except (EOFError, IOError, OSError):
+                dead.add(i)
+                errors.append(None)
+        if dead:
+            self.close()
+            raise RuntimeError('The worker process for image {0} died'
+                               .format(min(dead) + 1))
+        for i, error in enumerate(errors):
+            if error is not None:
+                raise RuntimeError('Calculation of image {0} failed:\n{1}'
+                                   .format(i + 1, error))
+        return self.energies.copy(), self.forces.copy()
+
+    def close(self):
+        for pipe in self.pipes:
+            try:
+                pipe.send(False)
+            except (IOError, OSError):
+                pass  # worker process is gone
+            pipe.close()
+        for worker in self.workers:
+            worker.join()
+        self.pipes = []
+        self.workers = []
+
+
+def get_shared_arrays(buffers, n, natoms):
+    positions, energies, forces = (np.frombuffer(buf) for buf in buffers)
+    return (positions.reshape((n, natoms, 3)), energies,
+            forces.reshape((n, natoms, 3)))
+
+
+def image_worker(image, i, pipe, buffers):
+    """Calculate image number i every time the parent asks for it."""
+    positions, energies, forces = get_shared_arrays(buffers, len(buffers[1]),
+                                                    len(image))
+    while True:
+        try:
+            if not pipe.recv():
+                break
+        except EOFError:  # parent is gone
+            break
+        try:
+            image.set_positions(positions[i], apply_constraint=False)
+            energies[i] = image.get_potential_energy()
+            forces[i] = image.get_forces()
+        except Exception:
+            pipe.send(traceback.format_exc())
+        else:
+            pipe.send(None)
+    pipe.close()
+
+
 class IDPP(Calculator):
     """Image dependent pair potential.
 
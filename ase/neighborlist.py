@@ -117,11 +117,11 @@ def primitive_neighbor_list(quantities, pbc, cell, positions, cutoff,
 
     # Return empty neighbor list if no atoms are passed here
     if len(positions) == 0:
-        empty_types = dict(i=(np.int, (0, )),
-                           j=(np.int, (0, )),
-                           D=(np.float, (0, 3)),
-                           d=(np.float, (0, )),
-                           S=(np.int, (0, 3)))
+        empty_types = dict(i=(int, (0, )),
+                           j=(int, (0, )),
+                           D=(float, (0, 3)),
+                           d=(float, (0, )),
+                           S=(int, (0, 3)))
         retvals = []
         for i in quantities:
             dtype, shape = empty_types[i]
@@ -190,52 +190,31 @@ def primitive_neighbor_list(quantities, pbc, cell, positions, cutoff,
                                  nbins_c[1] * bin_index_ic[:, 2]))
 
     # atom_i contains atom index in new sort order.
-    atom_i = np.argsort(bin_index_i)
+    atom_i = np.argsort(bin_index_i, kind='mergesort')
     bin_index_i = bin_index_i[atom_i]
 
-    # Find max number of atoms per bin
-    max_natoms_per_bin = np.bincount(bin_index_i).max()
-
-    # Sort atoms into bins: atoms_in_bin_ba contains for each bin (identified
-    # by its scalar bin index) a list of atoms inside that bin. This list is
-    # homogeneous, i.e. has the same size *max_natoms_per_bin* for all bins.
-    # The list is padded with -1 values.
-    atoms_in_bin_ba = -np.ones([nbins, max_natoms_per_bin], dtype=int)
-    for i in range(max_natoms_per_bin):
-        # Create a mask array that identifies the first atom of each bin.
-        mask = np.append([True], bin_index_i[:-1] != bin_index_i[1:])
-        # Assign all first atoms.
-        atoms_in_bin_ba[bin_index_i[mask], i] = atom_i[mask]
-
-        # Remove atoms that we just sorted into atoms_in_bin_ba. The next
-        # "first" atom will be the second and so on.
-        mask = np.logical_not(mask)
-        atom_i = atom_i[mask]
-        bin_index_i = bin_index_i[mask]
-
-    # Make sure that all atoms have been sorted into bins.
-    assert len(atom_i) == 0
-    assert len(bin_index_i) == 0
-
-    # Now we construct neighbor pairs by pairing up all atoms within a bin or
-    # between bin and neighboring bin. atom_pairs_pn is a helper buffer that
-    # contains all potential pairs of atoms between two bins, i.e. it is a list
-    # of length max_natoms_per_bin**2.
-    atom_pairs_pn = np.indices((max_natoms_per_bin, max_natoms_per_bin),
-                               dtype=int)
-    atom_pairs_pn = atom_pairs_pn.reshape(2, -1)
+    # Sort atoms into bins: The atoms in bin b are
+    # atom_i[first_atom_b[b]:first_atom_b[b] + natoms_b[b]]. This compressed
+    # layout avoids padding each bin to the maximum number of atoms per bin.
+    natoms_b = np.bincount(bin_index_i, minlength=nbins)
+    first_atom_b = np.cumsum(natoms_b) - natoms_b
+
+    # Cell shift of the sorted atoms and positions mapped into the cell.
+    # Distance vectors between atoms i and j can then be computed as
+    # wrapped_positions[j] - wrapped_positions[i] + bin_shift.dot(cell).
+    cell_shift_ic = cell_shift_ic[atom_i]
+    wrapped_positions_ic = positions[atom_i] - cell_shift_ic.dot(cell)
+    wrapped_x_i, wrapped_y_i, wrapped_z_i = wrapped_positions_ic.T.copy()
 
     # Initialized empty neighbor list buffers.
     first_at_neightuple_nn = []
     secnd_at_neightuple_nn = []
-    cell_shift_vector_x_n = []
-    cell_shift_vector_y_n = []
-    cell_shift_vector_z_n = []
+    cell_shift_vector_nn = []
+    distance_vector_nn = []
 
     # This is the main neighbor list search. We loop over neighboring bins and
-    # then construct all possible pairs of atoms between two bins, assuming
-    # that each bin contains exactly max_natoms_per_bin atoms. We then throw
-    # out pairs involving pad atoms with atom index -1 below.
+    # then construct all possible pairs of atoms between a bin and the
+    # respective neighboring bin.
     binz_xyz, biny_xyz, binx_xyz = np.meshgrid(np.arange(nbins_c[2]),
                                                np.arange(nbins_c[1]),
                                                np.arange(nbins_c[0]),
@@ -247,8 +226,11 @@ def primitive_neighbor_list(quantities, pbc, cell, positions, cutoff,
     #                                     binz_xyz)).ravel()
     #     assert (b_b == np.arange(np.prod(nbins_c))).all()
 
-    # First atoms in pair.
-    _first_at_neightuple_n = atoms_in_bin_ba[:, atom_pairs_pn[0]]
+    # Pairs are only kept if they are within the maximum cutoff. Filtering
+    # right away for each neighboring bin keeps the memory footprint
+    # proportional to the number of actual neighbors rather than to the
+    # number of candidate pairs.
+    max_cutoff_sq = max_cutoff**2
     for dz in range(-neigh_search_z, neigh_search_z+1):
         for dy in range(-neigh_search_y, neigh_search_y+1):
             for dx in range(-neigh_search_x, neigh_search_x+1):
@@ -259,85 +241,93 @@ def primitive_neighbor_list(quantities, pbc, cell, positions, cutoff,
                 neighbin_b = (neighbinx_xyz + nbins_c[0] *
                               (neighbiny_xyz + nbins_c[1] * neighbinz_xyz)
                               ).ravel()
-
-                # Second atom in pair.
-                _secnd_at_neightuple_n = \
-                    atoms_in_bin_ba[neighbin_b][:, atom_pairs_pn[1]]
-
-                # Shift vectors.
-                _cell_shift_vector_x_n = \
-                    np.resize(shiftx_xyz.reshape(-1, 1),
-                              (max_natoms_per_bin**2, shiftx_xyz.size)).T
-                _cell_shift_vector_y_n = \
-                    np.resize(shifty_xyz.reshape(-1, 1),
-                              (max_natoms_per_bin**2, shifty_xyz.size)).T
-                _cell_shift_vector_z_n = \
-                    np.resize(shiftz_xyz.reshape(-1, 1),
-                              (max_natoms_per_bin**2, shiftz_xyz.size)).T
-
-                # We have created too many pairs because we assumed each bin
-                # has exactly max_natoms_per_bin atoms. Remove all surperfluous
-                # pairs. Those are pairs that involve an atom with index -1.
-                mask = np.logical_and(_first_at_neightuple_n != -1,
-                                      _secnd_at_neightuple_n != -1)
-                if mask.sum() > 0:
-                    first_at_neightuple_nn += [_first_at_neightuple_n[mask]]
-                    secnd_at_neightuple_nn += [_secnd_at_neightuple_n[mask]]
-                    cell_shift_vector_x_n += [_cell_shift_vector_x_n[mask]]
-                    cell_shift_vector_y_n += [_cell_shift_vector_y_n[mask]]
-                    cell_shift_vector_z_n += [_cell_shift_vector_z_n[mask]]
+                shift_bc = np.transpose([shiftx_xyz.ravel(),
+                                         shifty_xyz.ravel(),
+                                         shiftz_xyz.ravel()])
+
+                # Neighboring bin for each (sorted) first atom and the number
+                # of second atoms found in that bin.
+                neighbin_i = neighbin_b[bin_index_i]
+                npairs_i = natoms_b[neighbin_i]
+                npairs = npairs_i.sum()
+                if npairs == 0:
+                    continue
+
+                # Position of the first atom relative to the periodic image
+                # of the neighboring bin.
+                origin_ic = wrapped_positions_ic - \
+                    shift_bc[bin_index_i].dot(cell)
+
+                # Second atom in pair (index into sorted atoms): Offset of
+                # the neighboring bin plus running index within that bin.
+                secnd_n = np.arange(npairs) + np.repeat(
+                    first_atom_b[neighbin_i] - np.cumsum(npairs_i) + npairs_i,
+                    npairs_i)
+
+                # Squared distances of all candidate pairs. This is the
+                # innermost loop, hence it is done component by component.
+                dist_n = wrapped_x_i[secnd_n] - \
+                    np.repeat(origin_ic[:, 0], npairs_i)
+                abs_distance_sq_n = dist_n * dist_n
+                dist_n = wrapped_y_i[secnd_n] - \
+                    np.repeat(origin_ic[:, 1], npairs_i)
+                abs_distance_sq_n += dist_n * dist_n
+                dist_n = wrapped_z_i[secnd_n] - \
+                    np.repeat(origin_ic[:, 2], npairs_i)
+                abs_distance_sq_n += dist_n * dist_n
+
+                # Only keep those pairs with distance smaller than max_cutoff.
+                n = np.flatnonzero(abs_distance_sq_n < max_cutoff_sq)
+                first_n = np.searchsorted(np.cumsum(npairs_i), n,
+                                          side='right')
+                secnd_n = secnd_n[n]
+
+                # Shift vectors: shift of the neighboring bin plus the
+                # global cell shift of the two atoms.
+                cell_shift_vector_n = (shift_bc[bin_index_i[first_n]] +
+                                       cell_shift_ic[first_n] -
+                                       cell_shift_ic[secnd_n])
+
+                # Remove all self-pairs that do not cross the cell boundary
+                # and, for nonperiodic directions, any bonds that cross the
+                # domain boundary.
+                m = np.ones(len(n), dtype=bool)
+                if not self_interaction:
+                    m &= np.logical_or(first_n != secnd_n,
+                                       cell_shift_vector_n.any(axis=1))
+                for c in range(3):
+                    if not pbc[c]:
+                        m &= cell_shift_vector_n[:, c] == 0
+                first_n = first_n[m]
+                secnd_n = secnd_n[m]
+
+                first_at_neightuple_nn += [atom_i[first_n]]
+                secnd_at_neightuple_nn += [atom_i[secnd_n]]
+                cell_shift_vector_nn += [cell_shift_vector_n[m]]
+                distance_vector_nn += [wrapped_positions_ic[secnd_n] -
+                                       origin_ic[first_n]]
 
     # Flatten overall neighbor list.
-    first_at_neightuple_n = np.concatenate(first_at_neightuple_nn)
-    secnd_at_neightuple_n = np.concatenate(secnd_at_neightuple_nn)
-    cell_shift_vector_n = np.transpose([np.concatenate(cell_shift_vector_x_n),
-                                        np.concatenate(cell_shift_vector_y_n),
-                                        np.concatenate(cell_shift_vector_z_n)])
-
-    # Add global cell shift to shift vectors
-    cell_shift_vector_n += cell_shift_ic[first_at_neightuple_n] - \
-        cell_shift_ic[secnd_at_neightuple_n]
-
-    # Remove all self-pairs that do not cross the cell boundary.
-    if not self_interaction:
-        m = np.logical_not(np.logical_and(
-            first_at_neightuple_n == secnd_at_neightuple_n,
-            (cell_shift_vector_n == 0).all(axis=1)))
-        first_at_neightuple_n = first_at_neightuple_n[m]
-        secnd_at_neightuple_n = secnd_at_neightuple_n[m]
-        cell_shift_vector_n = cell_shift_vector_n[m]
-
-    # For nonperiodic directions, remove any bonds that cross the domain
-    # boundary.
-    for c in range(3):
-        if not pbc[c]:
-            m = cell_shift_vector_n[:, c] == 0
-            first_at_neightuple_n = first_at_neightuple_n[m]
-            secnd_at_neightuple_n = secnd_at_neightuple_n[m]
-            cell_shift_vector_n = cell_shift_vector_n[m]
+    if first_at_neightuple_nn:
+        first_at_neightuple_n = np.concatenate(first_at_neightuple_nn)
+        secnd_at_neightuple_n = np.concatenate(secnd_at_neightuple_nn)
+        cell_shift_vector_n = np.concatenate(cell_shift_vector_nn)
+        distance_vector_nc = np.concatenate(distance_vector_nn)
+    else:
+        first_at_neightuple_n = np.zeros(0, dtype=int)
+        secnd_at_neightuple_n = np.zeros(0, dtype=int)
+        cell_shift_vector_n = np.zeros((0, 3), dtype=int)
+        distance_vector_nc = np.zeros((0, 3))
 
     # Sort neighbor list.
-    i = np.argsort(first_at_neightuple_n)
+    i = np.argsort(first_at_neightuple_n, kind='mergesort')
     first_at_neightuple_n = first_at_neightuple_n[i]
     secnd_at_neightuple_n = secnd_at_neightuple_n[i]
     cell_shift_vector_n = cell_shift_vector_n[i]
-
-    # Compute distance vectors.
-    distance_vector_nc = positions[secnd_at_neightuple_n] - \
-        positions[first_at_neightuple_n] + \
-        cell_shift_vector_n.dot(cell)
+    distance_vector_nc = distance_vector_nc[i]
     abs_distance_vector_n = \
         np.sqrt(np.sum(distance_vector_nc*distance_vector_nc, axis=1))
 
-    # We have still created too many pairs. Only keep those with distance
-    # smaller than max_cutoff.
-    mask = abs_distance_vector_n < max_cutoff
-    first_at_neightuple_n = first_at_neightuple_n[mask]
-    secnd_at_neightuple_n = secnd_at_neightuple_n[mask]
-    cell_shift_vector_n = cell_shift_vector_n[mask]
-    distance_vector_nc = distance_vector_nc[mask]
-    abs_distance_vector_n = abs_distance_vector_n[mask]
-
     if isinstance(cutoff, dict) and numbers is not None:
         # If cutoff is a dictionary, then the cutoff radii are specified per
         # element pair. We now have a list up to maximum cutoff.
@@ -623,6 +613,12 @@ def get_connectivity_matrix(nl, sparse=True):
 class NewPrimitiveNeighborList:
     """Neighbor list object. Wrapper around neighbor_list and first_neighbors.
 
+    The neighbor search uses the linearly scaling binning algorithm of
+    :func:`~ase.neighborlist.primitive_neighbor_list`. The list is stored as
+    flat arrays ``pair_first``, ``pair_second`` and ``offset_vec`` (integer
+    cell offsets) together with the index array ``first_neigh`` pointing to
+    the neighbors of each atom.
+
     cutoffs: list of float
         List of cutoff radii - one for each atom. If the spheres (defined by
         their cutoff radii) of two atoms overlap, they will be counted as
@@ -634,7 +630,9 @@ class NewPrimitiveNeighborList:
         some expensive rebuilds of the list, but extra neighbors outside
         the cutoff will be returned.
     sorted: bool
-        Sort neighbor list.
+        Sort neighbor list.  The neighbors of each atom are sorted by
+        index and, unless bothways=True, the neighbors of atom a all
+        have an index larger than or equal to a.
     self_interaction: bool
         Should an atom return itself as a neighbor?
     bothways: bool
@@ -676,46 +674,61 @@ class NewPrimitiveNeighborList:
 
     def build(self, pbc, cell, positions, numbers=None):
         """Build the list.
+
+        The list is stored in compressed sparse row format: The neighbors
+        of atom a are pair_second[first_neigh[a]:first_neigh[a + 1]] with
+        integer cell offsets offset_vec[first_neigh[a]:first_neigh[a + 1]].
         """
         self.pbc = np.array(pbc, copy=True)
         self.cell = np.array(cell, copy=True)
         self.positions = np.array(positions, copy=True)
 
+        if len(self.cutoffs) != len(positions):
+            raise ValueError('Wrong number of cutoff radii: {0} != {1}'
+                             .format(len(self.cutoffs), len(positions)))
+
         self.pair_first, self.pair_second, self.offset_vec = \
             primitive_neighbor_list(
                 'ijS', pbc, cell, positions, self.cutoffs, numbers=numbers,
                 self_interaction=self.self_interaction,
                 use_scaled_positions=self.use_scaled_positions)
 
-        if len(positions) > 0 and not self.bothways:
-            mask = np.logical_or(
-                np.logical_and(
-                    self.pair_first <= self.pair_second,
-                    (self.offset_vec == 0).all(axis=1)
-                    ),
-                np.logical_or(
-                    self.offset_vec[:, 0] > 0,
+        if len(positions) > 0:
+            # Every pair appears twice in the list returned by
+            # primitive_neighbor_list, as (i, j, S) and (j, i, -S). Self
+            # interaction pairs (i, i, 0) only appear once. Select one
+            # representative of each pair for the half list.
+            if self.sorted:
+                # Neighbors j of atom i satisfy j >= i.
+                offset_positive = self._positive_offsets(self.offset_vec)
+                mask = np.logical_or(
+                    self.pair_first < self.pair_second,
                     np.logical_and(
-                        self.offset_vec[:, 0] == 0,
-                        np.logical_or(
-                            self.offset_vec[:, 1] > 0,
-                            np.logical_and(
-                                self.offset_vec[:, 1] == 0,
-                                self.offset_vec[:, 2] > 0)
-                            )
-                        )
-                    )
-                )
-            self.pair_first = self.pair_first[mask]
-            self.pair_second = self.pair_second[mask]
-            self.offset_vec = self.offset_vec[mask]
-
-        if len(positions) > 0 and self.sorted:
-            mask = np.argsort(self.pair_first * len(self.pair_first) +
-                              self.pair_second)
-            self.pair_first = self.pair_first[mask]
-            self.pair_second = self.pair_second[mask]
-            self.offset_vec = self.offset_vec[mask]
+                        self.pair_first == self.pair_second,
+                        np.logical_or(offset_positive,
+                                      (self.offset_vec == 0).all(axis=1))))
+            else:
+                mask = np.logical_or(
+                    np.logical_and(self.pair_first <= self.pair_second,
+                                   (self.offset_vec == 0).all(axis=1)),
+                    self._positive_offsets(self.offset_vec))
+
+            self.nneighbors = mask.sum()
+            self.npbcneighbors = self.offset_vec[mask].any(axis=1).sum()
+
+            if not self.bothways:
+                self.pair_first = self.pair_first[mask]
+                self.pair_second = self.pair_second[mask]
+                self.offset_vec = self.offset_vec[mask]
+
+            if self.sorted:
+                mask = np.lexsort((self.pair_second, self.pair_first))
+                self.pair_first = self.pair_first[mask]
+                self.pair_second = self.pair_second[mask]
+                self.offset_vec = self.offset_vec[mask]
+        else:
+            self.nneighbors = 0
+            self.npbcneighbors = 0
 
         # Compute the index array point to the first neighbor
         self.first_neigh = first_neighbors(len(positions), self.pair_first)
@@ -740,6 +753,18 @@ class NewPrimitiveNeighborList:
         return (self.pair_second[self.first_neigh[a]:self.first_neigh[a+1]],
                 self.offset_vec[self.first_neigh[a]:self.first_neigh[a+1]])
 
+    @staticmethod
+    def _positive_offsets(offset_vec):
+        """Mask of cell offsets that are lexicographically positive."""
+        return np.logical_or(
+            offset_vec[:, 0] > 0,
+            np.logical_and(
+                offset_vec[:, 0] == 0,
+                np.logical_or(
+                    offset_vec[:, 1] > 0,
+                    np.logical_and(offset_vec[:, 1] == 0,
+                                   offset_vec[:, 2] > 0))))
+
 
 
 class PrimitiveNeighborList:
@@ -922,7 +947,8 @@ class NeighborList:
     primitive: :class:`~ase.neighborlist.PrimitiveNeighborList` or :class:`~ase.neighborlist.NewPrimitiveNeighborList` class
         Define which implementation to use. Older and quadratically-scaling
         :class:`~ase.neighborlist.PrimitiveNeighborList` or newer and
-        linearly-scaling :class:`~ase.neighborlist.NewPrimitiveNeighborList`.
+        linearly-scaling :class:`~ase.neighborlist.NewPrimitiveNeighborList`
+        (default).
 
     Example::
 
@@ -932,7 +958,7 @@ class NeighborList:
     """
 
     def __init__(self, cutoffs, skin=0.3, sorted=False, self_interaction=True,
-                 bothways=False, primitive=PrimitiveNeighborList):
+                 bothways=False, primitive=NewPrimitiveNeighborList):
         self.nl = primitive(cutoffs, skin, sorted,
                             self_interaction=self_interaction,
                             bothways=bothways)
@@ -4,11 +4,12 @@ from ase.optimize.mdmin import MDMin
 from ase.optimize.fire import FIRE
 from ase.optimize.lbfgs import LBFGS, LBFGSLineSearch
 from ase.optimize.bfgslinesearch import BFGSLineSearch
-from ase.optimize.bfgs import BFGS
+from ase.optimize.bfgs import BFGS, LowRankBFGS
 from ase.optimize.oldqn import GoodOldQuasiNewton
 from ase.optimize.gpmin.gpmin import GPMin
+from ase.optimize.batch import BatchOptimizer
 QuasiNewton = BFGSLineSearch
 
 __all__ = ['MDMin', 'FIRE', 'LBFGS',
-           'LBFGSLineSearch', 'BFGSLineSearch', 'BFGS',
-           'GoodOldQuasiNewton', 'QuasiNewton', 'GPMin']
+           'LBFGSLineSearch', 'BFGSLineSearch', 'BFGS', 'LowRankBFGS',
+           'GoodOldQuasiNewton', 'QuasiNewton', 'GPMin', 'BatchOptimizer']
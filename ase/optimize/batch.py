@@ -0,0 +1,234 @@
+"""Relax many structures in lock-step."""
+
+import multiprocessing
+import traceback
+
+from ase.calculators.singlepoint import SinglePointCalculator
+from ase.optimize.bfgs import BFGS
+from ase.utils import basestring
+
+
+class BatchOptimizer:
+    def __init__(self, images, optimizer=BFGS, calculate=None,
+                 processes=None, logfile=None, trajectory=None,
+                 restart=None, **kwargs):
+        """Relax many independent structures together.
+
+        One optimizer is created for each structure, and all structures
+        take a step at the same time, so that the energies and forces
+        for one step can be calculated together.  Each structure takes
+        the same steps as it would with optimizer.run() and is dropped
+        from the batch when it has converged.
+
+        Parameters:
+
+        images: list of Atoms objects
+            The structures to relax.
+
+        optimizer: Optimizer class
+            Optimizer to use for each structure (default is BFGS).
+            Additional keyword arguments are passed on to it.
+
+        calculate: function
+            Function that calculates the energies and forces of many
+            structures at once::
+
+                energies, forces = calculate(images)
+
+            The forces are the raw forces (before constraints are
+            applied).  Default is to use the calculators of the images
+            one at a time.
+
+        processes: int
+            Calculate the structures in this many worker processes.  The
+            structures are divided between the workers and each worker
+            keeps its structures and their calculators, so only the
+            positions are sent to the workers.  Call close() to stop the
+            worker processes.
+
+        logfile, trajectory, restart: str, list of str or None
+            A name containing '{}' is formatted with the index of the
+            structure (for example 'relax-{}.traj'), and a list gives
+            one name per structure.  Other values are used for all
+            structures (default is None for no output).
+
+        With *calculate* or *processes*, the structures are given
+        SinglePointCalculators with the results of the last step, and
+        the optimizer must not ask for energies or forces of other
+        configurations than the ones it is given (this rules out the
+        line-search optimizers and GPMin).
+        """
+        if calculate is not None and processes is not None:
+            raise ValueError('Use either calculate or processes')
+
+        self.images = list(images)
+        self.calculate = calculate
+        self.processes = processes
+        self.workers = None  # BatchProcesses object
+
+        n = len(self.images)
+        logfiles = get_names(logfile, n)
+        trajectories = get_names(trajectory, n)
+        restarts = get_names(restart, n)
+        self.optimizers = [optimizer(atoms, restart=restarts[i],
+                                     logfile=logfiles[i],
+                                     trajectory=trajectories[i],
+                                     **kwargs)
+                           for i, atoms in enumerate(self.images)]
+        self.active = list(range(n))
+
+    def __len__(self):
+        return len(self.images)
+
+    def irun(self, fmax=0.05, steps=100000000):
+        """Relax the structures as a generator.
+
+        Yields the list of indices of the structures that have not yet
+        converged after each step."""
+        self.fmax = fmax
+        for i in self.active:
+            self.optimizers[i].fmax = fmax
+        step = 0
+        while self.active and step < steps:
+            self.calculate_forces(self.active)
+            active = []
+            for i in self.active:
+                opt = self.optimizers[i]
+                if opt.force_consistent is None:
+                    opt.set_force_consistent()
+                f = opt.atoms.get_forces()
+                opt.log(f)
+                opt.call_observers()
+                if opt.converged(f):
+                    continue
+                opt.step(f)
+                opt.nsteps += 1
+                active.append(i)
+            self.active = active
+            step += 1
+            yield self.active
+
+    def run(self, fmax=0.05, steps=100000000):
+        """Relax the structures.
+
+        Returns True when all structures have converged.  Each structure
+        is relaxed until the forces on all its atoms are less than
+        *fmax* or until it has taken *steps* steps."""
+        for active in self.irun(fmax, steps):
+            pass
+        return not self.active
+
+    def calculate_forces(self, indices):
+        """Calculate energies and forces of some of the structures."""
+        if self.calculate is None and self.processes is None:
+            for i in indices:
+                self.images[i].get_forces()
+            return
+
+        images = [self.images[i] for i in indices]
+        if self.calculate is not None:
+            energies, forces = self.calculate(images)
+        else:
+            if self.workers is None:
+                self.workers = BatchProcesses(self.images, self.processes)
+            energies, forces = self.workers.calculate(self.images, indices)
+
+        for atoms, energy, f in zip(images, energies, forces):
+            atoms.calc = SinglePointCalculator(atoms, energy=energy,
+                                               forces=f)
+
+    def close(self):
+        """Stop worker processes."""
+        if self.workers is not None:
+            self.workers.close()
+            self.workers = None
+
+
+def get_names(name, n):
+    """Get one file name (or file object) for each of n structures."""
+    if isinstance(name, basestring) and name != '-':
+        if '{' not in name:
+            raise ValueError('The name {0!r} would be used for all '
+                             'structures.  Use a name like {1!r}.'
+                             .format(name, 'relax-{}.traj'))
+        return [name.format(i) for i in range(n)]
+    if isinstance(name, (list, tuple)):
+        if len(name) != n:
+            raise ValueError('Expected {0} names, got {1}'
+                             .format(n, len(name)))
+        return list(name)
+    return [name] * n
+
+
+class BatchProcesses:
+    def __init__(self, images, processes):
+        """Calculate structures in worker processes.
+
+        Worker number w gets the structures with indices w, w + processes,
+        w + 2 * processes, ... together with their calculators.  The
+        positions are sent to the workers and the energies and raw forces
+        are returned through pipes."""
+        self.pipes = []
+        self.workers = []
+        for w in range(min(processes, len(images))):
+            pipe, child = multiprocessing.Pipe()
+            worker = multiprocessing.Process(
+                target=batch_worker,
+                args=(dict((i, images[i])
+                           for i in range(w, len(images), processes)),
+                      child))
+            worker.daemon = True
+            worker.start()
+            child.close()
+            self.pipes.append(pipe)
+            self.workers.append(worker)
+
+    def calculate(self, images, indices):
+        """Return energies and forces of images[i] for i in indices."""
+        jobs = [[] for pipe in self.pipes]
+        for i in indices:
+            jobs[i % len(self.pipes)].append((i, images[i].get_positions()))
+        for pipe, job in zip(self.pipes, jobs):
+            pipe.send(job)
+        results = {}
+        errors = []
+        for pipe in self.pipes:
+            result = pipe.recv()
+            if isinstance(result, basestring):
+                errors.append(result)
+            else:
+                results.update(result)
+        if errors:
+            raise RuntimeError('Calculation failed:\n' + errors[0])
+        return ([results[i][0] for i in indices],
+                [results[i][1] for i in indices])
+
+    def close(self):
+        for pipe in self.pipes:
+            pipe.send(None)
+            pipe.close()
+        for worker in self.workers:
+            worker.join()
+
+
+def batch_worker(images, pipe):
+    """Calculate the images that the parent asks for until told to stop."""
+    while True:
+        try:
+            job = pipe.recv()
+        except EOFError:  # parent is gone
+            break
+        if job is None:
+            break
+        results = {}
+        try:
+            for i, positions in job:
+                atoms = images[i]
+                atoms.set_positions(positions, apply_constraint=False)
+                results[i] = (atoms.get_potential_energy(),
+                              atoms.get_forces(apply_constraint=False))
+        except Exception:
+            pipe.send(traceback.format_exc())
+        else:
+            pipe.send(results)
+    pipe.close()
@@ -2,7 +2,7 @@
 import warnings
 
 import numpy as np
-from numpy.linalg import eigh
+from numpy.linalg import eigh, norm
 
 from ase.optimize.optimize import Optimizer
 from ase.utils import basestring
@@ -131,3 +131,111 @@ class oldBFGS(BFGS):
         """
         dr /= np.maximum(steplengths / self.maxstep, 1.0).reshape(-1, 1)
         return dr
+
+
+class LowRankBFGS(BFGS):
+    def __init__(self, atoms, restart=None, logfile='-', trajectory=None,
+                 maxstep=0.04, master=None, memory=None):
+        """BFGS optimizer for large systems.
+
+        Takes the same steps as :class:`BFGS`, but the Hessian is
+        stored as 70 eV/Å^2 times the identity matrix plus a low-rank
+        correction::
+
+            H = 70 * I + Q M Q^T,
+
+        where Q has orthonormal columns spanning the force and step
+        vectors of the BFGS updates.  The steps are found from the
+        eigenvalues of the small matrix M instead of diagonalizing the
+        full 3N x 3N Hessian, and the restart file stores only Q and M.
+
+        Parameters:
+
+        atoms, restart, logfile, trajectory, maxstep, master:
+            See :class:`BFGS`.
+
+        memory: int or None
+            Maximum rank of the correction.  When it grows larger, only
+            the eigenvectors of M with the largest eigenvalues (in
+            absolute value) are kept.  Default is no limit, which gives
+            exactly the same steps as :class:`BFGS`.
+        """
+        self.memory = memory
+        BFGS.__init__(self, atoms, restart, logfile, trajectory, maxstep,
+                      master)
+
+    def todict(self):
+        d = BFGS.todict(self)
+        d.update(memory=self.memory)
+        return d
+
+    def initialize(self):
+        self.Q = None
+        self.M = None
+        self.r0 = None
+        self.f0 = None
+
+    def read(self):
+        self.Q, self.M, self.r0, self.f0, self.maxstep = self.load()
+
+    def step(self, f):
+        atoms = self.atoms
+        r = atoms.get_positions()
+        f = f.reshape(-1)
+        self.update(r.ravel(), f, self.r0, self.f0)
+        omega, V = eigh(self.M + 70.0 * np.eye(len(self.M)))
+        fQ = np.dot(f, self.Q)
+        dr = (np.dot(self.Q, np.dot(V, np.dot(fQ, V) / np.fabs(omega))) +
+              (f - np.dot(self.Q, fQ)) / 70.0).reshape((-1, 3))
+        steplengths = (dr**2).sum(1)**0.5
+        dr = self.determine_step(dr, steplengths)
+        atoms.set_positions(r + dr)
+        self.r0 = r.ravel().copy()
+        self.f0 = f.copy()
+        self.dump((self.Q, self.M, self.r0, self.f0, self.maxstep))
+
+    def update(self, r, f, r0, f0):
+        if self.Q is None:
+            self.Q = np.zeros((3 * len(self.atoms), 0))
+            self.M = np.zeros((0, 0))
+            return
+        dr = r - r0
+
+        if np.abs(dr).max() < 1e-7:
+            # Same configuration again (maybe a restart):
+            return
+
+        df = f - f0
+        a = np.dot(dr, df)
+        dg = 70.0 * dr + np.dot(self.Q, np.dot(self.M, np.dot(dr, self.Q)))
+        b = np.dot(dr, dg)
+        self.expand_basis(df)
+        self.expand_basis(dg)
+        dfQ = np.dot(df, self.Q)
+        dgQ = np.dot(dg, self.Q)
+        self.M -= np.outer(dfQ, dfQ) / a + np.outer(dgQ, dgQ) / b
+
+        if self.memory is not None and len(self.M) > self.memory:
+            omega, V = eigh(self.M)
+            keep = np.argsort(-np.fabs(omega))[:self.memory]
+            self.Q = np.dot(self.Q, V[:, keep])
+            self.M = np.diag(omega[keep])
+
+    def expand_basis(self, x):
+        """Add the part of x orthogonal to the columns of Q to Q."""
+        n0 = norm(x)
+        for i in range(2):  # orthogonalize twice for numerical stability
+            x = x - np.dot(self.Q, np.dot(x, self.Q))
+        n = norm(x)
+        if n < 1e-10 * n0:
+            return
+        self.Q = np.column_stack([self.Q, x / n])
+        m = len(self.M)
+        M = np.zeros((m + 1, m + 1))
+        M[:m, :m] = self.M
+        self.M = M
+
+    def replay_trajectory(self, traj):
+        """Initialize hessian from old trajectory."""
+        self.Q = None
+        BFGS.replay_trajectory(self, traj)
@@ -4,7 +4,8 @@ from ase.optimize.gpmin.kernel import SquaredExponential
 import numpy as np
 
 from scipy.optimize import minimize
-from scipy.linalg import solve_triangular, cho_factor, cho_solve
+from scipy.linalg import (solve_triangular, cho_factor, cho_solve,
+                          cholesky)
 
 from ase.optimize.gpmin.prior import ZeroPrior
 
@@ -35,6 +36,8 @@ class GaussianProcess():
         else:
             self.prior = prior
 
+        self.X = None  # no training set yet
+
     def set_hyperparams(self, params):
         '''Set hyperparameters of the regression. 
         This is a list containing the parameters of the 
@@ -63,21 +66,61 @@ class GaussianProcess():
             self.noise = noise  # Set noise atribute to a different value
 
         self.X = X.copy()  # Store the data in an atribute
+        self.Y = np.array(Y, dtype=float).reshape(len(X), -1)
         K = self.kernel.kernel_matrix(X)  # Compute the kernel matrix
+        self.add_regularization(K, len(X))
 
-        n = self.X.shape[0]
+        self.L, self.lower = cho_factor(K, lower=True, overwrite_a=True,
+                                        check_finite=True)
+        self.solve()
+
+    def add_regularization(self, K, n):
+        '''Add the noise to the diagonal of the kernel matrix of
+        n points.'''
         D = self.X.shape[1]
         regularization = np.array(n*([self.noise*self.kernel.l**2] 
-                                      + D*[self.noise]))
-
+                                     + D*[self.noise]))
         K[range(K.shape[0]), range(K.shape[0])] += regularization**2
 
-        self.m = self.prior.prior(X)
-
-        self.L, self.lower = cho_factor(K, lower=True, check_finite=True)
-        self.a = Y.flatten() - self.m
+    def solve(self):
+        '''Compute the prior and the weights of the data points.'''
+        self.m = self.prior.prior(self.X)
+        self.a = self.Y.flatten() - self.m
         cho_solve((self.L, self.lower), self.a,
-                  overwrite_b=True, check_finite=True)
+                  overwrite_b=True, check_finite=False)
+
+    def add_data(self, X, Y):
+        '''Add observations to a trained model.
+
+        Only the kernel matrix blocks of the new points are computed,
+        and the Cholesky factorization is extended instead of being
+        recomputed, so that the cost is quadratic in the size of the
+        training set.
+
+        X: new observations. numpy array with shape: nnew x D
+        Y: new targets. numpy array with shape (nnew, D+1)'''
+
+        X = np.asarray(X, dtype=float).reshape(-1, self.X.shape[1])
+        Y = np.asarray(Y, dtype=float).reshape(len(X), -1)
+        N = len(self.L)
+        K12 = self.kernel.K(self.X, X)
+        K22 = self.kernel.kernel_matrix(X)
+        self.add_regularization(K22, len(X))
+        L21 = solve_triangular(self.L, K12, lower=True,
+                               check_finite=False).T
+        L22 = cholesky(K22 - np.dot(L21, L21.T), lower=True)
+
+        M = N + len(K22)
+        L = np.zeros((M, M), order='F')  # as from cho_factor()
+        L[:N, :N] = self.L
+        L[N:, :N] = L21
+        L[N:, N:] = L22
+        self.L = L
+        self.lower = True
+
+        self.X = np.vstack([self.X, X])
+        self.Y = np.vstack([self.Y, Y])
+        self.solve()
 
     def predict(self, x, get_variance = False):
         '''Given a trained Gaussian Process, it predicts the value and the 
@@ -122,7 +165,8 @@ class GaussianProcess():
                in the training set- '''
 
         X, Y = args
-        self.kernel.set_params(np.array([self.kernel.weight, l , self.noise]))
+        self.kernel.set_params(np.array([self.kernel.weight, np.squeeze(l),
+                                         self.noise]))
         self.train(X, Y)
 
         y = Y.flatten()
@@ -168,7 +212,7 @@ class GaussianProcess():
             raise NameError("The Gaussian Process could not be fitted.")
         else:
             self.hyperparams = np.array(
-                [self.kernel.weight, result.x.copy(), self.noise])
+                [self.kernel.weight, result.x[0], self.noise])
             
         self.set_hyperparams(self.hyperparams)
         return self.hyperparams
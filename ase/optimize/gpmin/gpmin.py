@@ -16,7 +16,7 @@ class GPMin(Optimizer, GaussianProcess):
     def __init__(self, atoms, restart=None, logfile='-', trajectory=None, prior=None,
                  master=None, noise=0.005, weight=1., update_prior_strategy='maximum',
                  scale=0.4, force_consistent=None, batch_size=5,
-                 update_hyperparams=False):
+                 update_hyperparams=False, memory=None):
 
 
         """Optimize atomic positions using GPMin algorithm, which uses
@@ -88,11 +88,17 @@ class GPMin(Optimizer, GaussianProcess):
             the hyperparameters.
             Only relevant if the optimizer is executed in update
             mode: (update = True)
+
+        memory: int or None
+            Maximum number of points in the training set.  When more
+            points are collected, the oldest ones are removed.
+            Default is to keep all points.
         """
 
         self.nbatch = batch_size
         self.strategy = update_prior_strategy
         self.update_hp = update_hyperparams
+        self.memory = memory
         self.function_calls = 1
         self.force_calls = 0
         self.x_list = []      # Training set features
@@ -129,6 +135,13 @@ class GPMin(Optimizer, GaussianProcess):
         y = np.append(np.array(e).reshape(-1), -f)
         self.y_list.append(y)
 
+        # remove the oldest points
+        nremove = 0
+        if self.memory is not None and len(self.x_list) > self.memory:
+            nremove = len(self.x_list) - self.memory
+            del self.x_list[:nremove]
+            del self.y_list[:nremove]
+
         # Set/update the constant for the prior
         if self.update_prior:
             if self.strategy == 'average':
@@ -144,9 +157,16 @@ class GPMin(Optimizer, GaussianProcess):
         # update hyperparams
         if self.update_hp and self.function_calls % self.nbatch == 0 and self.function_calls != 0:
             self.fit_to_batch()
+            self.X = None  # new hyperparameters: train from scratch
 
         # build the model
-        self.train(np.array(self.x_list), np.array(self.y_list))
+        if (self.X is None or nremove or
+            len(self.X) != len(self.x_list) - 1):
+            self.train(np.array(self.x_list), np.array(self.y_list))
+        else:
+            # Add the new point to the existing model:
+            self.add_data(np.array(self.x_list[-1:]),
+                          np.array(self.y_list[-1:]))
 
     def relax_model(self, r0):
 
@@ -134,33 +134,38 @@ class SquaredExponential(SE_kernel):
         # return np.block([[k,j2],[j1,h]])*self.kernel_function(x1, x2)
         return K * self.kernel_function(x1, x2)
 
-    def kernel_matrix(self, X):
-        '''This is the same method than self.K for X1=X2, but using the matrix is then symmetric'''
-        # rename parameters
-        shape = X.shape
-        if len(shape)>1:
-            D = shape[1]
-        else:
-            D = 1
-        n = shape[0]
+    def K(self, X1, X2):
+        '''Kernel matrix between two data sets, built for all pairs
+        of points at once.  X1 and X2 are arrays of shape (n1, D) and
+        (n2, D), and the result has shape (n1*(D+1), n2*(D+1)).'''
+        X1 = np.asarray(X1, dtype=float).reshape(len(X1), -1)
+        X2 = np.asarray(X2, dtype=float).reshape(len(X2), -1)
+        n1, D = X1.shape
+        n2 = len(X2)
         self.D = D
 
-        # allocate memory
-        K = np.identity((n*(D+1)), dtype=float)
+        d = X1[:, np.newaxis, :] - X2[np.newaxis, :, :]  # n1 x n2 x D
+        k = self.weight**2 * np.exp(-0.5 * (d**2).sum(2) / self.l**2)
+        dk = d * (k / self.l**2)[:, :, np.newaxis]
 
-        # fill upper triangular:
-        for i in range(0, n):
-            for j in range(i+1, n):
-                k = self.kernel(X[i, :], X[j, :])
-                K[i*(D+1):(i+1)*(D+1), j*(D+1):(j+1)*(D+1)] = k
-                K[j*(D+1):(j+1)*(D+1), i*(D+1):(i+1)*(D+1)] = k.T
-            K[i*(D+1):(i+1)*(D+1), 
-              i*(D+1):(i+1)*(D+1)] = self.kernel(X[i, :], X[i, :])
+        K = np.empty((n1, D + 1, n2, D + 1))
+        K[:, 0, :, 0] = k
+        K[:, 0, :, 1:] = dk
+        K[:, 1:, :, 0] = -dk.transpose(0, 2, 1)
+        K[:, 1:, :, 1:] = -np.einsum('abi,abj->aibj', dk, d) / self.l**2
+        diagonal = np.arange(1, D + 1)
+        K[:, diagonal, :, diagonal] += k / self.l**2
+        return K.reshape(n1 * (D + 1), n2 * (D + 1))
 
-        return K
+    def kernel_matrix(self, X):
+        '''This is the same method than self.K for X1=X2'''
+        X = np.asarray(X)
+        if X.ndim == 1:
+            X = X.reshape(-1, 1)
+        return self.K(X, X)
 
     def kernel_vector(self, x, X, nsample):
-        return np.hstack([self.kernel(x, x2) for x2 in X])
+        return self.K(np.reshape(x, (1, -1)), X)
 
     # ---------Derivatives--------
 
@@ -200,8 +205,26 @@ class SquaredExponential(SE_kernel):
 
     def dK_dl(self, X):
         '''Return the derivative of K(X,X) respect of l '''
-
-        return np.block([[self.dK_dl_matrix(x1, x2) for x2 in X] for x1 in X])
+        X = np.asarray(X, dtype=float)
+        n, D = X.shape
+        l = self.l
+
+        d = X[:, np.newaxis, :] - X[np.newaxis, :, :]
+        s = (d**2).sum(2) / l**2  # squared distance
+        k = self.weight**2 * np.exp(-0.5 * s)
+        dj = d * (-2 * (1 - 0.5 * s) / l**3 * k)[:, :, np.newaxis]
+
+        dK = np.empty((n, D + 1, n, D + 1))
+        dK[:, 0, :, 0] = s / l * k
+        dK[:, 0, :, 1:] = dj
+        dK[:, 1:, :, 0] = -dj.transpose(0, 2, 1)
+        # -2 * ((1 - s / 2) * (I - P) - P) / l**3 with P = d d^T / l**2:
+        dK[:, 1:, :, 1:] = np.einsum('abi,abj->aibj',
+                                     d * ((2 - 0.5 * s) * 2 / l**5 *
+                                          k)[:, :, np.newaxis], d)
+        diagonal = np.arange(1, D + 1)
+        dK[:, diagonal, :, diagonal] -= 2 * (1 - 0.5 * s) / l**3 * k
+        return dK.reshape(n * (D + 1), n * (D + 1))
 
     def gradient(self, X):
         '''Computes the gradient of matrix K given the data respect to the scale
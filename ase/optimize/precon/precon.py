@@ -8,11 +8,11 @@ import warnings
 
 import numpy as np
 from scipy import sparse, rand
-from scipy.sparse.linalg import spsolve
+from scipy.sparse.linalg import splu
 
 from ase.constraints import Filter, FixAtoms
 from ase.utils import longsum
-from ase.geometry import wrap_positions
+from ase.geometry import find_mic
 import ase.utils.ff as ff
 import ase.units as units
 from ase.optimize.precon.neighbors import (get_neighbours,
@@ -99,6 +99,7 @@ class Precon(object):
         self.array_convention = array_convention
         self.recalc_mu = recalc_mu
         self.P = None
+        self.lu = None
         self.old_positions = None
 
         use_pyamg = False
@@ -175,31 +176,41 @@ class Precon(object):
         if recalc_mu:
             self.estimate_mu(atoms)
 
-        if self.P is not None:
-            real_atoms = atoms
-            if isinstance(atoms, Filter):
-                real_atoms = atoms.atoms
-            if self.old_positions is None:
-                self.old_positions = wrap_positions(real_atoms.positions,
-                                                    real_atoms.cell)
-            displacement = wrap_positions(real_atoms.positions,
-                                          real_atoms.cell) - self.old_positions
-            self.old_positions = real_atoms.get_positions()
-            max_abs_displacement = abs(displacement).max()
-            #print('max(abs(displacements)) = %.2f A (%.2f r_NN)' %
-            #            (max_abs_displacement, max_abs_displacement / self.r_NN))
-            if max_abs_displacement < 0.5 * self.r_NN:
-                return self.P
+        if self.P is not None and not self._needs_rebuild(atoms):
+            return self.P
 
         #start_time = time.time()
 
         # Create the preconditioner:
         self._make_sparse_precon(atoms, force_stab=self.force_stab)
+        self._store_positions(atoms)
 
         #print('--- Precon created in %s seconds ---' %
         #            (time.time() - start_time))
         return self.P
 
+    def _store_positions(self, atoms):
+        if isinstance(atoms, Filter):
+            atoms = atoms.atoms
+        self.old_positions = atoms.get_positions()
+
+    def _needs_rebuild(self, atoms):
+        """Check if the atoms have moved too far since self.P was built.
+
+        The matrix (and its factorization) is reused as long as no atom
+        has moved more than 0.5 * r_NN."""
+        if self.old_positions is None:
+            self._store_positions(atoms)
+            return False
+        if isinstance(atoms, Filter):
+            atoms = atoms.atoms
+        displacement, _ = find_mic(atoms.positions - self.old_positions,
+                                   atoms.cell, atoms.pbc)
+        max_abs_displacement = abs(displacement).max()
+        #print('max(abs(displacements)) = %.2f A (%.2f r_NN)' %
+        #            (max_abs_displacement, max_abs_displacement / self.r_NN))
+        return max_abs_displacement >= 0.5 * self.r_NN
+
     def _make_sparse_precon(self, atoms, initial_assembly=False,
                             force_stab=False):
         """Create a sparse preconditioner matrix based on the passed atoms.
@@ -293,28 +304,18 @@ class Precon(object):
         if self.dim == 1:
             self.P = csc_P
         elif self.array_convention == 'F':
-            csc_P = csc_P.tocsr()
-            self.P = csc_P
-            for i in range(self.dim - 1):
-                self.P = sparse.block_diag((self.P, csc_P)).tocsr()
+            # one block per component
+            self.P = sparse.kron(sparse.identity(self.dim), csc_P,
+                                 format='csr')
         else:
-            # convert back to triplet and read the arrays
-            csc_P = csc_P.tocoo()
-            i = csc_P.row * self.dim
-            j = csc_P.col * self.dim
-            z = csc_P.data
-
             # N-dimensionalise, interlaced coordinates
-            I = np.hstack([i + d for d in range(self.dim)])
-            J = np.hstack([j + d for d in range(self.dim)])
-            Z = np.hstack([z for d in range(self.dim)])
-            self.P = sparse.csc_matrix((Z, (I, J)),
-                                       shape=(self.dim * N, self.dim * N))
-            self.P = self.P.tocsr()
+            self.P = sparse.kron(csc_P, sparse.identity(self.dim),
+                                 format='csr')
         #print('--- N-dim precon created in %s s ---' %
         #            (time.time() - start_time))
 
         # Create solver
+        self.lu = None  # factorized when first needed by self.solve()
         if self.use_pyamg and have_pyamg:
             #start_time = time.time()
             self.ml = smoothed_aggregation_solver(
@@ -359,11 +360,37 @@ class Precon(object):
                               maxiter=300,
                               cycle='W')
         else:
-            y = spsolve(self.P, x)
+            if self.lu is None:
+                self.factorize()
+            if self.lu.shape[0] == len(x):
+                y = self.lu.solve(x)
+            elif self.array_convention == 'F':
+                y = self.lu.solve(x.reshape((self.dim, -1)).T).T.ravel()
+            else:
+                y = self.lu.solve(x.reshape((-1, self.dim))).ravel()
         #print('--- Precon applied in %s seconds ---' %
         #            (time.time() - start_time))
         return y
 
+    def factorize(self):
+        """Compute the sparse LU factorization used by self.solve()
+
+        The factorization is kept until the preconditioner matrix is
+        rebuilt, so that it is only computed once for many calls to
+        self.solve().  If the matrix acts in the same way on each of the
+        self.dim components, only the N by N matrix self.csc_P is
+        factorized.
+        """
+        P = self.P
+        csc_P = getattr(self, 'csc_P', None)
+        if csc_P is not None and csc_P.shape[0] * self.dim == P.shape[0]:
+            P = csc_P
+        # P is symmetric and positive definite:
+        self.lu = splu(sparse.csc_matrix(P), permc_spec='MMD_AT_PLUS_A',
+                       diag_pivot_thresh=0.0,
+                       options={'SymmetricMode': True})
+        return self.lu
+
     def get_coeff(self, r):
         raise NotImplementedError('Must be overridden by subclasses')
 
@@ -804,6 +831,7 @@ class FF(Precon):
         #            (time.time() - start_time))
 
         # Create solver
+        self.lu = None  # factorized when first needed by self.solve()
         if self.use_pyamg:
             #start_time = time.time()
             self.ml = smoothed_aggregation_solver(
@@ -902,27 +930,14 @@ class Exp_FF(Exp, FF):
         if recalc_mu:
             self.estimate_mu(atoms)
 
-        if self.P is not None:
-            real_atoms = atoms
-            if isinstance(atoms, Filter):
-                real_atoms = atoms.atoms
-            if self.old_positions is None:
-                self.old_positions = wrap_positions(real_atoms.positions,
-                                                    real_atoms.cell)
-            displacement = wrap_positions(real_atoms.positions,
-                                          real_atoms.cell) - self.old_positions
-            self.old_positions = real_atoms.get_positions()
-            max_abs_displacement = abs(displacement).max()
-            print('max(abs(displacements)) = %.2f A (%.2f r_NN)' %
-                        (max_abs_displacement,
-                         max_abs_displacement / self.r_NN))
-            if max_abs_displacement < 0.5 * self.r_NN:
-                return self.P
+        if self.P is not None and not self._needs_rebuild(atoms):
+            return self.P
 
         #start_time = time.time()
 
         # Create the preconditioner:
         self._make_sparse_precon(atoms, force_stab=self.force_stab)
+        self._store_positions(atoms)
 
         #print('--- Precon created in %s seconds ---' % (time.time() - start_time))
         return self.P
@@ -1097,6 +1112,7 @@ class Exp_FF(Exp, FF):
         self.P = self.P.tocsr()
 
         # Create solver
+        self.lu = None  # factorized when first needed by self.solve()
         if self.use_pyamg:
             #start_time = time.time()
             self.ml = smoothed_aggregation_solver(
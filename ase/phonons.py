@@ -16,6 +16,8 @@ from ase.parallel import rank
 from ase.dft import monkhorst_pack
 from ase.io.trajectory import Trajectory
 from ase.utils import opencew, pickleload, basestring
+from ase.vibrations.displacements import (ForceFile, calculate_forces,
+                                          get_symmetry_operations, map_atoms)
 
 
 class Displacement:
@@ -66,6 +68,7 @@ class Displacement:
         self.name = name
         self.delta = delta
         self.N_c = supercell
+        self.forcefile = None  # ForceFile object used by load()
 
         # Reference cell offset
         if refcell is None:
@@ -123,7 +126,7 @@ class Displacement:
 
         return R_cN
 
-    def run(self):
+    def run(self, processes=None, symmetry=False, symprec=1e-5):
         """Run the calculations for the required displacements.
 
         This will do a calculation for 6 displacements per atom, +-x, +-y, and
@@ -132,6 +135,20 @@ class Displacement:
         file (ending with .pckl), which must be deleted before restarting the
         job. Otherwise the calculation for that displacement will not be done.
 
+        processes: int
+            Do the calculations in this many worker processes and write
+            all results to one file (<name>.ulm) instead of one
+            pickle-file per displacement.  Results already in the file
+            are not calculated again.  The output of ``__call__`` must be
+            a forces-like array.
+        symmetry: bool
+            Skip displacements that are equivalent by symmetry to
+            displacements that have already been calculated (implies
+            processes=1 if processes is not given).  Only symmetry
+            operations that map the Cartesian axes onto each other are
+            used.
+        symprec: float
+            Tolerance in Ang for finding symmetry operations.
         """
 
         # Atoms in the supercell -- repeated in the lattice vector directions
@@ -142,6 +159,10 @@ class Displacement:
         assert self.calc is not None, "Provide calculator in __init__ method"
         atoms_N.set_calculator(self.calc)
 
+        if processes is not None or symmetry:
+            self.run_forcefile(atoms_N, processes or 1, symmetry, symprec)
+            return
+
         # Do calculation on equilibrium structure
         filename = self.name + '.eq.pckl'
 
@@ -190,9 +211,106 @@ class Displacement:
                     # Return to initial positions
                     atoms_N.positions[offset + a, i] = pos[a, i]
 
+    def run_forcefile(self, atoms_N, processes, symmetry, symprec):
+        """Calculate displacements and write results to <name>.ulm."""
+        natoms = len(self.atoms)
+        offset = natoms * self.offset
+        pos_av = atoms_N.get_positions()
+
+        names = {}  # map from (a, i, sign) to name
+        for a in self.indices:
+            for i in range(3):
+                for sign in [-1, 1]:
+                    names[(a, i, sign)] = '%s.%d%s%s' % (
+                        self.name, a, 'xyz'[i], ' +-'[sign])
+
+        if symmetry:
+            equivalent = self.find_equivalent_displacements(atoms_N, names,
+                                                            symprec)
+        else:
+            equivalent = {}
+
+        jobs = [(self.name + '.eq', pos_av)]
+        for (a, i, sign), name in names.items():
+            if name not in equivalent:
+                pos = pos_av.copy()
+                pos[offset + a, i] += sign * self.delta
+                jobs.append((name, pos))
+
+        forcefile = ForceFile(self.name + '.ulm')
+        try:
+            calculate_forces(atoms_N, sorted(jobs), self, forcefile,
+                             processes)
+            for name, (name0, R, P) in sorted(equivalent.items()):
+                if name not in forcefile:
+                    forces = np.empty_like(forcefile[name0])
+                    forces[P] = np.dot(forcefile[name0], R.T)
+                    forcefile.write(name, forces)
+        finally:
+            forcefile.close()
+            self.forcefile = None
+
+    def find_equivalent_displacements(self, atoms_N, names, symprec):
+        """Find displacements that can be obtained by symmetry.
+
+        Returns dict mapping names to (name0, R, P) tuples, where the
+        output for name0 must be rotated by R and permuted by P."""
+        natoms = len(self.atoms)
+        N_c = np.array(self.N_c)
+        # Unit cell of reference cell atoms:
+        cell_c = np.array(np.unravel_index(self.offset, N_c))
+        atoms_c = np.array([np.unravel_index(n, N_c)
+                            for n in range(len(atoms_N) // natoms)])
+
+        ops = []
+        for R, t in get_symmetry_operations(self.atoms, symprec):
+            P = map_atoms(atoms_N, R, t, symprec)
+            if P is not None:  # also a symmetry of the supercell
+                ops.append((R, P))
+
+        equivalent = {}
+        irreducible = set()
+        for (a, i, sign), name in sorted(names.items()):
+            if name in equivalent:
+                continue
+            irreducible.add(name)
+            A = natoms * self.offset + a
+            for R, P in ops:
+                # Translate displaced atom back to the reference cell:
+                shift_c = cell_c - atoms_c[P[A] // natoms]
+                cells = np.ravel_multi_index(
+                    ((atoms_c[P // natoms] + shift_c) % N_c).T, N_c)
+                P = cells * natoms + P % natoms
+                b = P[A] - natoms * self.offset
+                j = abs(R[:, i]).argmax()
+                key = (b, j, sign * int(R[j, i]))
+                name2 = names.get(key)
+                if (name2 is not None and name2 not in irreducible and
+                    name2 not in equivalent):
+                    equivalent[name2] = (name, R, P)
+        return equivalent
+
+    def load(self, name):
+        """Load output for name (like "phonon.0x-").
+
+        The output is read from the <name>.ulm file written by
+        run(processes=...) or from a pickle-file."""
+        filename = self.name + '.ulm'
+        if isfile(filename):
+            if self.forcefile is None or name not in self.forcefile:
+                self.forcefile = ForceFile(filename)
+            if name in self.forcefile:
+                return self.forcefile[name]
+        with open(name + '.pckl', 'rb') as fd:
+            return pickleload(fd)
+
     def clean(self):
         """Delete generated pickle files."""
 
+        self.forcefile = None
+        if isfile(self.name + '.ulm'):
+            remove(self.name + '.ulm')
+
         if isfile(self.name + '.eq.pckl'):
             remove(self.name + '.eq.pckl')
 
@@ -295,8 +413,7 @@ class Phonons(Displacement):
     def check_eq_forces(self):
         """Check maximum size of forces in the equilibrium structure."""
 
-        fname = '%s.eq.pckl' % self.name
-        feq_av = pickleload(open(fname, 'rb'))
+        feq_av = self.load(self.name + '.eq')
 
         fmin = feq_av.max()
         fmax = feq_av.min()
@@ -391,8 +508,8 @@ class Phonons(Displacement):
             for j, v in enumerate('xyz'):
                 # Atomic forces for a displacement of atom a in direction v
                 basename = '%s.%d%s' % (self.name, a, v)
-                fminus_av = pickleload(open(basename + '-.pckl', 'rb'))
-                fplus_av = pickleload(open(basename + '+.pckl', 'rb'))
+                fminus_av = self.load(basename + '-')
+                fplus_av = self.load(basename + '+')
 
                 if method == 'frederiksen':
                     fminus_av[a] -= fminus_av.sum(0)
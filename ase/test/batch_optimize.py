@@ -0,0 +1,86 @@
+from ase.build import bulk
+from ase.calculators.emt import EMT
+from ase.constraints import FixAtoms
+from ase.io import read
+from ase.optimize import BFGS, FIRE, BatchOptimizer
+
+
+def structures():
+    images = []
+    for i, repeat in enumerate([(1, 1, 1), (2, 1, 1), (1, 1, 1)]):
+        atoms = bulk('Cu', cubic=True) * repeat
+        atoms.rattle(0.1, seed=i)
+        del atoms[i]
+        atoms.calc = EMT()
+        images.append(atoms)
+    images[1].set_constraint(FixAtoms([0]))
+    return images
+
+
+def sequential(optimizer, steps=100):
+    images = structures()
+    nsteps = []
+    for atoms in images:
+        opt = optimizer(atoms, logfile=None)
+        opt.run(fmax=0.01, steps=steps)
+        nsteps.append(opt.nsteps)
+    return images, nsteps
+
+
+calls = []
+
+
+def calculate(images):
+    calls.append(len(images))
+    energies = []
+    forces = []
+    for atoms in images:
+        atoms = atoms.copy()
+        atoms.calc = EMT()
+        energies.append(atoms.get_potential_energy())
+        forces.append(atoms.get_forces(apply_constraint=False))
+    return energies, forces
+
+
+for optimizer in [BFGS, FIRE]:
+    images0, nsteps0 = sequential(optimizer)
+    assert len(set(nsteps0)) == 3
+    for kwargs in [{}, {'calculate': calculate}, {'processes': 2}]:
+        calls[:] = []
+        images = structures()
+        batch = BatchOptimizer(images, optimizer, trajectory='batch-{}.traj',
+                               **kwargs)
+        assert batch.run(fmax=0.01)
+        batch.close()
+        for atoms, atoms0, opt, n in zip(images, images0,
+                                         batch.optimizers, nsteps0):
+            assert opt.nsteps == n
+            assert abs(atoms.positions - atoms0.positions).max() < 1e-10
+            assert abs(atoms.get_forces() - atoms0.get_forces()).max() < 1e-10
+        # Converged structures are dropped:
+        if 'calculate' in kwargs:
+            assert calls == sorted(calls, reverse=True)
+            assert len(calls) == max(nsteps0) + 1 and calls[-1] == 1
+        for i, n in enumerate(nsteps0):
+            traj = read('batch-{}.traj'.format(i), ':')
+            assert len(traj) == n + 1
+            assert abs(traj[-1].get_forces() -
+                       images[i].get_forces()).max() < 1e-10
+
+# Limited number of steps:
+images0, nsteps0 = sequential(BFGS, steps=5)
+images = structures()
+batch = BatchOptimizer(images, processes=2)
+assert not batch.run(fmax=0.01, steps=5)
+batch.close()
+for atoms, atoms0 in zip(images, images0):
+    assert abs(atoms.positions - atoms0.positions).max() < 1e-10
+assert [opt.nsteps for opt in batch.optimizers] == nsteps0
+
+# One name for all logfiles is not allowed:
+try:
+    BatchOptimizer(structures(), logfile='batch.log')
+except ValueError:
+    pass
+else:
+    assert 0
@@ -0,0 +1,52 @@
+import pickle
+
+import numpy as np
+
+from ase.build import bulk
+from ase.calculators.emt import EMT
+from ase.optimize.bfgs import BFGS, LowRankBFGS
+
+atoms = bulk('Cu', cubic=True) * (2, 1, 1)
+atoms.rattle(0.1, seed=3)
+del atoms[5]
+
+
+def relax(cls, steps=100, **kwargs):
+    a = atoms.copy()
+    a.calc = EMT()
+    opt = cls(a, logfile=None, **kwargs)
+    positions = []
+    opt.attach(lambda: positions.append(a.get_positions()))
+    opt.run(fmax=0.01, steps=steps)
+    return opt, np.array(positions)
+
+
+# Same steps as BFGS:
+opt1, p1 = relax(BFGS, trajectory='bfgs.traj', restart='bfgs.pckl')
+opt2, p2 = relax(LowRankBFGS, restart='lowrank.pckl')
+assert p1.shape == p2.shape
+assert abs(p1 - p2).max() < 1e-10
+with open('lowrank.pckl', 'rb') as fd:
+    Q, M, r0, f0, maxstep = pickle.load(fd)
+assert Q.shape == (3 * len(atoms), len(M))
+
+# Continue from restart file:
+opt3, p3 = relax(LowRankBFGS, steps=5, restart='lowrank2.pckl')
+a = opt3.atoms.copy()
+a.calc = EMT()
+opt4 = LowRankBFGS(a, logfile=None, restart='lowrank2.pckl')
+opt4.run(fmax=0.01, steps=3)
+n = len(p3)
+assert abs(opt4.atoms.positions - p2[n + 3]).max() < 1e-10
+
+# Hessian from old trajectory:
+opt = LowRankBFGS(atoms.copy())
+opt.replay_trajectory('bfgs.traj')
+H = 70 * np.eye(3 * len(atoms)) + np.dot(opt.Q, np.dot(opt.M, opt.Q.T))
+opt1.replay_trajectory('bfgs.traj')
+assert abs(H - opt1.H).max() < 1e-8
+
+# Limited rank:
+opt5, p5 = relax(LowRankBFGS, memory=10)
+assert opt5.converged()
+assert len(opt5.M) <= 10
@@ -0,0 +1,60 @@
+import numpy as np
+
+from ase.build import molecule
+from ase.constraints import FixBondLengths
+
+# Water molecules across the cell boundary with O-H1, O-H2 and H1-H2 bonds:
+atoms = molecule('H2O', vacuum=1.0).repeat((2, 2, 1))
+atoms.pbc = True
+atoms.positions += (0.3, 0.4, 0.0)
+atoms.wrap()
+pairs = [(3 * i + j, 3 * i + (j + 1) % 3)
+         for i in range(4) for j in [0, 1, 2]]
+c = FixBondLengths(pairs)
+groups = c.get_groups()
+assert len(groups) == 3
+for j in groups:
+    assert len(np.unique(c.pairs[j])) == 2 * len(j)
+assert sorted(np.concatenate(groups).tolist()) == list(range(12))
+
+d0 = np.array([atoms.get_distance(i, j, mic=True) for i, j in pairs])
+assert abs(c.initialize_bond_lengths(atoms) - d0).max() < 1e-14
+
+rng = np.random.RandomState(17)
+new = atoms.positions + rng.normal(scale=0.05, size=(12, 3))
+c.adjust_positions(atoms, new)
+atoms2 = atoms.copy()
+atoms2.positions = new
+d1 = np.array([atoms2.get_distance(i, j, mic=True) for i, j in pairs])
+assert abs(d1 - d0).max() < 1e-12
+
+# No velocity along the bonds after adjusting the momenta:
+p = rng.normal(size=(12, 3))
+c.adjust_momenta(atoms, p)
+v = p / atoms.get_masses()[:, np.newaxis]
+for i, j in pairs:
+    d = atoms.get_distance(i, j, mic=True, vector=True)
+    assert abs(np.dot(v[i] - v[j], d)) < 1e-12
+
+# New groups when the pairs change:
+atoms.constraints = c
+c = atoms[3:].constraints[0]
+assert len(c.pairs) == 9
+assert sum(len(j) for j in c.get_groups()) == 9
+
+# Bond lengths given as a list:
+atoms = molecule('H2O')
+c = FixBondLengths([(0, 1), (0, 2)], bondlengths=[1.0, 1.0])
+atoms.set_constraint(c)
+atoms.set_positions(atoms.positions + rng.normal(scale=0.05, size=(3, 3)))
+assert abs(atoms.get_distance(0, 1) - 1.0) < 1e-12
+assert abs(atoms.get_distance(0, 2) - 1.0) < 1e-12
+
+# No pairs:
+atoms = molecule('H2O')
+atoms.set_constraint(FixBondLengths([]))
+positions = atoms.positions + 0.1
+atoms.set_positions(positions)
+assert (atoms.positions == positions).all()
+atoms.set_momenta(positions)
+assert (atoms.get_momenta() == positions).all()
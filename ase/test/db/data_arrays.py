@@ -0,0 +1,88 @@
+import optparse
+
+import numpy as np
+
+from ase import Atoms
+from ase.db import connect
+from ase.db.convert import convert
+from ase.db.row import LazyArray
+
+data = {'x': np.arange(5.0),
+        'c': np.ones((2, 2)) * (1 + 2j),
+        'b': np.array([True, False]),
+        'i': np.arange(6).reshape((2, 3)),
+        'e': np.zeros((0, 3)),
+        'text': 'abc',
+        'nested': {'a': np.ones(2)}}
+
+
+def check(data2, arrays=['x', 'c', 'b', 'i', 'e']):
+    assert sorted(data2) == sorted(data)
+    for key in arrays:
+        assert data2[key].dtype == data[key].dtype
+        assert data2[key].shape == data[key].shape
+        assert (data2[key] == data[key]).all()
+    assert data2['text'] == 'abc'
+    assert (data2['nested']['a'] == 1).all()
+
+
+db = connect('data_arrays.db', append=False)
+id = db.write(Atoms('H'), data=data, i=1)
+con = db._connect()
+assert con.execute('SELECT COUNT(*) FROM data_arrays').fetchone()[0] == 5
+
+# Arrays are read one at a time when used:
+row = db.get(id)
+assert isinstance(row._data['x'], LazyArray)
+assert (row.data.x == np.arange(5)).all()
+assert isinstance(row._data['i'], LazyArray)
+check(row.data)
+check(dict(row.data))
+row.data.x[0] = 7.0  # writable
+
+db.update(id, j=2)
+check(db.get(id).data)
+db.update(id, data={'x': np.arange(2)})
+assert (db.get(id).data.x == [0, 1]).all()
+row = db.get(id)
+db.delete([id])
+assert con.execute('SELECT COUNT(*) FROM data_arrays').fetchone()[0] == 0
+try:
+    row.data.x
+except KeyError:
+    pass
+else:
+    assert 0
+
+# Rows can be copied to another database:
+id = db.write(Atoms('H'), data=data)
+db2 = connect('data_arrays.json', append=False)
+db2.write(db.get(id), data=db.get(id).data)
+json_arrays = ['x', 'c', 'b', 'i']  # 'e' becomes [] in JSON
+check(db2.get(1).data, json_arrays)
+
+# Old files keep the arrays as JSON text until they are converted:
+db = connect('data_arrays_old.db', append=False)
+db._initialize(db._connect())
+db.version = 8
+db.write(Atoms('H'), data=data)
+con = db._connect()
+con.execute('DROP TABLE data_arrays')
+con.execute('UPDATE information SET value="8" WHERE name="version"')
+con.commit()
+
+db = connect('data_arrays_old.db')
+check(db.get(1).data, json_arrays)
+db.write(Atoms('H'), data=data)
+check(db.get(2).data, json_arrays)
+
+opts = optparse.Values({'convert_strings_to_numbers': False,
+                        'convert_minus_to_not_a_number': False,
+                        'remove_constraints': False})
+convert('data_arrays_old.db', opts)
+db = connect('data_arrays_old.db')
+con = db._connect()
+assert con.execute('SELECT COUNT(*) FROM data_arrays').fetchone()[0] == 8
+for row in db.select():
+    assert isinstance(row._data['x'], LazyArray)
+    check(row.data, json_arrays)
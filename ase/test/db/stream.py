@@ -0,0 +1,56 @@
+import numpy as np
+
+from ase import Atoms
+from ase.db import connect
+
+for name in ['stream.json', 'stream.db']:
+    db = connect(name, append=False)
+    db.write_many((Atoms('H', magmoms=[i]), {'i': i, 'even': i % 2 == 0},
+                   {'x': np.arange(i)})
+                  for i in range(25))
+
+    for fetchsize in [1, 4, 25, 100]:
+        ids = [row.id for row in db.select(fetchsize=fetchsize)]
+        assert ids == list(range(1, 26))
+        assert [row.i for row in db.select(even=True, limit=5, offset=2,
+                                           fetchsize=fetchsize)] == \
+            [4, 6, 8, 10, 12]
+        assert [row.i for row in db.select(sort='-i', limit=7,
+                                           fetchsize=fetchsize)] == \
+            list(range(24, 17, -1))
+        # Equal values are sorted by id, missing values come last:
+        odd = list(range(2, 26, 2))
+        even = list(range(1, 26, 2))
+        assert [row.id for row in db.select(sort='even',
+                                            fetchsize=fetchsize)] == \
+            odd + even
+        assert [row.id for row in db.select(sort='-even', offset=3, limit=20,
+                                            fetchsize=fetchsize)] == \
+            (even + odd)[3:23]
+        assert [row.id for row in db.select(sort='energy',
+                                            fetchsize=fetchsize)] == ids
+        assert [row.id for row in db.select(columns=['energy'], limit=3,
+                                            offset=20,
+                                            fetchsize=fetchsize)] == \
+            [21, 22, 23]
+
+    # Write to the database while looping over a selection
+    for row in db.select(fetchsize=4):
+        db.update(row.id, j=row.i + 1)
+    assert db.count(j=25) == 1
+
+    row = db.get(i=7)
+    assert (row.data.x == np.arange(7)).all()
+
+    if name.endswith('.db'):
+        # Data is decoded when used and written back without decoding
+        id = db.write(Atoms(), data={'s': 'abc'})
+        row = db.get(id)
+        assert not isinstance(row._data, dict)
+        db.write(row, id=row.id)
+        assert db.get(row.id).data.s == 'abc'
+
+        # Arrays are read when used and written back
+        row = db.get(i=8)
+        db.write(row, id=row.id)
+        assert (db.get(row.id).data.x == np.arange(8)).all()
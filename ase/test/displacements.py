@@ -0,0 +1,86 @@
+import os
+
+from ase import Atoms
+from ase.build import bulk
+from ase.calculators.emt import EMT
+from ase.phonons import Phonons
+from ase.vibrations import Vibrations
+from ase.vibrations.displacements import ForceFile
+
+
+class CountingEMT(EMT):
+    ncalcs = 0
+
+    def calculate(self, *args, **kwargs):
+        CountingEMT.ncalcs += 1
+        EMT.calculate(self, *args, **kwargs)
+
+
+class FailingEMT(CountingEMT):
+    def calculate(self, *args, **kwargs):
+        if CountingEMT.ncalcs == 5:
+            raise RuntimeError
+        CountingEMT.calculate(self, *args, **kwargs)
+
+
+# Vibrations:
+n2 = Atoms('N2', positions=[(0, 0, 0), (0, 0, 1.1)], calculator=EMT())
+vib = Vibrations(n2)
+vib.run()
+e1 = vib.get_energies()
+vib.clean()
+
+vib = Vibrations(n2, name='vibp')
+vib.run(processes=2)
+assert not [name for name in os.listdir('.')
+            if name.startswith('vibp.') and name.endswith('.pckl')]
+assert len(ForceFile('vibp.ulm')) == 13
+assert abs(vib.get_energies() - e1).max() < 1e-9
+assert vib.clean() == 1
+
+# Restart after an interrupted run:
+n2.calc = FailingEMT()
+vib = Vibrations(n2, name='vibr')
+CountingEMT.ncalcs = 0
+try:
+    vib.run(processes=1)
+except RuntimeError:
+    pass
+assert len(ForceFile('vibr.ulm')) == 5
+n2.calc = CountingEMT()
+vib = Vibrations(n2, name='vibr')
+CountingEMT.ncalcs = 0
+vib.run(processes=1)
+assert CountingEMT.ncalcs == 8
+assert abs(vib.get_energies() - e1).max() < 1e-9
+
+# Phonons:
+atoms = bulk('Cu', 'fcc', a=3.6, cubic=True)
+atoms.symbols[0] = 'Au'
+C_N = []
+for name, kwargs in [('ph', {}),
+                     ('php', {'processes': 2}),
+                     ('phs', {'symmetry': True})]:
+    CountingEMT.ncalcs = 0
+    ph = Phonons(atoms, CountingEMT(), supercell=(2, 2, 2), name=name)
+    ph.run(**kwargs)
+    if name == 'phs':
+        # One displacement for Au and two for Cu plus the equilibrium:
+        assert CountingEMT.ncalcs == 4
+    ph.read(acoustic=True)
+    C_N.append(ph.C_N)
+    ph.clean()
+
+assert abs(C_N[1] - C_N[0]).max() < 1e-10
+assert abs(C_N[2] - C_N[0]).max() < 1e-10
+
+# Low symmetry:
+atoms = bulk('Ni', 'hcp', a=2.5)
+atoms.rattle(0.01, seed=1)
+atoms.symbols[1] = 'Cu'
+ph = Phonons(atoms, CountingEMT(), supercell=(2, 2, 2), name='phr')
+CountingEMT.ncalcs = 0
+ph.run(symmetry=True)
+assert CountingEMT.ncalcs == 13
+ph.read()
+ph.clean()
@@ -0,0 +1,151 @@
+"""Check the pair evaluation of the EAM calculator for all potential forms.
+
+Potentials in alloy, fs and adp format are written from analytic
+functions and read back.  Energies are compared to a sum over
+neighbor pairs done one pair at a time and forces to finite
+differences.
+"""
+import os
+
+import numpy as np
+from scipy.interpolate import InterpolatedUnivariateSpline as spline
+
+from ase.build import bulk
+from ase.calculators.eam import EAM
+from ase.calculators.test import numeric_force
+from ase.neighborlist import neighbor_list
+
+cutoff = 5.0
+n = 250
+rs = np.arange(n) * cutoff / n
+rhos = np.arange(n) * 0.02
+
+
+def smooth(r):
+    return np.where(r < cutoff, ((cutoff - r) / cutoff)**4, 0.0)
+
+
+def tabulate(f, x):
+    return spline(x, f(x))
+
+
+def density(a, b):
+    return tabulate(lambda r: (0.3 + 0.1 * a + 0.05 * b) *
+                    np.exp(-r) * smooth(r), rs)
+
+
+def embedded_energy(a):
+    return tabulate(lambda rho: -(1 + a) * np.sqrt(rho) + 0.01 * rho**2, rhos)
+
+
+def pair(a, b, scale):
+    return tabulate(lambda r: scale * (a + b + 1) * smooth(r) *
+                    (3 * np.exp(-2 * (r - 2.5)) - 2 * np.exp(-(r - 2.5))),
+                    rs)
+
+
+elements = ['Al', 'Cu']
+phi = np.empty((2, 2), object)
+d = np.empty((2, 2), object)
+q = np.empty((2, 2), object)
+for a in range(2):
+    for b in range(2):
+        phi[a, b] = pair(a, b, 0.1)
+        d[a, b] = pair(a, b, 0.01)
+        q[a, b] = pair(a, b, -0.005)
+
+parameters = dict(elements=elements,
+                  embedded_energy=np.array([embedded_energy(0),
+                                            embedded_energy(1)]),
+                  electron_density=np.array([density(0, 0), density(1, 0)]),
+                  phi=phi, cutoff=cutoff,
+                  Z=[13, 29], nr=n, nrho=n, dr=cutoff / n, drho=0.02,
+                  lattice=['fcc', 'fcc'], mass=[26.982, 63.546],
+                  a=[4.05, 3.61])
+
+alloy = EAM(form='alloy', **parameters)
+alloy.Nelements = 2
+alloy.write_potential('test.eam.alloy')
+
+adp = EAM(form='adp', **parameters)
+adp.Nelements = 2
+adp.d_data = np.array([[d[a, b](rs) for b in range(2)] for a in range(2)])
+adp.q_data = np.array([[q[a, b](rs) for b in range(2)] for a in range(2)])
+adp.write_potential('test.eam.adp')
+
+parameters['electron_density'] = np.array([[density(a, b) for b in range(2)]
+                                           for a in range(2)], object)
+fs = EAM(form='fs', **parameters)
+fs.Nelements = 2
+fs.write_potential('test.eam.fs')
+
+
+def reference_energy(calc, atoms):
+    """Energy summed up one neighbor pair at a time."""
+    index = [calc.elements.index(s) for s in atoms.get_chemical_symbols()]
+    rho = np.zeros(len(atoms))
+    mu = np.zeros((len(atoms), 3))
+    lam = np.zeros((len(atoms), 3, 3))
+    energy = 0.0
+    for i, j, r, D in zip(*neighbor_list('ijdD', atoms, calc.cutoff)):
+        a = index[i]
+        b = index[j]
+        energy += calc.phi[a, b](r) / 2
+        if calc.form == 'fs':
+            rho[i] += calc.electron_density[b, a](r)
+        else:
+            rho[i] += calc.electron_density[b](r)
+        if calc.form == 'adp':
+            mu[i] += calc.d[a, b](r) * D
+            lam[i] += calc.q[a, b](r) * np.outer(D, D)
+    for i in range(len(atoms)):
+        energy += calc.embedded_energy[index[i]](rho[i])
+        energy += ((mu[i]**2).sum() + (lam[i]**2).sum()) / 2
+        energy -= lam[i].trace()**2 / 6
+    return energy
+
+
+atoms = bulk('Al', 'fcc', a=4.05, cubic=True).repeat((2, 2, 3))
+atoms.rattle(0.1, seed=42)
+atoms.symbols[::3] = 'Cu'
+
+for filename in ['test.eam.alloy', 'test.eam.fs', 'test.eam.adp']:
+    calc = EAM(potential=filename)
+    atoms.set_calculator(calc)
+    energy = atoms.get_potential_energy()
+    forces = atoms.get_forces()
+    print(filename, energy)
+
+    assert abs(energy - reference_energy(calc, atoms)) < 1e-10
+    assert abs(atoms.get_potential_energies().sum() - energy) < 1e-10
+    for a in [0, 1, 7]:
+        for i in range(3):
+            f = numeric_force(atoms, a, i, 1e-5)
+            assert abs(f - forces[a, i]) < 1e-6, (a, i, f, forces[a, i])
+
+    # New neighbor list for a new cutoff or skin:
+    calc.cutoff = 4.0
+    calc.reset()
+    assert abs(atoms.get_potential_energy() -
+               reference_energy(calc, atoms)) < 1e-10
+    assert (calc.neighbors.nl.cutoffs == 2.0 + calc.parameters.skin).all()
+    calc.set(skin=0.5)
+    assert abs(atoms.get_potential_energy() -
+               reference_energy(calc, atoms)) < 1e-10
+    assert calc.neighbors.nl.skin == 0.5
+
+    atoms.set_calculator(EAM(potential=filename, dtype='float32'))
+    energy32 = atoms.get_potential_energy()
+    assert abs(energy32 - energy) < 1e-4
+    assert abs(atoms.get_forces() - forces).max() < 1e-4
+
+    # Changing the precision later:
+    calc = EAM(potential=filename)
+    atoms.set_calculator(calc)
+    calc.set(dtype='float32')
+    assert calc.embedded_energy[0].dtype == np.float32
+    assert atoms.get_potential_energy() == energy32
+    calc.set(dtype='float64')
+    assert abs(atoms.get_potential_energy() - energy) < 1e-10
+
+    os.remove(filename)
@@ -0,0 +1,96 @@
+"""Compare vectorized EMT with a pair-by-pair evaluation."""
+from math import sqrt, exp, log
+
+import numpy as np
+
+from ase import Atom
+from ase.build import fcc111
+from ase.calculators.emt import EMT, beta
+
+
+def pairwise(calc, atoms):
+    """Energy and forces of EMT calculated one pair at a time."""
+    calc.get_potential_energy(atoms)
+    numbers = atoms.numbers
+    positions = atoms.positions
+    cell = atoms.cell
+    acut = calc.acut
+    rc = calc.rc
+    energy = 0.0
+    sigma1 = np.zeros(len(atoms))
+    deds = np.zeros(len(atoms))
+    forces = np.zeros((len(atoms), 3))
+    pairs = []
+    for a1 in range(len(atoms)):
+        neighbors, offsets = calc.nl.get_neighbors(a1)
+        for a2, offset in zip(neighbors, np.dot(offsets, cell)):
+            d = positions[a2] + offset - positions[a1]
+            r = sqrt(np.dot(d, d))
+            if r < calc.rc_list:
+                pairs.append((a1, a2, d, r, calc.par[numbers[a1]],
+                              calc.par[numbers[a2]],
+                              calc.ksi[numbers[a1]][numbers[a2]]))
+
+    # Pair energies and densities:
+    for a1, a2, d, r, p1, p2, ksi in pairs:
+        x = exp(acut * (r - rc))
+        theta = 1.0 / (1.0 + x)
+        y1 = (0.5 * p1['V0'] * exp(-p2['kappa'] * (r / beta - p2['s0'])) *
+              ksi / p1['gamma2'] * theta)
+        y2 = (0.5 * p2['V0'] * exp(-p1['kappa'] * (r / beta - p1['s0'])) /
+              ksi / p2['gamma2'] * theta)
+        energy -= y1 + y2
+        f = ((y1 * p2['kappa'] + y2 * p1['kappa']) / beta +
+             (y1 + y2) * acut * theta * x) * d / r
+        forces[a1] += f
+        forces[a2] -= f
+        sigma1[a1] += (exp(-p2['eta2'] * (r - beta * p2['s0'])) *
+                       ksi * theta / p1['gamma1'])
+        sigma1[a2] += (exp(-p1['eta2'] * (r - beta * p1['s0'])) /
+                       ksi * theta / p2['gamma1'])
+
+    # Embedding energies:
+    for a in range(len(atoms)):
+        p = calc.par[numbers[a]]
+        try:
+            ds = -log(sigma1[a] / 12) / (beta * p['eta2'])
+        except (OverflowError, ValueError):
+            energy -= p['E0']
+            continue
+        x = p['lambda'] * ds
+        y = exp(-x)
+        z = 6 * p['V0'] * exp(-p['kappa'] * ds)
+        deds[a] = ((x * y * p['E0'] * p['lambda'] + p['kappa'] * z) /
+                   (sigma1[a] * beta * p['eta2']))
+        energy += p['E0'] * ((1 + x) * y - 1) + z
+
+    # Embedding forces:
+    for a1, a2, d, r, p1, p2, ksi in pairs:
+        x = exp(acut * (r - rc))
+        theta = 1.0 / (1.0 + x)
+        y1 = (exp(-p2['eta2'] * (r - beta * p2['s0'])) *
+              ksi / p1['gamma1'] * theta * deds[a1])
+        y2 = (exp(-p1['eta2'] * (r - beta * p1['s0'])) /
+              ksi / p2['gamma1'] * theta * deds[a2])
+        f = ((y1 * p2['eta2'] + y2 * p1['eta2']) +
+             (y1 + y2) * acut * theta * x) * d / r
+        forces[a1] -= f
+        forces[a2] += f
+
+    return energy, forces
+
+
+atoms = fcc111('Cu', (3, 3, 4), vacuum=5.0)
+atoms.symbols[[1, 5, 14]] = 'Au'
+atoms.symbols[[7, 20]] = 'Pt'
+atoms.append(Atom('Ni', (0.0, 0.0, 30.0)))  # isolated atom
+atoms.rattle(0.1, seed=42)
+
+for asap_cutoff in [False, True]:
+    atoms.calc = EMT(asap_cutoff=asap_cutoff)
+    e = atoms.get_potential_energy()
+    f = atoms.get_forces()
+    e0, f0 = pairwise(atoms.calc, atoms)
+    print(e, e0)
+    assert abs(e - e0) < 1e-10
+    assert abs(f - f0).max() < 1e-10
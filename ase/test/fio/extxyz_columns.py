@@ -0,0 +1,57 @@
+import numpy as np
+
+from ase.build import bulk
+from ase.calculators.singlepoint import SinglePointCalculator
+from ase.io import read, write
+from ase.io.extxyz import _parse_block, parse_properties
+
+rng = np.random.RandomState(7)
+atoms = bulk('Cu', cubic=True).repeat((2, 2, 2))
+atoms.symbols[:3] = 'Au'
+atoms.positions += rng.normal(size=(len(atoms), 3)) * 10**rng.uniform(
+    -9, 3, size=(len(atoms), 3))
+atoms.new_array('ids', np.arange(len(atoms)) - 7)
+atoms.new_array('flag', rng.rand(len(atoms)) > 0.5)
+atoms.new_array('labels', np.array(['a%d' % i for i in range(len(atoms))]))
+atoms.new_array('vectors', rng.rand(len(atoms), 2))
+atoms.calc = SinglePointCalculator(atoms, energy=-1.5,
+                                   forces=rng.normal(size=(len(atoms), 3)))
+write('columns.xyz', atoms)
+atoms2 = read('columns.xyz')
+
+
+def written(array):
+    """Values as they are written with the %16.8f format."""
+    return np.vectorize(lambda x: float('%16.8f' % x))(array)
+
+
+for name, array in atoms.arrays.items():
+    if array.dtype.kind != 'U':  # strings are read as objects
+        assert atoms2.arrays[name].dtype.kind == array.dtype.kind
+    if array.dtype.kind == 'f':
+        array = written(array)
+    assert (atoms2.arrays[name] == array).all(), name
+assert (atoms2.get_forces() == written(atoms.get_forces())).all()
+
+# Columns converted in one go agree with the value-by-value conversion:
+props = 'species:S:1:pos:R:3:n:I:1:ok:L:1'
+properties, names, dtype, convs = parse_properties(props)
+block = ['H 1.0 2.5e-3 -7 3 T\n',
+         'He -0.1 nan 1e300 -4 False\n']
+arrays = _parse_block(block, properties, names, dtype)
+data = np.array([tuple(conv(x) for conv, x in zip(convs, line.split()))
+                 for line in block], dtype)
+assert (arrays['symbols'] == data['species']).all()
+assert arrays['positions'].shape == (2, 3)
+assert (arrays['positions'][:, 0] == data['pos0']).all()
+assert np.isnan(arrays['positions'][1, 1])
+assert arrays['n'].dtype == data['n'].dtype
+assert (arrays['n'] == [3, -4]).all()
+assert (arrays['ok'] == [True, False]).all()
+
+# Lines with extra columns are left to the slow reader:
+assert _parse_block(block[:1] + ['He 0 0 0 1 T extra\n'],
+                    properties, names, dtype) is None
+with open('extra.xyz', 'w') as fd:
+    fd.write('2\n\nH 0 0 0\nH 0 0 0.7 extra\n')
+assert read('extra.xyz').positions[1, 2] == 0.7
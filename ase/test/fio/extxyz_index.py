@@ -0,0 +1,56 @@
+import os
+
+import numpy as np
+
+from ase.build import bulk
+from ase.io import read, write
+from ase.io.extxyz import FrameIndex
+
+images = []
+for i in range(10):
+    atoms = bulk('Cu', cubic=True).repeat((1, 1, i % 3 + 1))
+    atoms.rattle(0.01, seed=i)
+    atoms.info['i'] = i
+    images.append(atoms)
+
+write('index.xyz', images[:6])
+assert not os.path.exists('index.xyz.idx')
+assert read('index.xyz', -1, use_index=True).info['i'] == 5
+assert os.path.exists('index.xyz.idx')
+index = FrameIndex('index.xyz')
+assert len(index) == 6
+
+for i, j in [(-2, 4), (0, 0), (3, 3)]:
+    atoms = read('index.xyz', i, use_index=True)
+    assert atoms.info['i'] == j
+    assert abs(atoms.positions - images[j].positions).max() < 1e-6
+assert [a.info['i'] for a in read('index.xyz', '::-2', use_index=True)] == [
+    5, 3, 1]
+assert [a.info['i'] for a in read('index.xyz', '1:-1:2', use_index=True)] == [
+    1, 3]
+
+# Appended frames are added to the index:
+offsets = index.frames
+write('index.xyz', images[6:], append=True)
+index = FrameIndex('index.xyz')
+assert len(index) == 10
+assert index.frames[:6] == offsets
+assert read('index.xyz', -1, use_index=True).info['i'] == 9
+assert read('index.xyz', 7, use_index=True).info['i'] == 7
+
+# An unfinished frame is left out until it has been written:
+with open('index.xyz', 'a') as fd:
+    fd.write('2\ncomment\nCu 0 0 0\n')
+assert len(FrameIndex('index.xyz')) == 10
+with open('index.xyz', 'a') as fd:
+    fd.write('Cu 0 0 1.8\n')
+atoms = read('index.xyz', -1, use_index=True)
+assert len(atoms) == 2 and atoms.positions[1, 2] == 1.8
+
+# A rewritten file gets a new index:
+write('index.xyz', images[:2])
+assert len(FrameIndex('index.xyz')) == 2
+assert read('index.xyz', -1, use_index=True).info['i'] == 1
+
+# Without an index:
+assert np.all([a.info['i'] for a in read('index.xyz', ':')] == [0, 1])
@@ -0,0 +1,72 @@
+import io
+import os
+
+import numpy as np
+
+from ase.io import read, iread
+from ase.io.lammpsrun import read_lammps_dump, DumpIndex
+
+
+def frame(step, natoms, rng):
+    lines = ['ITEM: TIMESTEP', str(step),
+             'ITEM: NUMBER OF ATOMS', str(natoms),
+             'ITEM: BOX BOUNDS xy xz yz pp pp pp',
+             '-0.5 10.5 0.5', '0.0 10.0 0.0', '0.0 10.0 0.0',
+             'ITEM: ATOMS id type x y z vx vy vz fx fy fz']
+    for i in rng.permutation(natoms):
+        lines.append('{0} {1} {2} {3} {4} {5} {6} {7} {8} {9} {10}'.format(
+            i + 1, 1 + i % 2, *(rng.rand(9) + step)))
+    return '\n'.join(lines) + '\n'
+
+
+rng = np.random.RandomState(3)
+text = ''.join(frame(step, 5 + step, rng) for step in range(6))
+with open('dump.lammpstrj', 'w') as fd:
+    fd.write(text)
+
+images = read('dump.lammpstrj', ':', format='lammps-dump')
+assert [len(atoms) for atoms in images] == [5, 6, 7, 8, 9, 10]
+atoms = images[3]
+assert (atoms.numbers == [1, 2, 1, 2, 1, 2, 1, 2]).all()
+assert (atoms.positions[:, 0] > 3).all()
+assert (atoms.get_forces() > 3).all()
+assert (atoms.get_velocities() != 0).all()
+assert abs(atoms.cell[1, 0] - 0.5) < 1e-12
+
+# Streams, indices and sidecar files give the same images:
+for kwargs in [{}, {'use_index': True}, {'use_index': True}]:
+    for index in [-1, 2, '-2:', '1::2', '::-1', '-4:-1']:
+        images2 = read('dump.lammpstrj', index, format='lammps-dump',
+                       **kwargs)
+        fd = io.StringIO(text)
+        images3 = read(fd, index, format='lammps-dump')
+        if not isinstance(images2, list):
+            images2 = [images2]
+            images3 = [images3]
+            index = slice(index, index + 1 or None)
+        elif isinstance(index, str):
+            index = slice(*[int(i) if i else None for i in index.split(':')])
+        for a, b, c in zip(images[index], images2, images3):
+            assert a == b == c
+            assert (a.get_forces() == b.get_forces()).all()
+            assert (a.get_forces() == c.get_forces()).all()
+assert os.path.isfile('dump.lammpstrj.idx')
+assert len(DumpIndex('dump.lammpstrj')) == 6
+
+assert len(list(iread('dump.lammpstrj', format='lammps-dump'))) == 6
+
+# Only some of the columns:
+atoms = read_lammps_dump('dump.lammpstrj', 3, columns=['x', 'y', 'z'])
+assert atoms == images[3]
+assert atoms.calc is None
+assert not atoms.has('momenta')
+
+atoms = read_lammps_dump('dump.lammpstrj', 3, order=False)
+assert sorted(atoms.positions[:, 0]) == sorted(images[3].positions[:, 0])
+
+# Frames appended to the file are found:
+with open('dump.lammpstrj', 'a') as fd:
+    fd.write(frame(6, 3, rng))
+assert len(read('dump.lammpstrj', -1, format='lammps-dump',
+                use_index=True)) == 3
+assert len(DumpIndex('dump.lammpstrj')) == 7
@@ -0,0 +1,57 @@
+from ase.build import molecule
+from ase.cli.main import main
+from ase.db import connect
+from ase.io import iread_files, read, write
+
+names = ['H2O', 'NH3', 'CH4', 'C2H6', 'CO2']
+filenames = []
+for i, name in enumerate(names):
+    filename = 'm{}.xyz'.format(i)
+    write(filename, [molecule(name), molecule(name, vacuum=2.0)])
+    filenames.append(filename)
+with open('bad.xyz', 'w') as fd:
+    fd.write('not an xyz file\n')
+
+for jobs in [1, 2]:
+    results = list(iread_files(filenames, jobs=jobs))
+    assert [r.filename for r in results] == filenames
+    for result, name in zip(results, names):
+        assert result.error is None
+        assert len(result.images) == 1
+        assert result.images[0] == read(result.filename)
+
+    results = list(iread_files(filenames[:2], ':', jobs=jobs,
+                               ordered=False))
+    assert sorted(r.filename for r in results) == filenames[:2]
+    assert [len(r.images) for r in results] == [2, 2]
+    results = list(iread_files(['m0.xyz@:', 'm1.xyz'], jobs=jobs))
+    assert [len(r.images) for r in results] == [2, 1]
+
+    # Errors are returned or raised:
+    results = list(iread_files(['bad.xyz', 'm1.xyz', 'missing.xyz'],
+                               jobs=jobs, errors='return'))
+    assert [len(r.images) for r in results] == [0, 1, 0]
+    assert results[1].error is None
+    assert isinstance(results[2].error, IOError)
+    try:
+        list(iread_files(filenames + ['missing.xyz'], jobs=jobs))
+    except IOError:
+        pass
+    else:
+        assert 0
+
+main(args=['convert', '-j', '2'] + filenames + ['all.traj'])
+assert [atoms.get_chemical_formula() for atoms in read('all.traj', ':')] == [
+    molecule(name).get_chemical_formula() for name in names for i in [0, 1]]
+
+args = ['db', '-q', 'm.db', '--jobs', '2', '-k', 'x=1']
+for filename in filenames:
+    args += ['-a', filename]
+main(args=args)
+rows = list(connect('m.db').select(x=1))
+assert [row.formula for row in rows] == [
+    molecule(name).get_chemical_formula() for name in names]
+
+# -a before the database name:
+main(args=['db', '-q', '-a', filenames[0], 'm2.db'])
+assert connect('m2.db').count() == 1
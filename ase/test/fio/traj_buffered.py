@@ -0,0 +1,88 @@
+import numpy as np
+
+import ase.io.ulm as ulm
+from ase.build import bulk
+from ase.calculators.emt import EMT
+from ase.calculators.lj import LennardJones
+from ase.io import Trajectory, read
+
+# Items kept in memory, also when the offsets table has to grow:
+with ulm.open('b.ulm', 'w', flush_interval=7) as w:
+    for i in range(100):
+        w.write(i=i, a=np.arange(i % 5 + 1) * i)
+        w.sync()
+        if i == 9:
+            # Only the first 7 items are in the file:
+            assert len(ulm.open('b.ulm')) == 7
+            w.flush()
+            assert len(ulm.open('b.ulm')) == 10
+r = ulm.open('b.ulm')
+assert len(r) == 100
+for i in [0, 41, 42, 77, 99]:
+    assert r[i].i == i
+    assert (r[i].a == np.arange(i % 5 + 1) * i).all()
+
+atoms = bulk('Cu', cubic=True)
+atoms.calc = EMT()
+images = []
+for i in range(23):
+    a = atoms.copy()
+    a.rattle(0.05, seed=i)
+    a.calc = EMT()
+    a.get_forces()
+    a.info['i'] = i
+    images.append(a)
+
+for kwargs in [{'flush_interval': 10}, {'flush_time': 0.0},
+               {'flush_interval': 1000, 'flush_time': 1000.0}]:
+    traj = Trajectory('b.traj', 'w', **kwargs)
+    for a in images[:15]:
+        traj.write(a)
+    nwritten = len(Trajectory('b.traj'))
+    assert nwritten == {10: 10, 1000: 0}.get(kwargs.get('flush_interval'),
+                                             15), nwritten
+    traj.close()
+
+    # Append more images:
+    with Trajectory('b.traj', 'a', **kwargs) as traj:
+        for a in images[15:]:
+            traj.write(a)
+
+    images2 = read('b.traj', ':')
+    assert len(images2) == len(images)
+    for a, b in zip(images, images2):
+        assert a == b
+        assert b.info == a.info
+        assert abs(a.get_forces() - b.get_forces()).max() < 1e-12
+        assert b.calc.name == 'emt'
+        assert b.calc.parameters == a.calc.todict()
+
+# Calculator parameters are only stored when they change:
+r = ulm.open('b.traj')
+assert 'parameters' in r[0].calculator
+assert 'parameters' not in r[1].calculator
+traj = Trajectory('b.traj', 'w', flush_interval=5)
+traj.write(images[0])
+calc = EMT()
+calc.parameters['asap_cutoff'] = True
+a = images[1].copy()
+a.calc = calc
+traj.write(a)
+traj.write(images[2])
+traj.close()
+r = ulm.open('b.traj')
+assert ['parameters' in r[i].calculator for i in range(3)] == [
+    True, True, False]
+assert Trajectory('b.traj')[1].calc.parameters['asap_cutoff']
+assert Trajectory('b.traj')[2].calc.parameters == images[2].calc.todict()
+
+# First image without calculator:
+traj = Trajectory('b.traj', 'w', flush_interval=5)
+traj.write(images[0].copy())
+for a in images[1:3]:
+    a = a.copy()
+    a.calc = LennardJones(sigma=2.0)
+    traj.write(a)
+traj.close()
+for a in read('b.traj', '1:'):
+    assert a.calc.parameters == {'sigma': 2.0}
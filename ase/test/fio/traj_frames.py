@@ -0,0 +1,124 @@
+import numpy as np
+
+from ase.build import bulk
+from ase.calculators.emt import EMT
+from ase.constraints import FixAtoms
+from ase.io import Trajectory, read, iread
+from ase.io.trajectory import TrajectoryWriter
+from ase.io.frametrajectory import (FrameTrajectoryWriter,
+                                    FrameTrajectoryReader)
+
+atoms = bulk('Cu', cubic=True) * (2, 1, 1)
+atoms.set_constraint(FixAtoms([0]))
+images = []
+for i in range(23):
+    a = atoms.copy()
+    a.rattle(0.05, seed=i)
+    a.cell[0, 0] += 0.01 * i
+    a.set_momenta(np.random.RandomState(i).normal(size=(8, 3)))
+    a.calc = EMT()
+    a.get_forces()
+    images.append(a)
+
+
+def check(images2, images, tol=1e-12):
+    assert len(images2) == len(images)
+    for a, b in zip(images, images2):
+        assert (a.numbers == b.numbers).all()
+        assert (a.pbc == b.pbc).all()
+        assert abs(a.positions - b.positions).max() < tol
+        assert abs(a.cell - b.cell).max() < 1e-12
+        assert abs(a.get_momenta() - b.get_momenta()).max() < tol
+        assert abs(a.get_forces() - b.get_forces()).max() < tol
+        assert a.get_potential_energy() == b.get_potential_energy()
+        assert b.constraints[0].index.tolist() == [0]
+        assert b.calc.name == 'emt'
+
+
+for kwargs in [{}, {'compression': 'zlib'}]:
+    with FrameTrajectoryWriter('f.traj', chunksize=7, **kwargs) as traj:
+        for a in images[:15]:
+            traj.write(a)
+        assert len(traj) == 15
+    assert len(FrameTrajectoryReader('f.traj').backend) == 3
+
+    # Append the rest (in the format of the file):
+    with Trajectory('f.traj', 'a') as traj:
+        assert isinstance(traj, FrameTrajectoryWriter)
+        for a in images[15:]:
+            traj.write(a)
+
+    check(read('f.traj', ':'), images)
+    check(list(iread('f.traj', '::-1')), images[::-1])
+    check([read('f.traj', -2)], [images[-2]])
+    t = Trajectory('f.traj')
+    assert isinstance(t, FrameTrajectoryReader)
+    check(t[3:20:4], images[3:20:4])
+    for index in [slice(None), slice(5, 16), slice(2, 20, 3),
+                  slice(None, None, -1), [22, 0, -1, 8], [-1], [-3, -2]]:
+        if isinstance(index, slice):
+            selected = images[index]
+        else:
+            selected = [images[i] for i in index]
+        assert (t.read_array('forces', index) ==
+                [a.get_forces(apply_constraint=False) for a in selected]).all()
+        assert (t.read_array('energy', index) ==
+                [a.get_potential_energy() for a in selected]).all()
+        assert (t.read_array('cell', index) ==
+                [a.cell for a in selected]).all()
+    assert t.read_array('positions', slice(3, 3)).shape == (0, 8, 3)
+    for index in [[len(t)], [-len(t) - 1]]:
+        try:
+            t.read_array('energy', index)
+        except IndexError:
+            pass
+        else:
+            assert 0
+
+# Single precision per-atom arrays:
+with FrameTrajectoryWriter('f.traj', chunksize=10, dtype=np.float32,
+                           compression='zlib') as traj:
+    for a in images:
+        traj.write(a)
+t = Trajectory('f.traj', memmap=True)
+assert t.read_array('forces').dtype == np.float32
+assert t.read_array('energy').dtype == np.float64
+check(list(t), images, tol=1e-5)
+
+# Only the selected properties:
+with FrameTrajectoryWriter('f.traj', atoms=images[0],
+                           properties=['energy']) as traj:
+    traj.write()
+assert dict(FrameTrajectoryReader('f.traj').shapes).keys() == {
+    'positions', 'cell', 'momenta', 'energy'}
+
+# The atoms and the stored quantities can not change:
+for a in [bulk('Cu', cubic=True), images[0].copy()]:
+    traj = FrameTrajectoryWriter('f.traj')
+    traj.write(images[0])
+    try:
+        traj.write(a)
+    except ValueError:
+        pass
+    else:
+        assert 0
+
+# Appending to an empty file starts a new frame-array trajectory:
+open('e.traj', 'w').close()
+with FrameTrajectoryWriter('e.traj', 'a', images[0]) as traj:
+    traj.write()
+check(read('e.traj', ':'), images[:1])
+
+# Frame-array and ordinary trajectories can not be appended to each other:
+with Trajectory('n.traj', 'w') as traj:
+    traj.write(images[0])
+for writer, filename in [(FrameTrajectoryWriter, 'n.traj'),
+                         (TrajectoryWriter, 'e.traj')]:
+    try:
+        writer(filename, 'a', images[1])
+    except IOError:
+        pass
+    else:
+        assert 0
+check(read('n.traj', ':'), images[:1])
+check(read('e.traj', ':'), images[:1])
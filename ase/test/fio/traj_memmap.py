@@ -0,0 +1,75 @@
+import io
+
+import numpy as np
+
+import ase.io.ulm as ulm
+from ase.build import bulk
+from ase.calculators.singlepoint import SinglePointCalculator
+from ase.io import Trajectory, write
+
+rng = np.random.RandomState(5)
+images = []
+for i in range(12):
+    atoms = bulk('Cu', cubic=True)
+    atoms.positions += rng.normal(scale=0.1, size=(4, 3))
+    atoms.cell[2, 2] += 0.01 * i
+    atoms.set_momenta(rng.normal(size=(4, 3)))
+    atoms.calc = SinglePointCalculator(atoms, energy=-i,
+                                       forces=rng.normal(size=(4, 3)),
+                                       stress=rng.normal(size=6))
+    images.append(atoms)
+write('mm.traj', images)
+
+traj = Trajectory('mm.traj')
+mtraj = Trajectory('mm.traj', memmap=True)
+assert mtraj.backend._buffer is not None
+for i in [0, 5, -1]:
+    a = traj[i]
+    b = mtraj[i]
+    assert a == b
+    assert (a.get_forces() == b.get_forces()).all()
+    assert (a.get_momenta() == b.get_momenta()).all()
+
+# Arrays are read-only views into the file:
+positions = mtraj.backend[3].positions
+assert not positions.flags.writeable
+assert (positions == images[3].positions).all()
+# ... but atoms and calculators get their own copies:
+atoms = mtraj[3]
+atoms.get_forces()[0] = 0.0
+atoms.positions[0] = 0.0
+
+# Many images at once:
+for t in [traj, mtraj]:
+    for index in [slice(None), slice(2, 9, 3), slice(None, None, -1),
+                  [7, 1]]:
+        if isinstance(index, slice):
+            selected = images[index]
+        else:
+            selected = [images[i] for i in index]
+        f = t.read_array('forces', index)
+        assert f.shape == (len(selected), 4, 3)
+        assert (f == [a.get_forces() for a in selected]).all()
+        assert (t.read_array('positions', index) ==
+                [a.positions for a in selected]).all()
+        assert (t.read_array('momenta', index) ==
+                [a.get_momenta() for a in selected]).all()
+        assert (t.read_array('energy', index) ==
+                [a.get_potential_energy() for a in selected]).all()
+        assert (t.read_array('stress', index) ==
+                [a.get_stress() for a in selected]).all()
+        assert (t.read_array('cell', index) ==
+                [a.cell for a in selected]).all()
+assert mtraj.read_array('positions', slice(3, 3)).shape == (0,)
+try:
+    mtraj.read_array('magmoms')
+except KeyError:
+    pass
+else:
+    assert 0
+
+# Files without fileno() are read without a memory map:
+with open('mm.traj', 'rb') as fd:
+    r = ulm.Reader(io.BytesIO(fd.read()), memmap=True)
+assert r._buffer is None
+assert (r.stack('calculator.forces')[4] == images[4].get_forces()).all()
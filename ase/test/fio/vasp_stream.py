@@ -0,0 +1,220 @@
+import io
+
+import numpy as np
+
+from ase import units
+from ase.io import read, iread
+from ase.io.formats import string2index
+from ase.io.vasp import read_vasp_out, read_vasp_xml
+
+nsteps = 6
+rng = np.random.RandomState(42)
+positions = rng.rand(nsteps, 3, 3) * 5
+forces = rng.normal(size=(nsteps, 3, 3))
+energies = -10 - rng.rand(nsteps)
+cells = [np.diag([5.0, 5.0, 5.0 + 0.01 * i]) for i in range(nsteps)]
+
+
+def outcar(late_energy):
+    """OUTCAR with energies after (VASP 5) or before (VASP 4) positions."""
+    lines = [' vasp.5.3.3 18Dez12gamma-only']
+    lines += [' POTCAR:    PAW_PBE Ni 02Aug2007',
+              ' POTCAR:    PAW_PBE O 08Apr2002'] * 2
+    lines += ['   ions per type =               2   1',
+              '   NELECT =      24.0000    total number of electrons']
+    for i in range(nsteps):
+        energy = ['  FREE ENERGIE OF THE ION-ELECTRON SYSTEM (eV)',
+                  '  ---------------------------------------------------',
+                  '  free  energy   TOTEN  =  {0:16.8f} eV'.format(
+                      energies[i] + 0.1),
+                  '',
+                  '  energy  without entropy= {0:16.8f}  '
+                  'energy(sigma->0) = {1:16.8f}'.format(
+                      energies[i] - 0.1, energies[i])]
+        lines.append(' number of electron      24.0000000 magnetization'
+                     '       {0:.7f}'.format(2 + 0.1 * i))
+        lines += [' magnetization (x)', '',
+                  '# of ion       s       p       d       tot',
+                  '-' * 42]
+        for a in range(3):
+            lines.append('    {0}        0.000   0.000   {1:.3f}   {1:.3f}'
+                         .format(a + 1, 0.1 * a + i))
+        lines.append('  in kB  ' + ''.join('{0:12.5f}'.format(i + 0.1 * j)
+                                           for j in range(6)))
+        if i != 3:
+            lines.append('      direct lattice vectors'
+                         '                 reciprocal lattice vectors')
+            for v in cells[i]:
+                lines.append(' ' + ''.join('{0:13.9f}'.format(x)
+                                           for x in np.concatenate([v, v])))
+        if not late_energy:
+            lines += energy
+        lines += [' POSITION                                       '
+                  'TOTAL-FORCE (eV/Angst)',
+                  ' ' + '-' * 80]
+        for p, f in zip(positions[i], forces[i]):
+            # No space between the columns with negative numbers:
+            lines.append('{0:13.5f}{1:13.5f}{2:13.5f}{3:17.6f}{4:14.6f}'
+                         '{5:14.6f}'.format(*np.concatenate([p, f])))
+        lines.append(' ' + '-' * 80)
+        if late_energy:
+            lines += energy
+    return '\n'.join(lines) + '\n'
+
+
+def check(images, steps):
+    assert len(images) == len(steps)
+    for atoms, i in zip(images, steps):
+        assert atoms.get_chemical_symbols() == ['Ni', 'Ni', 'O']
+        assert abs(atoms.positions - positions[i]).max() < 1e-5
+        assert abs(atoms.get_forces() - forces[i]).max() < 1e-6
+        assert abs(atoms.get_potential_energy() - energies[i]) < 1e-8
+        if i == 3:
+            assert not atoms.cell.any()
+        else:
+            assert abs(atoms.cell - cells[i]).max() < 1e-9
+
+
+def same(a, b):
+    assert a == b
+    for name in ['energy', 'forces', 'stress', 'magmoms', 'magmom']:
+        x = a.calc.results.get(name)
+        y = b.calc.results.get(name)
+        assert (x is None) == (y is None), name
+        assert x is None or np.all(x == y), name
+
+
+for late_energy in [True, False]:
+    text = outcar(late_energy)
+    with open('OUTCAR', 'w') as fd:
+        fd.write(text)
+
+    images = read('OUTCAR', ':')
+    check(images, range(nsteps))
+    atoms = images[2]
+    stress = -(2 + 0.1 * np.array([0, 1, 2, 4, 5, 3])) * 0.1 * units.GPa
+    assert abs(atoms.get_stress() - stress).max() < 1e-12
+    assert (atoms.calc.results['magmoms'] == [2, 2.1, 2.2]).all()
+    assert atoms.calc.results['magmom'] == 2.2
+
+    # Single images, tails (found from the end of the file) and slices:
+    for index in [-1, 0, 4, -3, '-1:', '-2:', '-5:', '-6:', '-9:', '1::2',
+                  '::-1', '-4:-1', '2:4']:
+        images2 = read('OUTCAR', index, format='vasp-out')
+        images3 = read(io.StringIO(text), index, format='vasp-out')
+        if isinstance(index, int):
+            expected = [images[index]]
+            images2 = [images2]
+            images3 = [images3]
+        else:
+            expected = images[string2index(index)]
+        assert len(images2) == len(images3) == len(expected)
+        for a, b, c in zip(expected, images2, images3):
+            same(a, b)
+            same(a, c)
+
+    assert len(list(iread('OUTCAR', format='vasp-out'))) == nsteps
+    atoms = read_vasp_out('OUTCAR', -2, force_consistent=True)
+    assert abs(atoms.get_potential_energy() - energies[-2] - 0.1) < 1e-8
+
+
+def vasprun(nsteps):
+    """vasprun.xml file with nsteps ionic steps."""
+    def varray(name, rows):
+        lines = ('   <v>{0} </v>\n'.format(
+            ' '.join('{0:16.8f}'.format(x) for x in row)) for row in rows)
+        return '  <varray name="{0}">\n{1}  </varray>\n'.format(
+            name, ''.join(lines))
+
+    def structure(cell, scaled, name=None):
+        attr = '' if name is None else ' name="{0}"'.format(name)
+        return (' <structure{0}>\n  <crystal>\n{1}  </crystal>\n{2}'
+                ' </structure>\n'.format(attr, varray('basis', cell),
+                                         varray('positions', scaled)))
+
+    def energy(e):
+        return ('  <energy>\n   <i name="e_fr_energy"> {0:16.8f} </i>\n'
+                '   <i name="e_wo_entrp"> {1:16.8f} </i>\n'
+                '   <i name="e_0_energy"> {1:16.8f} </i>\n'
+                '  </energy>\n'.format(e + 0.1, e))
+
+    parts = ['<?xml version="1.0" encoding="ISO-8859-1"?>\n<modeling>\n',
+             ' <kpoints>\n  <generation param="Gamma">\n'
+             '   <v type="int" name="divisions">1 1 1 </v>\n'
+             '  </generation>\n',
+             varray('kpointlist', [[0, 0, 0]]),
+             varray('weights', [[1]]),
+             ' </kpoints>\n <parameters>\n'
+             '  <separator name="electronic">\n'
+             '   <i name="ENCUT">    400.00000000</i>\n'
+             '  </separator>\n </parameters>\n'
+             ' <atominfo>\n  <atoms>       3 </atoms>\n'
+             '  <array name="atoms" >\n   <set>\n'
+             '    <rc><c>Ni</c><c>   1</c></rc>\n'
+             '    <rc><c>Ni</c><c>   1</c></rc>\n'
+             '    <rc><c>O </c><c>   2</c></rc>\n'
+             '   </set>\n  </array>\n </atominfo>\n',
+             structure(cells[0], positions[0] / 5, 'initialpos')]
+    for i in range(nsteps):
+        scaled = np.linalg.solve(cells[i].T, positions[i].T).T
+        parts += [' <calculation>\n',
+                  '  <scstep>\n' + energy(energies[i] + 1) + '  </scstep>\n',
+                  '  <scstep>\n' + energy(energies[i]) + '  </scstep>\n',
+                  structure(cells[i], scaled),
+                  varray('forces', forces[i]),
+                  varray('stress', np.eye(3) * i),
+                  energy(energies[i]),
+                  ' </calculation>\n']
+    parts.append(structure(cells[-1], positions[-1] / 5, 'finalpos'))
+    parts.append('</modeling>\n')
+    return ''.join(parts)
+
+
+def check_xml(images, steps):
+    assert len(images) == len(steps)
+    for atoms, i in zip(images, steps):
+        assert atoms.get_chemical_symbols() == ['Ni', 'Ni', 'O']
+        assert abs(atoms.positions - positions[i]).max() < 1e-6
+        assert abs(atoms.get_forces() - forces[i]).max() < 1e-8
+        assert abs(atoms.get_potential_energy() - energies[i]) < 1e-8
+        assert abs(atoms.cell - cells[i]).max() < 1e-8
+        assert atoms.calc.parameters['encut'] == 400
+
+
+text = vasprun(nsteps)
+with open('vasprun.xml', 'w') as fd:
+    fd.write(text)
+images = read('vasprun.xml', ':')
+check_xml(images, range(nsteps))
+for index in [-1, 0, 4, -3, '-1:', '-2:', '-6:', '-9:', '1::2', '::-1']:
+    images2 = read('vasprun.xml', index)
+    if isinstance(index, int):
+        expected = [images[index]]
+        images2 = [images2]
+    else:
+        expected = images[string2index(index)]
+    assert len(images2) == len(expected)
+    for a, b in zip(expected, images2):
+        same(a, b)
+    # Directly from the file name (read as bytes):
+    if isinstance(index, str):
+        index = string2index(index)
+    images3 = list(read_vasp_xml('vasprun.xml', index))
+    for a, c in zip(expected, images3):
+        same(a, c)
+
+# An unfinished file gives the steps that have an energy:
+with open('vasprun.xml', 'w') as fd:
+    fd.write(text[:text.rindex(' <calculation>') + 200])
+check_xml(read('vasprun.xml', ':'), range(nsteps - 1))
+check_xml([read('vasprun.xml')], [nsteps - 2])
+check_xml(read('vasprun.xml', '-1:'), [nsteps - 2])
+check_xml(read('vasprun.xml', '-2:'), [nsteps - 3, nsteps - 2])
+with open('vasprun.xml', 'w') as fd:
+    fd.write(text[:text.rindex('</calculation>') - 10])
+check_xml(read('vasprun.xml', ':'), range(nsteps))
+check_xml([read('vasprun.xml')], [nsteps - 1])
+with open('vasprun.xml', 'w') as fd:
+    fd.write(text[:text.index('<calculation>') + 10])
+atoms = read('vasprun.xml')
+assert abs(atoms.positions - positions[0]).max() < 1e-6
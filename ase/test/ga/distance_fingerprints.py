@@ -0,0 +1,64 @@
+import numpy as np
+
+from ase.build import bulk
+from ase.calculators.singlepoint import SinglePointCalculator
+from ase.cluster import Icosahedron
+from ase.ga.population import count_looks_like
+from ase.ga.standard_comparators import (InteratomicDistanceComparator,
+                                         get_sorted_dist_list)
+
+
+def reference_dist_list(atoms, mic):
+    pair_cor = {}
+    for n in set(atoms.numbers):
+        i_un = [i for i in range(len(atoms)) if atoms[i].number == n]
+        d = []
+        for i, n1 in enumerate(i_un):
+            for n2 in i_un[i + 1:]:
+                d.append(atoms.get_distance(n1, n2, mic))
+        pair_cor[n] = np.array(sorted(d))
+    return pair_cor
+
+
+# Vectorized distance lists agree with the pair-by-pair ones:
+atoms = bulk('NiCu', 'rocksalt', a=3.6).repeat((2, 3, 2))
+atoms.set_cell(np.dot(atoms.cell, [[1, 0, 0], [0.3, 1, 0], [0, 0.2, 1]]),
+               scale_atoms=True)
+atoms.rattle(0.1, seed=2)
+for mic in [False, True]:
+    p1 = get_sorted_dist_list(atoms, mic)
+    p2 = reference_dist_list(atoms, mic)
+    assert sorted(p1) == sorted(p2)
+    for n in p1:
+        assert abs(p1[n] - p2[n]).max() < 1e-10
+
+# Comparing many candidates at once:
+rng = np.random.RandomState(42)
+cluster = Icosahedron('Cu', 2)
+cluster.symbols[:5] = 'Au'
+candidates = []
+for confid in range(20):
+    a = cluster.copy()
+    a.rattle(0.04, seed=confid)
+    a.info['confid'] = confid
+    a.calc = SinglePointCalculator(a, energy=rng.rand() * 0.1)
+    candidates.append(a)
+
+comp = InteratomicDistanceComparator(n_top=10, pair_cor_cum_diff=0.01,
+                                     pair_cor_max=0.1, dE=0.05)
+a = candidates[0]
+similar = comp.looks_like_many(a, candidates)
+assert similar == [comp.looks_like(a, b) for b in candidates]
+assert similar[0] and 1 < sum(similar) < 20
+assert count_looks_like(a, candidates, comp) == sum(similar) - 1
+
+# The fingerprints are stored and a changed structure is recalculated:
+e0 = a.get_potential_energy()
+assert len(comp.fingerprints) == sum(abs(b.get_potential_energy() - e0) < 0.05
+                                     for b in candidates)
+fp = comp.get_fingerprint(a)
+assert comp.get_fingerprint(a) is fp
+a.positions[-1, 0] += 0.2
+fp2 = comp.get_fingerprint(a)
+assert abs(fp2[29] - fp[29]).max() > 0.01
+assert comp.get_fingerprint(a) is fp2
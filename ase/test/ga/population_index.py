@@ -0,0 +1,103 @@
+from time import time
+
+import numpy as np
+
+from ase.calculators.singlepoint import SinglePointCalculator
+from ase.cluster import Icosahedron
+from ase.ga import set_raw_score
+from ase.ga.population import (CandidateIndex, Population,
+                               count_looks_like)
+from ase.ga.standard_comparators import (InteratomicDistanceComparator,
+                                         SequentialComparator)
+
+
+class Connection:
+    """Minimal data connection serving the first n candidates of a list."""
+    def __init__(self, candidates):
+        self.candidates = candidates
+        self.n = 0
+        self.nold = 0
+
+    def get_all_relaxed_candidates(self, only_new=False, use_extinct=False):
+        nold = self.nold if only_new else 0
+        self.nold = self.n
+        return self.candidates[nold:self.n]
+
+    def get_participation_in_pairing(self):
+        return {}, []
+
+
+def make_candidates(n, erange):
+    rng = np.random.RandomState(17)
+    cluster = Icosahedron('Cu', 2)
+    cluster.symbols[:4] = 'Au'
+    candidates = []
+    for confid in range(n):
+        a = cluster.copy()
+        a.positions += rng.normal(scale=0.03, size=a.positions.shape)
+        e = rng.rand() * erange
+        a.calc = SinglePointCalculator(a, energy=e)
+        a.info['confid'] = confid
+        a.info['relax_id'] = confid
+        a.info['key_value_pairs'] = {}
+        set_raw_score(a, -e)
+        candidates.append(a)
+    return candidates
+
+
+def comparator():
+    return InteratomicDistanceComparator(pair_cor_cum_diff=0.01,
+                                         pair_cor_max=0.2, dE=0.1)
+
+
+# The index finds the same look-alikes as comparing with everything:
+candidates = make_candidates(500, 3.0)
+comp = comparator()
+index = CandidateIndex(comp)
+for a in candidates:
+    index.add(a)
+assert len(index) == 500
+counts = [index.count_looks_like(a) for a in candidates[:10]]
+assert counts == [count_looks_like(a, candidates, comp)
+                  for a in candidates[:10]]
+assert sum(counts) > 0
+index.remove(candidates[1])
+assert len(index) == 499
+assert candidates[1] not in index.neighbors(candidates[1])
+# Other compositions go in other buckets:
+a = candidates[2].copy()
+a.symbols[4] = 'Au'
+a.calc = SinglePointCalculator(a, energy=candidates[2].get_potential_energy())
+assert index.neighbors(a) == []
+
+# Same population with and without the index:
+pops = []
+for comp in [comparator(), SequentialComparator([comparator()])]:
+    dc = Connection(make_candidates(500, 3.0))
+    dc.n = 250
+    pop = Population(dc, 20, comp)
+    dc.n = 500
+    pop.update()
+    assert len(pop.index) == 500
+    assert len(pop.pop_index) == 20
+    pops.append([(a.info['confid'], a.info['looks_like']) for a in pop.pop])
+assert pops[0] == pops[1]
+
+# Scaling to 10000 candidates:
+candidates = make_candidates(10000, 60.0)
+comp = comparator()
+dc = Connection(candidates)
+dc.n = 9900
+t0 = time()
+pop = Population(dc, 50, comp)
+dc.n = 10000
+pop.update()
+t1 = time()
+n1 = [pop.index.count_looks_like(a) for a in candidates[:10]]
+t2 = time()
+n2 = [count_looks_like(a, candidates, comp) for a in candidates[:10]]
+t3 = time()
+assert n1 == n2
+print('Population of 10000 candidates: {0:.2f} s'.format(t1 - t0))
+print('10 look-alike counts with index: {0:.3f} s, without: {1:.3f} s'
+      .format(t2 - t1, t3 - t2))
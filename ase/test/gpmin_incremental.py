@@ -0,0 +1,43 @@
+import numpy as np
+
+from ase.cluster import Icosahedron
+from ase.calculators.emt import EMT
+from ase.optimize import GPMin
+from ase.optimize.gpmin.gp import GaussianProcess
+from ase.optimize.gpmin.kernel import SquaredExponential
+
+rng = np.random.RandomState(42)
+X = rng.normal(size=(7, 4))
+Y = rng.normal(size=(7, 5))
+
+# Kernel matrix from all pairs at once:
+kernel = SquaredExponential()
+kernel.set_params([1.2, 0.8, 0.01])
+K = kernel.kernel_matrix(X)
+K0 = np.block([[kernel.kernel(x1, x2) for x2 in X] for x1 in X])
+assert abs(K - K0).max() < 1e-12
+dK0 = np.block([[kernel.dK_dl_matrix(x1, x2) for x2 in X] for x1 in X])
+assert abs(kernel.dK_dl(X) - dK0).max() < 1e-12
+
+# Adding data gives the same model as training from scratch:
+gp1 = GaussianProcess(kernel=SquaredExponential())
+gp1.set_hyperparams([1.2, 0.8, 0.01])
+gp1.train(X, Y)
+gp2 = GaussianProcess(kernel=SquaredExponential())
+gp2.set_hyperparams([1.2, 0.8, 0.01])
+gp2.train(X[:4], Y[:4])
+gp2.add_data(X[4:6], Y[4:6])
+gp2.add_data(X[6], Y[6])
+assert abs(np.tril(gp1.L) - np.tril(gp2.L)).max() < 1e-10
+assert abs(gp1.a - gp2.a).max() < 1e-10
+x = rng.normal(size=4)
+assert abs(gp1.predict(x) - gp2.predict(x)).max() < 1e-10
+
+# Relaxation with a limited training set:
+atoms = Icosahedron('Cu', 2)
+atoms.rattle(0.05, seed=1)
+atoms.calc = EMT()
+opt = GPMin(atoms, memory=15, logfile=None)
+opt.run(fmax=0.05, steps=100)
+assert opt.converged()
+assert len(opt.x_list) <= 15
@@ -0,0 +1,47 @@
+import numpy as np
+from ase.build import bulk
+from ase.calculators.lj import LennardJones
+from ase.calculators.test import numeric_force
+
+atoms = bulk('Ar', 'fcc', a=1.6) * (2, 2, 3)
+atoms.rattle(0.05, seed=42)
+
+# Reference from an explicit sum over pairs and periodic images
+rc = 3.0
+ref = 0.0
+e0 = 4 * ((1 / rc)**12 - (1 / rc)**6)
+n = 4
+images = [np.dot((n1, n2, n3), atoms.cell)
+          for n1 in range(-n, n + 1)
+          for n2 in range(-n, n + 1)
+          for n3 in range(-n, n + 1)]
+for i in range(len(atoms)):
+    for j in range(len(atoms)):
+        for image in images:
+            r = np.linalg.norm(atoms.positions[j] + image - atoms.positions[i])
+            if 0 < r < rc:
+                ref += 0.5 * (4 * (r**-12 - r**-6) - e0)
+
+for smooth in [False, True]:
+    atoms.calc = LennardJones(smooth=smooth)
+    e = atoms.get_potential_energy()
+    if not smooth:
+        assert abs(e - ref) < 1e-9, (e, ref)
+    assert abs(atoms.get_potential_energies().sum() - e) < 1e-9
+    f = atoms.get_forces()
+    assert abs(f.sum(0)).max() < 1e-9
+    for a in [0, 5]:
+        for c in range(3):
+            assert abs(f[a, c] - numeric_force(atoms, a, c, 1e-5)) < 1e-5
+    s = atoms.get_stress()
+    s_num = atoms.calc.calculate_numerical_stress(atoms, 1e-5)
+    assert abs(s - s_num).max() < 1e-5
+
+# Energy and forces go smoothly to zero at the cutoff
+dimer = bulk('Ar', 'sc', a=10.0) * (2, 1, 1)
+dimer.pbc = False
+dimer.calc = LennardJones(smooth=True, rc=2.5, ro=2.0)
+for r, zero in [(2.0, False), (2.4999, True), (2.5001, True)]:
+    dimer.positions[1, 0] = r
+    assert (abs(dimer.get_potential_energy()) < 1e-7) == zero
+    assert (abs(dimer.get_forces()).max() < 1e-3) == zero
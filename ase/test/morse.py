@@ -0,0 +1,50 @@
+import numpy as np
+from ase.build import bulk
+from ase.cluster import Icosahedron
+from ase.calculators.morse import MorsePotential, fcut
+from ase.calculators.test import numeric_force
+
+
+def reference_energy(atoms, epsilon=1.0, rho0=6.0, r0=1.0,
+                     rcut1=1.9, rcut2=2.7, n=0):
+    """Explicit sum over pairs and periodic images."""
+    images = [np.dot((n1, n2, n3), atoms.cell)
+              for n1 in range(-n, n + 1)
+              for n2 in range(-n, n + 1)
+              for n3 in range(-n, n + 1)]
+    energy = 0.0
+    for i in range(len(atoms)):
+        for j in range(len(atoms)):
+            for image in images:
+                r = np.linalg.norm(atoms.positions[j] + image -
+                                   atoms.positions[i])
+                if r > 0:
+                    expf = np.exp(rho0 * (1.0 - r / r0))
+                    energy += (0.5 * epsilon * expf * (expf - 2) *
+                               fcut(r, rcut1 * r0, rcut2 * r0))
+    return energy
+
+
+# A cluster, where all atoms are within the cutoff
+cluster = Icosahedron('Cu', 2, latticeconstant=1.4)
+cluster.rattle(0.05, seed=42)
+cluster.calc = MorsePotential(rcut1=10.0, rcut2=11.0)
+e = cluster.get_potential_energy()
+assert abs(e - reference_energy(cluster, rcut1=10.0, rcut2=11.0)) < 1e-9
+
+# Periodic system
+atoms = bulk('Cu', 'fcc', a=1.6) * (2, 2, 3)
+atoms.rattle(0.05, seed=42)
+for parameters in [{}, dict(epsilon=0.5, rho0=4.0, r0=1.2, rcut2=2.2)]:
+    atoms.calc = MorsePotential(**parameters)
+    e = atoms.get_potential_energy()
+    assert abs(e - reference_energy(atoms, n=4, **parameters)) < 1e-9
+    assert abs(atoms.get_potential_energies().sum() - e) < 1e-9
+    f = atoms.get_forces()
+    assert abs(f.sum(0)).max() < 1e-9
+    for a in [0, 5]:
+        for c in range(3):
+            assert abs(f[a, c] - numeric_force(atoms, a, c, 1e-5)) < 1e-5
+    s = atoms.get_stress()
+    s_num = atoms.calc.calculate_numerical_stress(atoms, 1e-5)
+    assert abs(s - s_num).max() < 1e-5
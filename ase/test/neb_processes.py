@@ -0,0 +1,74 @@
+import numpy as np
+
+from ase.build import fcc100, add_adsorbate
+from ase.calculators.emt import EMT
+from ase.calculators.lj import LennardJones
+from ase.constraints import FixAtoms
+from ase.neb import NEB
+
+slab = fcc100('Al', size=(2, 2, 2))
+add_adsorbate(slab, 'Au', 1.7, 'hollow')
+slab.center(axis=2, vacuum=4.0)
+slab.set_constraint(FixAtoms(mask=[a.tag > 1 for a in slab]))
+final = slab.copy()
+final[-1].x += slab.get_cell()[0, 0] / 2
+images = [slab] + [slab.copy() for i in range(5)] + [final]
+for image in images:
+    image.calc = EMT()
+
+results = []
+for parallel in [False, 'processes']:
+    neb = NEB(images, parallel=parallel, method='improvedtangent')
+    neb.interpolate()
+    results.append((neb.get_forces(), neb.energies,
+                    [atoms.get_potential_energy()
+                     for atoms in neb.iterimages()]))
+
+for x1, x2 in zip(*results):
+    assert abs(np.array(x1) - x2).max() < 1e-12
+
+# Positions are sent to the workers:
+images[3].positions[-1, 2] += 0.1
+f = neb.get_forces()
+for image in images:
+    image.calc = EMT()
+neb.parallel = False
+assert abs(neb.get_forces() - f).max() < 1e-12
+
+# New calculators start new workers:
+neb.parallel = 'processes'
+for image in images:
+    image.calc = LennardJones()
+f = neb.get_forces()
+neb.parallel = False
+assert abs(neb.get_forces() - f).max() < 1e-12
+
+# Errors are passed on:
+neb.parallel = 'processes'
+images[2].calc = EMT()
+images[2].numbers[0] = 92  # not supported by EMT
+try:
+    neb.get_forces()
+except RuntimeError as ex:
+    assert 'image 2' in str(ex)
+else:
+    assert 0
+
+# A worker process that dies stops all workers:
+images[2].numbers[0] = 13
+images[2].calc = EMT()
+neb.get_forces()
+worker = neb.processes.workers[1]
+worker.terminate()
+worker.join()
+try:
+    neb.get_forces()
+except RuntimeError as ex:
+    assert 'image 2' in str(ex)
+else:
+    assert 0
+assert not neb.processes.workers
+f = neb.get_forces()  # new workers
+neb.parallel = False
+assert abs(neb.get_forces() - f).max() < 1e-12
+neb.close()
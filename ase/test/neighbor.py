@@ -160,3 +160,37 @@ i2 = np.argsort(d2[:, 0]+d2[:, 1]*1e2+d2[:, 2]*1e4+a2*1e6)
 assert np.all(a[i] == a2[i2])
 assert np.all(b[i] == b2[i2])
 assert np.allclose(d[i], d2[i2])
+
+# Compare the binned and the quadratically scaling implementation
+atoms = bulk('Cu', 'fcc', a=3.6) * (3, 3, 2)
+atoms.rattle(0.1, seed=42)
+atoms.pbc = [True, True, False]
+cutoffs = np.linspace(1.0, 1.6, len(atoms))
+for bothways, sorted in [(False, False), (False, True), (True, False)]:
+    nl = PrimitiveNeighborList(cutoffs, skin=0.1, sorted=sorted,
+                               self_interaction=False, bothways=bothways)
+    nl2 = NewPrimitiveNeighborList(cutoffs, skin=0.1, sorted=sorted,
+                                   self_interaction=False, bothways=bothways)
+    nl.update(atoms.pbc, atoms.cell, atoms.positions)
+    nl2.update(atoms.pbc, atoms.cell, atoms.positions)
+    assert nl.nneighbors == nl2.nneighbors
+    assert nl.npbcneighbors == nl2.npbcneighbors
+    for a in range(len(atoms)):
+        i, offsets = nl.get_neighbors(a)
+        i2, offsets2 = nl2.get_neighbors(a)
+        if bothways or sorted:
+            assert len(i) == len(i2)
+            assert (set(zip(i, map(tuple, offsets))) ==
+                    set(zip(i2, map(tuple, offsets2))))
+        if sorted:
+            assert (i2 >= a).all()
+            assert (np.diff(i2) >= 0).all()
+
+# Wrong number of cutoffs
+nl = NewPrimitiveNeighborList([1.0, 1.0])
+try:
+    nl.update([True] * 3, np.eye(3) * 5.0, np.zeros((3, 3)))
+except ValueError:
+    pass
+else:
+    assert False
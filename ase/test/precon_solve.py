@@ -0,0 +1,31 @@
+import numpy as np
+
+from ase.build import bulk
+from ase.optimize.precon import Exp
+
+atoms = bulk('Cu', cubic=True) * (2, 2, 2)
+atoms.rattle(0.05, seed=7)
+atoms.positions -= 0.1  # some atoms outside the cell
+rng = np.random.RandomState(3)
+x = rng.normal(size=3 * len(atoms))
+
+for convention in ['C', 'F']:
+    precon = Exp(mu=1.0, array_convention=convention)
+    P = precon.make_precon(atoms)
+    y = precon.solve(x)
+    assert abs(P.dot(y) - x).max() < 1e-10
+
+    # Small moves reuse the matrix and its factorization:
+    lu = precon.lu
+    atoms.positions += 0.05
+    assert precon.make_precon(atoms) is P
+    precon.solve(x)
+    assert precon.lu is lu
+
+    # Large moves do not:
+    atoms.positions[0] += 2.0
+    assert precon.make_precon(atoms) is not P
+    assert precon.lu is None
+    y = precon.solve(x)
+    assert abs(precon.P.dot(y) - x).max() < 1e-10
+    atoms.positions[0] -= 2.0
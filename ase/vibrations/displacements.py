@@ -0,0 +1,198 @@
+"""Calculate forces for many displaced structures.
+
+This is used by :meth:`ase.vibrations.Vibrations.run` and
+:meth:`ase.phonons.Displacement.run` when they are given the
+*processes* keyword.  All forces are stored in one ULM-file that can
+be read while it is being written and continued after an interruption.
+"""
+from __future__ import print_function
+import itertools
+import multiprocessing
+import os
+import sys
+
+import numpy as np
+from scipy.spatial import cKDTree
+
+from ase.io.ulm import ulmopen
+from ase.parallel import world
+
+
+class ForceFile:
+    """Forces for named structures stored in a ULM-file.
+
+    Each item of the file has a name and a forces array.  Items are
+    written one at a time, so an interrupted run loses at most the
+    item that was being written."""
+
+    def __init__(self, filename):
+        self.filename = filename
+        self.indices = {}  # map from name to index of item
+        self.writer = None
+        if os.path.isfile(filename) and os.path.getsize(filename) > 0:
+            with ulmopen(filename) as reader:
+                if len(reader) > 0:
+                    for i, item in enumerate(reader):
+                        self.indices[item.name] = i
+
+    def __contains__(self, name):
+        return name in self.indices
+
+    def __len__(self):
+        return len(self.indices)
+
+    def __getitem__(self, name):
+        with ulmopen(self.filename, index=self.indices[name]) as reader:
+            return reader.forces
+
+    def write(self, name, forces):
+        if world.rank == 0:
+            if self.writer is None:
+                self.writer = ulmopen(self.filename, 'a', tag='ASE-Forces')
+            self.writer.write(name=name, forces=np.asarray(forces, float))
+            self.writer.sync()
+        self.indices[name] = len(self.indices)
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
+
+
+def calculate_forces(atoms, jobs, calculate, forcefile, processes=1,
+                     log=sys.stdout):
+    """Calculate forces for displaced structures.
+
+    atoms: Atoms object
+        Structure with calculator.  Only the positions are changed.
+    jobs: list of (name, positions) tuples
+        Names and positions of the structures.  Names already in the
+        forcefile are skipped.
+    calculate: callable
+        Function taking an Atoms object and returning the forces.
+    forcefile: ForceFile object
+        Where the results go.
+    processes: int
+        Number of worker processes.  The workers are forked from the
+        current process, so each one gets its own copy of the
+        calculator.  Only positions and forces are sent between
+        processes.
+    """
+    jobs = [(name, positions) for name, positions in jobs
+            if name not in forcefile]
+    if not jobs:
+        return
+
+    if processes == 1:
+        pos0 = atoms.get_positions()
+        try:
+            for name, positions in jobs:
+                atoms.set_positions(positions, apply_constraint=False)
+                forcefile.write(name, calculate(atoms))
+                write_log(log, name, forcefile)
+        finally:
+            atoms.set_positions(pos0, apply_constraint=False)
+        return
+
+    pool = multiprocessing.Pool(processes, initializer=init_worker,
+                                initargs=(atoms, calculate))
+    try:
+        for name, forces in pool.imap_unordered(calculate_in_worker, jobs):
+            forcefile.write(name, forces)
+            write_log(log, name, forcefile)
+    finally:
+        pool.terminate()
+        pool.join()
+
+
+def write_log(log, name, forcefile):
+    if log is not None and world.rank == 0:
+        log.write('Writing {0} to {1}\n'.format(name, forcefile.filename))
+        log.flush()
+
+
+worker = {}  # atoms and calculate function of worker process
+
+
+def init_worker(atoms, calculate):
+    worker['atoms'] = atoms
+    worker['calculate'] = calculate
+
+
+def calculate_in_worker(job):
+    name, positions = job
+    atoms = worker['atoms']
+    atoms.set_positions(positions, apply_constraint=False)
+    return name, worker['calculate'](atoms)
+
+
+def get_forces(atoms):
+    """Forces without constraints applied."""
+    return atoms.get_forces(apply_constraint=False)
+
+
+def signed_permutation_matrices():
+    """The 48 orthogonal matrices that permute and flip the x, y, z axes."""
+    for axes in itertools.permutations(range(3)):
+        for signs in itertools.product([1, -1], repeat=3):
+            R = np.zeros((3, 3))
+            R[range(3), axes] = signs
+            yield R
+
+
+def map_atoms(atoms, R, t, symprec=1e-5):
+    """Find the atoms that the operation x -> Rx + t maps atoms to.
+
+    R is a rotation matrix for Cartesian coordinates and t a
+    translation vector.  Returns the permutation P (atom number k is
+    mapped to atom number P[k]) or None if the operation is not a
+    symmetry of the periodic structure."""
+    cell = atoms.cell
+    M = np.linalg.solve(cell.T, np.dot(R, cell.T))
+    if abs(M - M.round()).max() > 1e-8:
+        return None  # lattice is not mapped to itself
+
+    tree, tol = kdtree(atoms, symprec)
+    x = np.dot(atoms.positions, R.T) + t
+    d, P = tree.query(wrap(np.linalg.solve(cell.T, x.T).T),
+                      distance_upper_bound=tol)
+    if np.isinf(d).any():
+        return None
+    if (atoms.numbers[P] != atoms.numbers).any():
+        return None
+    if len(set(P)) != len(P):
+        return None
+    return P
+
+
+def kdtree(atoms, symprec):
+    """Tree of scaled positions and the tolerance in scaled units."""
+    tol = symprec / np.sqrt((atoms.cell**2).sum(1)).max()
+    return cKDTree(wrap(atoms.get_scaled_positions(wrap=False)),
+                   boxsize=1.0), tol
+
+
+def wrap(spos):
+    spos = spos % 1.0
+    spos[spos >= 1.0] = 0.0  # % can give 1.0 for tiny negative numbers
+    return spos
+
+
+def get_symmetry_operations(atoms, symprec=1e-5):
+    """Find symmetry operations of a periodic structure.
+
+    Only rotations that permute (and flip) the Cartesian axes are
+    considered, because they map displacements along the axes to other
+    displacements along the axes.  Returns list of (R, t) tuples."""
+    assert atoms.pbc.all()
+    numbers = atoms.numbers
+    # Use an atom of the rarest element to get candidate translations:
+    Z = min(set(numbers), key=list(numbers).count)
+    a0 = list(numbers).index(Z)
+    ops = []
+    for R in signed_permutation_matrices():
+        for a in np.where(numbers == Z)[0]:
+            t = atoms.positions[a] - np.dot(R, atoms.positions[a0])
+            if map_atoms(atoms, R, t, symprec) is not None:
+                ops.append((R, t))
+    return ops
@@ -16,6 +16,8 @@ from ase.parallel import rank, paropen
 
 from ase.utils import opencew, pickleload, basestring
 from ase.calculators.singlepoint import SinglePointCalculator
+from ase.vibrations.displacements import (ForceFile, calculate_forces,
+                                          get_forces)
 
 
 class Vibrations:
@@ -104,7 +106,7 @@ class Vibrations:
         self.ir = None
         self.ram = None
 
-    def run(self):
+    def run(self, processes=None):
         """Run the vibration calculations.
 
         This will calculate the forces for 6 displacements per atom +/-x,
@@ -122,8 +124,30 @@ class Vibrations:
         If the program you want to use does not have a calculator in ASE, use
         ``iterdisplace`` to get all displaced structures and calculate the forces
         on your own.
+
+        processes: int
+            Do the calculations in this many worker processes and write
+            all forces to one file (<name>.ulm) instead of one
+            pickle-file per displacement.  Forces already in the file
+            are not calculated again, so an interrupted run can simply
+            be restarted.
         """
 
+        if processes is not None:
+            if self.ir or self.ram:
+                raise NotImplementedError(
+                    'Use run() without processes for dipoles and '
+                    'polarizabilities')
+            jobs = [(name, atoms.get_positions())
+                    for name, atoms in self.iterdisplace()]
+            forcefile = ForceFile(self.name + '.ulm')
+            try:
+                calculate_forces(self.atoms, jobs, get_forces, forcefile,
+                                 processes)
+            finally:
+                forcefile.close()
+            return
+
         for dispName, atoms in self.iterdisplace(inplace=True):
             filename = dispName + '.pckl'
             fd = opencew(filename)
@@ -196,7 +220,7 @@ class Vibrations:
             return 0
 
         n = 0
-        filenames = [self.name + '.eq.pckl']
+        filenames = [self.name + '.ulm', self.name + '.eq.pckl']
         for dispName, a, i, disp in self.displacements():
             filename = dispName + '.pckl'
             filenames.append(filename)
@@ -214,7 +238,13 @@ class Vibrations:
         assert self.method in ['standard', 'frederiksen']
         assert self.direction in ['central', 'forward', 'backward']
 
+        forcefile = None
+        if op.isfile(self.name + '.ulm'):
+            forcefile = ForceFile(self.name + '.ulm')
+
         def load(fname):
+            if forcefile is not None and fname[:-5] in forcefile:
+                return forcefile[fname[:-5]]
             with open(fname, 'rb') as fl:
                 f = pickleload(fl)
             if not hasattr(f, 'shape'):
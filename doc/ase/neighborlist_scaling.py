@@ -0,0 +1,31 @@
+# creates: neighborlist_scaling.png
+"""Time needed to (re)build a neighbor list as a function of system size."""
+import time
+
+import matplotlib.pyplot as plt
+
+from ase.build import bulk
+from ase.neighborlist import NewPrimitiveNeighborList, PrimitiveNeighborList
+
+sizes = {PrimitiveNeighborList: [1, 2, 3, 4, 6, 8],
+         NewPrimitiveNeighborList: [1, 2, 3, 4, 6, 8, 12, 16, 24, 32, 48, 63]}
+
+for primitive, repeats in sizes.items():
+    natoms = []
+    times = []
+    for n in repeats:
+        atoms = bulk('Cu', cubic=True) * (n, n, n)
+        atoms.rattle(0.05, seed=42)
+        nl = primitive([1.5] * len(atoms), skin=0.3, self_interaction=False)
+        t0 = time.time()
+        nl.update(atoms.pbc, atoms.cell, atoms.positions)
+        natoms.append(len(atoms))
+        times.append(time.time() - t0)
+        print('{:24} {:8d} atoms {:10.3f} s'.format(primitive.__name__,
+                                                    natoms[-1], times[-1]))
+    plt.loglog(natoms, times, 'o-', label=primitive.__name__)
+
+plt.xlabel('Number of atoms')
+plt.ylabel('Build time [s]')
+plt.legend(loc='upper left')
+plt.savefig('neighborlist_scaling.png')